@@ -0,0 +1,77 @@
+"""Compare two benchmark result files.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/<base>.json benchmarks/results/<head>.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+# Metric -> True if a higher value is better
+METRICS = {
+    "throughput_files_s": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+    "manifest_io_s": False,
+}
+
+
+def compare(base: dict, head: dict) -> list[dict]:
+    """Pair up results by command and size and compute relative changes.
+
+    Returns:
+        One row per (command, files, metric) present in both documents, with
+        the change in percent (positive means better).
+    """
+    base_results = {(r["command"], r["files"]): r for r in base["results"]}
+    rows = []
+    for result in head["results"]:
+        previous = base_results.get((result["command"], result["files"]))
+        if previous is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = previous[metric], result[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            rows.append({
+                "command": result["command"],
+                "files": result["files"],
+                "metric": metric,
+                "base": old,
+                "head": new,
+                "improvement_pct": round(change if higher_is_better else -change, 1),
+            })
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two docgen benchmark result files.")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=5.0,
+                        help="highlight changes larger than this many percent")
+    args = parser.parse_args(argv)
+
+    from rich.console import Console
+    from rich.table import Table
+
+    base = json.loads(args.base.read_text())
+    head = json.loads(args.head.read_text())
+
+    tbl = Table(title=f"{(base['meta']['commit'] or 'base')[:12]} -> {(head['meta']['commit'] or 'head')[:12]}")
+    for heading in ("command", "files", "metric", "base", "head", "change"):
+        tbl.add_column(heading, justify="left" if heading in ("command", "metric") else "right")
+
+    for row in compare(base, head):
+        change = row["improvement_pct"]
+        color = "green" if change > args.threshold else "red" if change < -args.threshold else "dim"
+        tbl.add_row(
+            row["command"], str(row["files"]), row["metric"], str(row["base"]), str(row["head"]),
+            f"[{color}]{change:+.1f}%[/{color}]",
+        )
+    Console().print(tbl)
+
+
+if __name__ == "__main__":
+    main()
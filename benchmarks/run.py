@@ -0,0 +1,348 @@
+"""Benchmark docgen commands on synthetic projects against a fake LLM server.
+
+Usage:
+    python -m benchmarks.run --files 100 1000 --latency 0.05 --error-rate 0.01
+
+Each command runs in its own subprocess so peak RSS is measured per run.
+Results are printed as a table and saved as JSON for benchmarks.compare.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = ("generate", "check", "list", "update")
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of samples using the nearest-rank method."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+# -- worker side: runs inside the benchmark subprocess ------------------------
+
+
+class _Timer:
+    """Accumulates time spent in wrapped functions, ignoring nested calls."""
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.samples: list[float] = []
+        self._depth = 0
+
+    def wrap(self, owner, name: str) -> None:
+        func = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            if self._depth:
+                return func(*args, **kwargs)
+            self._depth += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                self.total += time.perf_counter() - start
+
+        setattr(owner, name, timed)
+
+    def wrap_iter(self, owner, name: str) -> None:
+        """Wrap a generator, timing each step but not the caller's work between them."""
+        func = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            iterator = func(*args, **kwargs)
+            while True:
+                nested = self._depth > 0
+                self._depth += 1
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self._depth -= 1
+                    if not nested:
+                        self.total += time.perf_counter() - start
+                yield item
+
+        setattr(owner, name, timed)
+
+    def wrap_async(self, owner, name: str) -> None:
+        func = getattr(owner, name)
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.samples.append(time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+
+    def wrap_sampled(self, owner, name: str) -> None:
+        func = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.samples.append(time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+
+
+def _worker(spec: dict) -> dict:
+    """Run the spec's command lines in-process and measure them."""
+    from typer.testing import CliRunner
+
+    from docgen import llm, storage
+    from docgen.commands import app
+
+    # Manifest I/O: every entry point that touches the storage database
+    manifest = _Timer()
+    for name in ("_prepare", "load_entries", "save_entries", "add_entry", "set_status",
+                 "get_entries", "count_entries", "find_entry", "delete_entry",
+                 "source_hashes", "load_imports", "save_imports", "export_snapshot", "compact"):
+        manifest.wrap(storage, name)
+    manifest.wrap_iter(storage, "iter_entries")
+    for name in ("_load_all", "get", "find_by_bands", "flush"):
+        manifest.wrap(storage.Session, name)
+
+    # LLM round trips, including the scheduler's retries and backoff
+    requests = _Timer()
+    requests.wrap_sampled(llm, "_complete")
+    requests.wrap_async(llm, "_acomplete")
+
+    runner = CliRunner()
+    invocations = []
+    failures = 0
+    start = time.perf_counter()
+    for argv in spec["runs"]:
+        t = time.perf_counter()
+        result = runner.invoke(app, argv)
+        invocations.append(time.perf_counter() - t)
+        if result.exception is not None and not isinstance(result.exception, SystemExit):
+            raise result.exception
+        # update exits 1 even on success
+        if result.exit_code not in spec["ok_exit_codes"]:
+            failures += 1
+    wall = time.perf_counter() - start
+
+    return {
+        "wall_s": wall,
+        "samples": requests.samples if spec["per_request"] else invocations,
+        "requests": len(requests.samples),
+        "manifest_io_s": manifest.total,
+        "failures": failures,
+    }
+
+
+# -- parent side ---------------------------------------------------------------
+
+
+def _prepare(command: str, root: Path, files: int, args: argparse.Namespace) -> dict:
+    """Create the project for one benchmark and return the worker spec."""
+    from benchmarks import synthetic
+
+    sources = synthetic.make_project(root, files)
+    concurrency = str(args.concurrency)
+    spec = {"command": command, "per_request": False, "ok_exit_codes": [0]}
+
+    if command == "generate":
+        spec["runs"] = [["generate", "src", "-o", "docs", "--no-cache", "-j", concurrency]]
+        spec["per_request"] = True
+        return spec
+
+    synthetic.write_manifest(root, sources)
+
+    if command == "list":
+        spec["runs"] = [["list"]] * args.repeat
+    elif command == "check":
+        synthetic.touch_sources(root, sources, args.changed)
+        spec["runs"] = [["check", "--all", "--no-cache", "-j", concurrency]] * args.repeat
+        spec["ok_exit_codes"] = [0, 1]
+    elif command == "update":
+        spec["runs"] = [
+            ["update", str(source), "--output-dir", str(Path("docs") / source.parent.name)]
+            for source in sources[:args.update_files]
+        ]
+        spec["ok_exit_codes"] = [0, 1]
+    return spec
+
+
+def _run_worker(spec: dict, cwd: Path, env: dict) -> tuple[dict, int]:
+    """Run a worker subprocess and return its measurements and peak RSS in bytes."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.run", "--worker", json.dumps(spec)],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    output = proc.stdout.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{spec['command']} benchmark failed with exit code {proc.returncode}")
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return json.loads(output.strip().splitlines()[-1]), usage.ru_maxrss * scale
+
+
+def _worker_env(base_url: str, args: argparse.Namespace) -> dict:
+    pythonpath = [str(REPO_ROOT), str(REPO_ROOT / "src"), os.environ.get("PYTHONPATH", "")]
+    return dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(p for p in pythonpath if p),
+        OPENAI_BASE_URL=base_url,
+        OPENAI_API_KEY="benchmark",
+        # Measure docgen, not our own account limits
+        DOCGEN_RPM="10000000",
+        DOCGEN_TPM="10000000000",
+        DOCGEN_MAX_CONCURRENCY=str(args.concurrency),
+        DOCGEN_NO_SERVER="1",
+    )
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run every requested command at every size and return the results document."""
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+    from tests.fake_openai import FakeOpenAIServer
+
+    server = FakeOpenAIServer(latency=args.latency, error_rate=args.error_rate).start()
+    env = _worker_env(server.base_url, args)
+    results = []
+
+    try:
+        for files in args.files:
+            for command in args.commands:
+                with tempfile.TemporaryDirectory(prefix=f"docgen-bench-{command}-") as tmp:
+                    root = Path(tmp)
+                    spec = _prepare(command, root, files, args)
+                    served = len(server.requests)
+                    measured, peak_rss = _run_worker(spec, root, env)
+
+                samples = measured["samples"]
+                # update documents one file per invocation; the rest sweep the project
+                processed = len(spec["runs"]) * (1 if command == "update" else files)
+                results.append({
+                    "command": command,
+                    "files": files,
+                    "runs": len(spec["runs"]),
+                    "wall_s": round(measured["wall_s"], 4),
+                    "throughput_files_s": round(processed / measured["wall_s"], 2),
+                    "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                    "p99_ms": round(percentile(samples, 99) * 1000, 3),
+                    "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+                    "manifest_io_s": round(measured["manifest_io_s"], 4),
+                    "llm_requests": measured["requests"],
+                    "http_requests": len(server.requests) - served,
+                    "failures": measured["failures"],
+                })
+                print(json.dumps(results[-1]), file=sys.stderr)
+    finally:
+        server.stop()
+
+    return {
+        "meta": {
+            "commit": _commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_s": args.latency,
+            "error_rate": args.error_rate,
+            "concurrency": args.concurrency,
+            "changed_fraction": args.changed,
+        },
+        "results": results,
+    }
+
+
+# Result key -> table heading
+TABLE_COLUMNS = {
+    "command": "command",
+    "files": "files",
+    "throughput_files_s": "files/s",
+    "p50_ms": "p50 ms",
+    "p99_ms": "p99 ms",
+    "peak_rss_mb": "RSS MB",
+    "manifest_io_s": "manifest s",
+    "llm_requests": "LLM calls",
+    "failures": "failed",
+}
+
+
+def _print_table(document: dict) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    tbl = Table(title=f"docgen benchmarks ({(document['meta']['commit'] or 'no commit')[:12]})")
+    for key, heading in TABLE_COLUMNS.items():
+        tbl.add_column(heading, justify="left" if key == "command" else "right")
+    for result in document["results"]:
+        tbl.add_row(*(str(result[key]) for key in TABLE_COLUMNS))
+    Console().print(tbl)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[100, 1000],
+                        help="project sizes to benchmark (number of source files)")
+    parser.add_argument("--commands", nargs="+", choices=COMMANDS, default=list(COMMANDS))
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="fake LLM response latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of LLM requests answered with HTTP 429")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--changed", type=float, default=0.01,
+                        help="fraction of sources edited before check")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="invocations of list and check per size")
+    parser.add_argument("--update-files", type=int, default=10,
+                        help="files updated one by one in the update benchmark")
+    parser.add_argument("--output", type=Path,
+                        help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(_worker(json.loads(args.worker))))
+        return
+
+    document = run(args)
+    _print_table(document)
+
+    commit = (document["meta"]["commit"] or "local")[:12]
+    output = args.output or REPO_ROOT / "benchmarks" / "results" / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
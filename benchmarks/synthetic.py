@@ -0,0 +1,91 @@
+"""Synthetic projects and manifests for benchmarks."""
+
+import random
+from pathlib import Path
+
+from docgen import storage
+from docgen.hashing import read_source
+from docgen.models import DocEntry
+
+# Files per package directory, so large projects don't put 100k files in one directory
+FILES_PER_PACKAGE = 100
+
+_FUNCTION = '''
+
+def {name}(value: int, factor: int = {factor}) -> int:
+    """Scale value by factor and add an offset."""
+    result = value * factor
+    for step in range({steps}):
+        result += step
+    return result
+'''
+
+
+def make_source(index: int, functions: int, rng: random.Random) -> str:
+    """Build a small, valid Python module."""
+    parts = [f'"""Synthetic module {index}."""\n\nCONSTANT_{index} = {rng.randint(0, 1000)}\n']
+    for i in range(functions):
+        parts.append(_FUNCTION.format(
+            name=f"function_{index}_{i}", factor=rng.randint(2, 9), steps=rng.randint(1, 20)
+        ))
+    return "".join(parts)
+
+
+def make_project(root: Path, files: int, functions: int = 5, seed: int = 0) -> list[Path]:
+    """Write a project of Python modules under root/src.
+
+    Returns:
+        The source paths, relative to root.
+    """
+    rng = random.Random(seed)
+    sources = []
+    for index in range(files):
+        package = root / "src" / f"pkg{index // FILES_PER_PACKAGE:04d}"
+        package.mkdir(parents=True, exist_ok=True)
+        path = package / f"module{index:06d}.py"
+        path.write_text(make_source(index, functions, rng))
+        sources.append(path.relative_to(root))
+    return sources
+
+
+def write_manifest(root: Path, sources: list[Path], docs_dir: str = "docs") -> None:
+    """Record a current doc and storage entry for every source, as if generated.
+
+    Paths are stored relative to root, matching a docgen run from root.
+    """
+    storage_dir = root / ".docgen"
+    storage.STORAGE_DIR = storage_dir
+    storage.STORAGE_PATH = storage_dir / "docs.json"
+    storage.DB_PATH = storage_dir / "docs.db"
+    storage_dir.mkdir(parents=True, exist_ok=True)
+
+    entries = []
+    for source in sources:
+        doc = Path(docs_dir) / source.relative_to("src").with_suffix(".md")
+        (root / doc).parent.mkdir(parents=True, exist_ok=True)
+        (root / doc).write_text(f"# {source.name}\n\nSynthetic documentation.\n")
+
+        snapshot = read_source(root / source)
+        entries.append(DocEntry(
+            source_file=str(source),
+            doc_file=str(doc),
+            source_hash=snapshot.hash,
+            source_mtime_ns=snapshot.mtime_ns,
+            source_size=snapshot.size,
+        ))
+    storage.save_entries(entries)
+
+
+def touch_sources(root: Path, sources: list[Path], fraction: float, seed: int = 0) -> list[Path]:
+    """Append a line to a fraction of the sources so their content changes.
+
+    Returns:
+        The modified sources.
+    """
+    rng = random.Random(seed)
+    count = max(1, int(len(sources) * fraction)) if fraction else 0
+    changed = rng.sample(sources, count)
+    for source in changed:
+        with open(root / source, "a") as f:
+            f.write(f"\nEDITED_{rng.randint(0, 1 << 30)} = True\n")
+    return changed
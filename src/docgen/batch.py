@@ -0,0 +1,166 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+from docgen import cache, chunking, llm, objects, similarity, storage
+from docgen.files import atomic_write
+from docgen.hashing import git_blob_hash, read_source
+from docgen.models import DocEntry, DocStatus
+from docgen.signatures import api_signature
+from docgen.sources import SourceFile
+
+# Batch statuses after which the job will not change any more
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def jobs_dir() -> Path:
+    """Return the directory holding submitted batch job records."""
+    return storage.STORAGE_DIR / "batches"
+
+
+def _job_path(batch_id: str) -> Path:
+    return jobs_dir() / f"{batch_id}.json"
+
+
+def pending_jobs() -> list[str]:
+    """Return IDs of submitted jobs that have not been collected yet."""
+    if not jobs_dir().exists():
+        return []
+    return sorted(p.stem for p in jobs_dir().glob("*.json"))
+
+
+def load_job(batch_id: str) -> dict:
+    """Load a job record. Raises FileNotFoundError for unknown IDs."""
+    return json.loads(_job_path(batch_id).read_text())
+
+
+def submit(sources: list[SourceFile], output_path: Path) -> tuple[str, int, list[SourceFile]]:
+    """Build a Batch API input file for the sources, submit it and record the job.
+
+    Returns:
+        The batch ID, the number of requests and the sources skipped as empty.
+
+    Raises:
+        ValueError: If every source is empty and there is nothing to submit.
+    """
+    lines = []
+    files = []
+    skipped = []
+
+    for index, source in enumerate(sources):
+        snapshot = read_source(source.path)
+        if not snapshot.text.strip():
+            skipped.append(source)
+            continue
+
+        # The doc will describe this exact content, whenever the job finishes
+        objects.put(snapshot.text.encode(), snapshot.hash)
+        chunks, prompts = llm.documentation_prompts(snapshot.text, source.path.name)
+        custom_ids = [f"{index}:{i}" for i in range(len(prompts))]
+        lines.extend(
+            json.dumps(llm.batch_request(custom_id, messages))
+            for custom_id, messages in zip(custom_ids, prompts)
+        )
+        files.append({
+            "source_file": str(source.path),
+            "doc_file": str(output_path / source.relative.with_suffix(".md")),
+            "source_hash": snapshot.hash,
+            "source_mtime_ns": snapshot.mtime_ns,
+            "source_size": snapshot.size,
+            "symbol_hashes": chunking.chunk_hashes(chunks) if chunks else {},
+            "simhash": similarity.simhash(snapshot.text),
+            "api_signature": api_signature(snapshot.text, source.path.name),
+            "git_blob": git_blob_hash(snapshot.text.encode()),
+            "chunks": [[c.name, c.kind, c.start_line] for c in chunks] if chunks else None,
+            "requests": [
+                {
+                    "custom_id": custom_id,
+                    "cache_key": cache.make_key(llm.MODEL, llm.PROMPT_VERSION, messages),
+                }
+                for custom_id, messages in zip(custom_ids, prompts)
+            ],
+        })
+
+    if not lines:
+        raise ValueError("nothing to document")
+
+    batch_id = llm.submit_batch("\n".join(lines) + "\n")
+
+    jobs_dir().mkdir(parents=True, exist_ok=True)
+    _job_path(batch_id).write_text(json.dumps({
+        "id": batch_id,
+        "submitted_at": datetime.now().isoformat(),
+        "files": files,
+    }, indent=2))
+
+    return batch_id, len(lines), skipped
+
+
+def _parse_results(text: str) -> dict[str, str | Exception]:
+    """Map custom IDs to completion text, or to an error for failed requests."""
+    results: dict[str, str | Exception] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or response.get("body", {}).get("error")
+            results[record["custom_id"]] = RuntimeError(str(error))
+        else:
+            results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+    return results
+
+
+def collect(batch_id: str, results_text: str) -> tuple[int, list[tuple[str, str]]]:
+    """Write docs and storage entries for a completed job and drop its record.
+
+    Returns:
+        The number of docs written and (source, reason) pairs for failed files.
+    """
+    job = load_job(batch_id)
+    results = _parse_results(results_text)
+    written = 0
+    failures = []
+
+    with storage.session() as db:
+        for record in job["files"]:
+            contents = [results.get(r["custom_id"]) for r in record["requests"]]
+            problems = [c for c in contents if not isinstance(c, str)]
+            if problems:
+                reason = str(problems[0]) if problems[0] else "no result returned"
+                failures.append((record["source_file"], reason))
+                continue
+
+            # Seed the response cache so interactive runs reuse the batch output
+            for request, content in zip(record["requests"], contents):
+                cache.put(request["cache_key"], llm.MODEL, content)
+
+            filename = Path(record["source_file"]).name
+            if record["chunks"]:
+                chunks = [
+                    chunking.Chunk(name=name, kind=kind, source="", start_line=start)
+                    for name, kind, start in record["chunks"]
+                ]
+                docs = chunking.merge_sections(filename, chunks, contents)
+            else:
+                docs = contents[0]
+
+            with atomic_write(Path(record["doc_file"])) as f:
+                f.write(docs)
+            db.put(DocEntry(
+                source_file=record["source_file"],
+                doc_file=record["doc_file"],
+                status=DocStatus.CURRENT,
+                source_hash=record["source_hash"],
+                source_mtime_ns=record["source_mtime_ns"],
+                source_size=record["source_size"],
+                symbol_hashes=record["symbol_hashes"],
+                simhash=record.get("simhash", 0),
+                api_signature=record.get("api_signature", ""),
+                git_blob=record.get("git_blob", ""),
+            ))
+            written += 1
+
+    _job_path(batch_id).unlink()
+    return written, failures
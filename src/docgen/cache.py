@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from docgen import metrics, storage
+from docgen.files import atomic_write
+
+# Eviction limits, overridable through the environment
+MAX_BYTES = int(os.environ.get("DOCGEN_CACHE_MAX_MB", "256")) * 1024 * 1024
+MAX_AGE_SECONDS = int(os.environ.get("DOCGEN_CACHE_MAX_AGE_DAYS", "30")) * 24 * 60 * 60
+
+# Evict after this many writes so a long run can't grow the cache unbounded
+EVICT_EVERY = 100
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evicted: int = 0
+
+
+# Commands toggle this from their --no-cache option
+enabled = True
+stats = CacheStats()
+
+
+def cache_dir() -> Path:
+    """Return the cache directory inside the project storage directory."""
+    return storage.STORAGE_DIR / "cache"
+
+
+def make_key(model: str, prompt_version: int, messages: list[dict]) -> str:
+    """Build a content-addressed key from the model, prompt version and prompt.
+
+    The messages embed the source (and existing docs for accuracy checks), so
+    byte-identical inputs always map to the same key.
+    """
+    content_hash = hashlib.sha256(
+        json.dumps(messages, sort_keys=True).encode()
+    ).hexdigest()
+    return hashlib.sha256(f"{model}\0{prompt_version}\0{content_hash}".encode()).hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    """Return the file holding a cached response, sharded by key prefix."""
+    return cache_dir() / key[:2] / f"{key}.json"
+
+
+def get(key: str) -> str | None:
+    """Return a cached response, or None on a miss or when caching is disabled."""
+    if not enabled:
+        return None
+
+    path = _entry_path(key)
+    try:
+        data = json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        stats.misses += 1
+        metrics.increment("cache_misses")
+        return None
+
+    # Touch the entry so eviction treats it as recently used
+    os.utime(path)
+    stats.hits += 1
+    metrics.increment("cache_hits")
+    return data["content"]
+
+
+def put(key: str, model: str, content: str) -> None:
+    """Store a response atomically and evict periodically."""
+    if not enabled:
+        return
+
+    data = {"model": model, "created_at": time.time(), "content": content}
+    with atomic_write(_entry_path(key)) as f:
+        json.dump(data, f)
+
+    stats.writes += 1
+    if stats.writes % EVICT_EVERY == 1:
+        evict()
+
+
+def evict(max_bytes: int | None = None, max_age: float | None = None) -> int:
+    """Drop expired entries, then least recently used ones until under the size limit.
+
+    Returns:
+        The number of entries removed.
+    """
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    max_age = MAX_AGE_SECONDS if max_age is None else max_age
+
+    root = cache_dir()
+    if not root.exists():
+        return 0
+
+    now = time.time()
+    files = []
+    for path in root.glob("*/*.json"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    removed = 0
+
+    for mtime, size, path in files:
+        if now - mtime <= max_age and total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+
+    stats.evicted += removed
+    return removed
+
+
+def clear() -> int:
+    """Remove every cached response. Returns the number of entries removed."""
+    return evict(max_bytes=0, max_age=0)
+
+
+def reset_stats() -> None:
+    """Reset hit/miss counters at the start of a command."""
+    global stats
+    stats = CacheStats()
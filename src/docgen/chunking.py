@@ -0,0 +1,215 @@
+import ast
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+
+# Python files longer than this are documented chunk by chunk
+CHUNK_THRESHOLD_LINES = int(os.environ.get("DOCGEN_CHUNK_THRESHOLD_LINES", "400"))
+
+# Classes longer than this are split further at method boundaries
+MAX_CHUNK_LINES = int(os.environ.get("DOCGEN_MAX_CHUNK_LINES", "300"))
+
+# Name of the chunk holding module-level code (imports, constants, docstring)
+MODULE_CHUNK = "__module__"
+
+_SYMBOL_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+_SECTION_RE = re.compile(r"^<!-- docgen:section (\S+) -->$", re.MULTILINE)
+_HEADING_RE = re.compile(r"^#{2,6} ", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    name: str
+    kind: str
+    source: str
+    start_line: int
+
+
+def _start_line(node: ast.stmt) -> int:
+    """Return the first line of a node, including its decorators."""
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [d.lineno for d in decorators])
+
+
+def _segment(lines: list[str], start: int, end: int) -> str:
+    """Return source lines start..end (1-based, inclusive)."""
+    return "".join(lines[start - 1:end])
+
+
+def _kind(node: ast.stmt) -> str:
+    return "class" if isinstance(node, ast.ClassDef) else "function"
+
+
+def _split_class(node: ast.ClassDef, lines: list[str]) -> list[Chunk]:
+    """Split an oversized class into a header chunk and one chunk per method."""
+    methods = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    method_lines = set()
+    chunks = []
+
+    for method in methods:
+        start = _start_line(method)
+        method_lines.update(range(start, method.end_lineno + 1))
+        chunks.append(Chunk(
+            name=f"{node.name}.{method.name}",
+            kind="method",
+            source=_segment(lines, start, method.end_lineno),
+            start_line=start,
+        ))
+
+    # Header: class statement, docstring and attributes without the method bodies
+    start = _start_line(node)
+    header = "".join(
+        lines[i - 1] for i in range(start, node.end_lineno + 1) if i not in method_lines
+    )
+    chunks.insert(0, Chunk(name=node.name, kind="class", source=header, start_line=start))
+    return chunks
+
+
+def split_python(source_code: str) -> list[Chunk] | None:
+    """Split Python source at top-level class and function boundaries.
+
+    Returns:
+        Chunks in source order, starting with the module-level chunk, or
+        None if the source doesn't parse.
+    """
+    try:
+        tree = ast.parse(source_code)
+    except SyntaxError:
+        return None
+
+    lines = source_code.splitlines(keepends=True)
+    symbol_lines: set[int] = set()
+    chunks: list[Chunk] = []
+
+    for node in tree.body:
+        if not isinstance(node, _SYMBOL_NODES):
+            continue
+        start = _start_line(node)
+        symbol_lines.update(range(start, node.end_lineno + 1))
+        if isinstance(node, ast.ClassDef) and node.end_lineno - start + 1 > MAX_CHUNK_LINES:
+            chunks.extend(_split_class(node, lines))
+        else:
+            chunks.append(Chunk(
+                name=node.name,
+                kind=_kind(node),
+                source=_segment(lines, start, node.end_lineno),
+                start_line=start,
+            ))
+
+    module_source = "".join(
+        line for i, line in enumerate(lines, start=1) if i not in symbol_lines
+    )
+    chunks.insert(0, Chunk(name=MODULE_CHUNK, kind="module", source=module_source, start_line=1))
+    return chunks
+
+
+def should_chunk(source_code: str, filename: str) -> bool:
+    """Return True if a file is large enough Python source to document in chunks."""
+    return filename.endswith(".py") and source_code.count("\n") + 1 > CHUNK_THRESHOLD_LINES
+
+
+def section_marker(name: str) -> str:
+    """Return the comment that opens a chunk's section in the merged doc."""
+    return f"<!-- docgen:section {name} -->"
+
+
+def merge_sections(filename: str, chunks: list[Chunk], sections: list[str]) -> str:
+    """Merge per-chunk markdown into one document in source order.
+
+    Each section is preceded by a marker comment so later runs can find
+    and replace individual sections.
+    """
+    parts = [f"# `{filename}`\n"]
+    for chunk, section in sorted(zip(chunks, sections), key=lambda pair: pair[0].start_line):
+        parts.append(f"{section_marker(chunk.name)}\n{section.strip()}\n")
+    return "\n".join(parts)
+
+
+def chunk_hashes(chunks: list[Chunk]) -> dict[str, str]:
+    """Hash each chunk so later runs can tell which symbols changed.
+
+    The module chunk's hash also covers the symbol names, because its
+    overview lists them and must be redone when symbols are added or removed.
+    """
+    names = ",".join(c.name for c in chunks if c.kind != "module")
+    hashes = {}
+    for chunk in chunks:
+        content = chunk.source.strip()
+        if chunk.kind == "module":
+            content += "\0" + names
+        hashes[chunk.name] = hashlib.sha256(content.encode()).hexdigest()
+    return hashes
+
+
+def symbol_hashes(source_code: str, filename: str) -> dict[str, str]:
+    """Return per-symbol hashes for a file documented in chunks, else an empty dict."""
+    if not should_chunk(source_code, filename):
+        return {}
+    chunks = split_python(source_code)
+    return chunk_hashes(chunks) if chunks else {}
+
+
+def parse_sections(doc: str) -> dict[str, str]:
+    """Split a merged doc back into its sections keyed by chunk name."""
+    matches = list(_SECTION_RE.finditer(doc))
+    sections = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(doc)
+        sections[match.group(1)] = doc[match.end():end].strip()
+    return sections
+
+
+def changed_chunks(
+    chunks: list[Chunk], old_hashes: dict[str, str], sections: dict[str, str]
+) -> list[Chunk]:
+    """Return the chunks that were added or edited, or whose section is missing."""
+    new_hashes = chunk_hashes(chunks)
+    return [
+        c for c in chunks
+        if old_hashes.get(c.name) != new_hashes[c.name] or c.name not in sections
+    ]
+
+
+def _changed_symbols(previous_source: str, source_code: str) -> set[str]:
+    """Return the chunk names added, edited or removed between two versions of a file."""
+    old, new = split_python(previous_source), split_python(source_code)
+    if old is None or new is None:
+        return set()
+    old_hashes, new_hashes = chunk_hashes(old), chunk_hashes(new)
+    return {
+        name for name in old_hashes.keys() | new_hashes.keys()
+        if old_hashes.get(name) != new_hashes.get(name)
+    }
+
+
+def affected_sections(previous_source: str, source_code: str, filename: str, doc: str) -> str:
+    """Return the parts of a doc that an edit from previous_source can make wrong.
+
+    Chunked docs keep the sections of added, edited and removed symbols.
+    Other docs keep their overview and the headed sections that mention a
+    changed symbol. The whole doc is returned when nothing narrower can be
+    picked, e.g. for non-Python sources.
+    """
+    if not filename.endswith(".py"):
+        return doc
+    changed = _changed_symbols(previous_source, source_code)
+    if not changed:
+        return doc
+
+    sections = parse_sections(doc)
+    if sections:
+        picked = [
+            f"{section_marker(name)}\n{text}" for name, text in sections.items() if name in changed
+        ]
+        return "\n\n".join(picked) if picked else doc
+
+    starts = [0] + [m.start() for m in _HEADING_RE.finditer(doc) if m.start()]
+    parts = [doc[start:end] for start, end in zip(starts, starts[1:] + [len(doc)])]
+    names = [
+        re.compile(rf"\b{re.escape(name.rsplit('.', 1)[-1])}\b")
+        for name in changed if name != MODULE_CHUNK
+    ]
+    picked = [parts[0]] + [p for p in parts[1:] if any(n.search(p) for n in names)]
+    return "".join(picked) if len(picked) < len(parts) else doc
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import threading
+import weakref
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+# Connection pool and timeouts (DOCGEN_HTTP_* override them)
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_MAX_KEEPALIVE = 16
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 120.0
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_clients: dict[tuple[str, str | None], OpenAI] = {}
+
+# httpx async pools are bound to the event loop that opened their connections,
+# so pool per loop; run() closes a loop's clients when the loop finishes
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Sync callers run their async work on this one long-lived loop, so they
+# share a single async pool instead of opening one per asyncio.run()
+_background_loop: asyncio.AbstractEventLoop | None = None
+_background_thread: threading.Thread | None = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.environ.get("DOCGEN_HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(os.environ.get("DOCGEN_HTTP_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE)),
+        keepalive_expiry=float(os.environ.get("DOCGEN_HTTP_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)),
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        float(os.environ.get("DOCGEN_HTTP_READ_TIMEOUT", DEFAULT_READ_TIMEOUT)),
+        connect=float(os.environ.get("DOCGEN_HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+    )
+
+
+def _key(api_key: str) -> tuple[str, str | None]:
+    """Clients are shared per API key and endpoint."""
+    return api_key, os.environ.get("OPENAI_BASE_URL")
+
+
+def get_client(api_key: str) -> OpenAI:
+    """Return the process-wide OpenAI client, creating its keep-alive pool on first use."""
+    key = _key(api_key)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            timeout = _timeout()
+            # Retries are handled by the scheduler so backoff honors our rate limits
+            client = OpenAI(
+                api_key=api_key,
+                max_retries=0,
+                timeout=timeout,
+                http_client=DefaultHttpxClient(limits=_limits(), timeout=timeout),
+            )
+            _clients[key] = client
+        return client
+
+
+def get_async_client(api_key: str) -> AsyncOpenAI:
+    """Return the async OpenAI client pooled for the running event loop."""
+    loop = asyncio.get_running_loop()
+    key = _key(api_key)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            timeout = _timeout()
+            client = AsyncOpenAI(
+                api_key=api_key,
+                max_retries=0,
+                timeout=timeout,
+                http_client=DefaultAsyncHttpxClient(limits=_limits(), timeout=timeout),
+            )
+            clients[key] = client
+        return client
+
+
+async def aclose_loop_clients() -> None:
+    """Close the async clients pooled for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.pop(loop, {})
+    for client in clients.values():
+        await client.close()
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """asyncio.run() a coroutine, closing the async clients it pooled once it finishes."""
+
+    async def _main() -> T:
+        try:
+            return await coro
+        finally:
+            await aclose_loop_clients()
+
+    return asyncio.run(_main())
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting its thread on first use."""
+    global _background_loop, _background_thread
+    with _lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            _background_thread = threading.Thread(
+                target=_background_loop.run_forever, name="docgen-async", daemon=True
+            )
+            _background_thread.start()
+        return _background_loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine from synchronous code and return its result.
+
+    Every thread shares one background event loop, and with it one async
+    connection pool, so repeated and concurrent sync calls reuse connections.
+    Must not be called from the background loop itself.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
+
+def reset() -> None:
+    """Close every pooled client and stop the background loop."""
+    global _background_loop, _background_thread
+    with _lock:
+        loop, _background_loop = _background_loop, None
+        thread, _background_thread = _background_thread, None
+    if loop is not None:
+        asyncio.run_coroutine_threadsafe(aclose_loop_clients(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _async_clients.clear()
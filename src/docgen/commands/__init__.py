@@ -1,14 +1,94 @@
+import importlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated
+
+import click
 import typer
+from typer.core import TyperGroup
+
+from docgen import display, env, metrics
+from docgen.files import atomic_write
+
+
+@dataclass(frozen=True)
+class LazyCommand:
+    module: str
+    group: bool = False
+    uses_llm: bool = True
+
+
+# Command modules are imported only when their command runs (or help is
+# shown), so `docgen list` never pays for importing openai and friends
+COMMANDS = {
+    # Single commands - flattened to top level
+    "generate": LazyCommand("docgen.commands.generate"),
+    "list": LazyCommand("docgen.commands.list", uses_llm=False),
+    "check": LazyCommand("docgen.commands.check"),
+    "update": LazyCommand("docgen.commands.update"),
+    "watch": LazyCommand("docgen.commands.watch"),
+    "serve": LazyCommand("docgen.commands.serve"),
+    "merge": LazyCommand("docgen.commands.merge", uses_llm=False),
+    # Command groups
+    "batch": LazyCommand("docgen.commands.batch", group=True),
+}
+
+
+class LazyGroup(TyperGroup):
+    """Top-level group that loads each command's module on first use."""
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return [*super().list_commands(ctx), *COMMANDS]
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        lazy = COMMANDS.get(cmd_name)
+        if lazy is None:
+            return super().get_command(ctx, cmd_name)
+
+        if lazy.uses_llm:
+            env.load()
+        sub_app = importlib.import_module(lazy.module).app
+        command = typer.main.get_group(sub_app) if lazy.group else typer.main.get_command(sub_app)
+        command.name = cmd_name
+        return command
+
+
+app = typer.Typer(cls=LazyGroup, no_args_is_help=True)
+
 
-from .check import app as check_app
-from .generate import app as generate_app
-from .list import app as list_app
-from .update import app as update_app
+def _report_metrics(
+    command: str | None, profile: bool, json_path: Path | None, prom_path: Path | None
+) -> None:
+    """Show and export the metrics collected while a command ran."""
+    report = metrics.report(command)
+    if profile:
+        display.profile_summary(report)
+    if json_path:
+        with atomic_write(json_path) as f:
+            json.dump(report, f, indent=2)
+    if prom_path:
+        with atomic_write(prom_path) as f:
+            f.write(metrics.to_prometheus(report))
 
-app = typer.Typer(help="AI-powered documentation generator.", no_args_is_help=True)
 
-# Single commands - flattens to top level
-app.add_typer(generate_app)
-app.add_typer(list_app)
-app.add_typer(check_app)
-app.add_typer(update_app)
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: Annotated[
+        bool, typer.Option("--profile", help="Show per-phase timings, token usage and cost")
+    ] = False,
+    metrics_json: Annotated[
+        Path | None, typer.Option("--metrics-json", help="Write run metrics to a JSON file")
+    ] = None,
+    metrics_prom: Annotated[
+        Path | None,
+        typer.Option("--metrics-prom", help="Write run metrics as a Prometheus textfile"),
+    ] = None,
+) -> None:
+    """AI-powered documentation generator."""
+    metrics.reset()
+    if profile or metrics_json or metrics_prom:
+        ctx.call_on_close(
+            lambda: _report_metrics(ctx.invoked_subcommand, profile, metrics_json, metrics_prom)
+        )
@@ -0,0 +1,83 @@
+import time
+from typing import Annotated
+
+import typer
+
+from docgen import batch, display
+from docgen.constants import EXIT_ERROR, EXIT_INVALID_INPUT
+from docgen.llm import batch_file_content, get_batch
+
+app = typer.Typer(help="Manage OpenAI Batch API documentation jobs.", no_args_is_help=True)
+
+
+def _collect_one(batch_id: str, wait: bool, poll_interval: float) -> bool:
+    """Poll one job and write its docs once complete.
+
+    Returns:
+        True if the job finished without failed files.
+    """
+    job = get_batch(batch_id)
+    while wait and job.status not in batch.TERMINAL_STATUSES:
+        display.info(f"Batch {batch_id} is {job.status}, checking again in {poll_interval:g}s...")
+        time.sleep(poll_interval)
+        job = get_batch(batch_id)
+
+    if job.status not in batch.TERMINAL_STATUSES:
+        display.warning(f"Batch {batch_id} is still {job.status}")
+        return True
+
+    if job.status != "completed":
+        display.error(f"Batch {batch_id} ended with status {job.status}")
+        return False
+
+    # Requests that failed land in the error file, the rest in the output file
+    results = ""
+    for file_id in (job.output_file_id, job.error_file_id):
+        if file_id:
+            results += batch_file_content(file_id) + "\n"
+
+    written, failures = batch.collect(batch_id, results)
+
+    for source_file, reason in failures:
+        display.error(f"Failed: {source_file} ({reason})")
+    display.success(f"Collected batch {batch_id}: wrote {written} docs")
+
+    return not failures
+
+
+@app.command()
+def collect(
+    batch_id: Annotated[
+        str | None, typer.Argument(help="batch job ID (default: every pending job)")
+    ] = None,
+    wait: Annotated[
+        bool, typer.Option("--wait/--no-wait", help="poll until the job finishes")
+    ] = True,
+    poll_interval: Annotated[
+        float, typer.Option("--poll-interval", min=0, help="seconds between status checks")
+    ] = 30.0,
+) -> None:
+    """Download finished batch results and write the docs and storage entries."""
+    batch_ids = [batch_id] if batch_id else batch.pending_jobs()
+    if not batch_ids:
+        display.warning("No pending batch jobs")
+        return
+
+    ok = True
+    for job_id in batch_ids:
+        try:
+            batch.load_job(job_id)
+        except FileNotFoundError:
+            display.error(f"Unknown batch job: {job_id}")
+            raise typer.Exit(EXIT_INVALID_INPUT)
+
+        try:
+            ok = _collect_one(job_id, wait, poll_interval) and ok
+        except typer.Exit:
+            raise
+        except Exception as e:
+            display.error(f"LLM error: {e}")
+            ok = False
+
+    if not ok:
+        raise typer.Exit(EXIT_ERROR)
@@ -1,23 +1,54 @@
-import hashlib
+import asyncio
+import os
 from pathlib import Path
 from typing import Annotated
 
 import typer
 
-from docgen import display
+from docgen import cache, clients, display, git, imports, objects, sharding, storage
 from docgen.constants import EXIT_ERROR, EXIT_INVALID_INPUT
-from docgen.llm import check_accuracy
-from docgen.models import DocStatus
-from docgen.storage import find_entry, load_entries, save_entries
+from docgen.hashing import (
+    SourceSnapshot,
+    git_blob_hash,
+    hash_file,
+    hash_files,
+    read_source,
+    stat_matches,
+)
+from docgen.models import DocEntry, DocStatus
+from docgen.signatures import api_signature
+
+DEFAULT_CONCURRENCY = 8
 
 app = typer.Typer()
 
 
-@app.command()
-def check(
-    source_file: Annotated[str, typer.Argument(help="source file to check docs against")],
-) -> None:
-    """Check if documentation is still accurate for a source file."""
+def _surface_unchanged(entry: DocEntry, snapshot: SourceSnapshot) -> bool:
+    """Return True if a changed source kept the public API its docs were written for.
+
+    The entry then adopts the snapshot's hash and stat, so later checks skip
+    the file, and the new source is stored as the base for later diffs.
+    """
+    if not entry.api_signature:
+        return False
+    if api_signature(snapshot.text, Path(entry.source_file).name) != entry.api_signature:
+        return False
+    # The text was decoded from the file's bytes as-is, so this is the file exactly
+    data = snapshot.text.encode()
+    objects.put(data, snapshot.hash)
+    entry.source_hash = snapshot.hash
+    entry.git_blob = git_blob_hash(data)
+    entry.source_mtime_ns = snapshot.mtime_ns
+    entry.source_size = snapshot.size
+    return True
+
+
+def _check_file(db: storage.Session, source_file: str) -> bool:
+    """Check a single source file against its documentation entry.
+
+    Returns:
+        True if the source changed since its docs were generated.
+    """
     # Validate source file exists
     source_path = Path(source_file)
     if not source_path.exists():
@@ -25,7 +56,7 @@ def check(
         raise typer.Exit(EXIT_INVALID_INPUT)
 
     # Find existing documentation entry
-    existing = find_entry(str(source_path))
+    existing = db.get(str(source_path))
     if not existing:
         display.error(f"No documentation found for: {source_file}")
         raise typer.Exit(EXIT_INVALID_INPUT)
@@ -36,31 +67,304 @@ def check(
         display.error(f"Doc file missing: {existing.doc_file}")
         raise typer.Exit(EXIT_ERROR)
 
-    # Read current source and existing docs
-    source_code = source_path.read_text()
-    existing_docs = doc_path.read_text()
+    # Quick stat check -- same size and mtime means the file wasn't touched
+    st = source_path.stat()
+    if stat_matches(existing, st):
+        display.success(f"Docs are up to date for {source_file}")
+        return False
 
-    # Quick hash check
-    current_hash = hashlib.sha256(source_code.encode()).hexdigest()
+    # Hash check -- remember the new stat so the next check can skip reading
+    current_hash = hash_file(source_path)
     if current_hash == existing.source_hash:
+        existing.source_mtime_ns = st.st_mtime_ns
+        existing.source_size = st.st_size
         display.success(f"Docs are up to date for {source_file}")
-        return
+        return False
+
+    # Read current source and existing docs, byte for byte so CRLF files hash the same
+    snapshot = read_source(source_path)
+    source_code = snapshot.text
+
+    # Signature check -- formatting, comments and bodies don't change what is documented
+    if _surface_unchanged(existing, snapshot):
+        display.success(f"Docs are up to date for {source_file} (public API unchanged)")
+        return False
+
+    existing_docs = doc_path.read_text()
 
     # Source changed -- call LLM to check accuracy
+    from docgen.llm import check_accuracy
+
     display.info(f"Source changed, checking accuracy for {source_path.name}...")
 
     try:
-        report = check_accuracy(source_code, existing_docs)
+        report = check_accuracy(
+            source_code, existing_docs, source_file, objects.get_text(existing.source_hash)
+        )
     except Exception as e:
         display.error(f"LLM error: {e}")
         raise typer.Exit(EXIT_ERROR)
 
     # Mark as stale in storage
-    entries = load_entries()
-    for entry in entries:
-        if entry.source_file == str(source_path):
-            entry.status = DocStatus.STALE
-    save_entries(entries)
+    existing.status = DocStatus.STALE
 
     display.warning(f"Docs may be stale for {source_file}")
     display.info(report)
+    return True
+
+
+def _propagate(db: storage.Session, changed: list[str]) -> list[tuple[str, str, str]]:
+    """Mark every tracked source importing a changed source as stale.
+
+    Returns:
+        Check results for the dependents, nearest to a changed source first
+        so they are the first to regenerate.
+    """
+    graph = imports.update_graph(e.source_file for e in db.entries())
+    affected = graph.affected(changed)
+
+    results = []
+    for source_file, (distance, origin) in sorted(
+        affected.items(), key=lambda item: (item[1][0], item[0])
+    ):
+        entry = db.get(source_file)
+        entry.status = DocStatus.STALE
+        via = "imports" if distance == 1 else f"imports ({distance} levels deep)"
+        results.append((source_file, "stale", f"{via} changed {origin}"))
+    return results
+
+
+async def _check_changed(
+    entries: list[DocEntry], concurrency: int
+) -> list[tuple[DocEntry, str | Exception]]:
+    """Run LLM accuracy checks for changed files concurrently."""
+    from docgen.llm import acheck_accuracy
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _worker(entry: DocEntry) -> tuple[DocEntry, str | Exception]:
+        try:
+            # Read as-is, like the snapshot, so CRLF sources don't diff as all changed
+            source_code = read_source(entry.source_file).text
+            existing_docs = Path(entry.doc_file).read_text()
+            previous_source = objects.get_text(entry.source_hash)
+            async with semaphore:
+                return entry, await acheck_accuracy(
+                    source_code, existing_docs, entry.source_file, previous_source
+                )
+        except typer.Exit:
+            raise
+        except Exception as e:
+            return entry, e
+
+    return await asyncio.gather(*(_worker(entry) for entry in entries))
+
+
+def _check_all(
+    db: storage.Session,
+    status: DocStatus | None,
+    concurrency: int,
+    propagate: bool,
+    since: tuple[str, set[str]] | None = None,
+    shard: tuple[int, int] | None = None,
+) -> None:
+    """Sweep every tracked entry, only reading and hashing files whose stat changed.
+
+    Inside a git work tree, files whose working copy still matches the blob
+    recorded at generation are current without being read, even when a
+    checkout reset their mtime. since holds a ref and the files changed
+    since it; only those (and sources git doesn't track) are swept. shard
+    limits the sweep to one CI shard's share of the entries.
+    """
+    entries = db.entries(status=status)
+    if not entries:
+        display.warning("No documentation entries found")
+        return
+
+    blobs: dict[str, str | None] | None = None
+    if since is not None:
+        ref, changed_paths = since
+        blobs = git.tracked_files(git.repo_root())
+        swept = [
+            e for e in entries
+            if git.path_key(e.source_file) in changed_paths
+            or git.path_key(e.source_file) not in blobs
+        ]
+        display.info(f"{len(entries) - len(swept)} sources unchanged since {ref}, skipped")
+        entries = swept
+
+    if shard is not None:
+        index, count = shard
+        keep = sharding.select([e.source_file for e in entries], index, count)
+        display.info(f"Shard {index}/{count}: {len(keep)} of {len(entries)} sources")
+        entries = [e for e in entries if e.source_file in keep]
+
+    results: list[tuple[str, str, str]] = []
+    touched: list[tuple[DocEntry, os.stat_result]] = []
+
+    # Stat pass -- unchanged size and mtime skips the file entirely
+    for entry in entries:
+        try:
+            st = Path(entry.source_file).stat()
+        except FileNotFoundError:
+            results.append((entry.source_file, "missing", "source file not found"))
+            continue
+        if not Path(entry.doc_file).exists():
+            results.append((entry.source_file, "missing", f"doc file not found: {entry.doc_file}"))
+        elif stat_matches(entry, st):
+            results.append((entry.source_file, "current", ""))
+        else:
+            touched.append((entry, st))
+
+    # Git pass -- a clean working copy of the blob the docs were generated
+    # from is unchanged, even when a checkout reset its mtime
+    if touched and blobs is None:
+        root = git.repo_root()
+        blobs = git.tracked_files(root) if root else {}
+    to_hash: list[tuple[DocEntry, os.stat_result]] = []
+    for entry, st in touched:
+        if entry.git_blob and blobs.get(git.path_key(entry.source_file)) == entry.git_blob:
+            entry.source_mtime_ns = st.st_mtime_ns
+            entry.source_size = st.st_size
+            results.append((entry.source_file, "current", ""))
+        else:
+            to_hash.append((entry, st))
+
+    # Hash pass -- only for files that were touched, spread over processes
+    hashes = hash_files([entry.source_file for entry, _ in to_hash])
+    edited: list[DocEntry] = []
+    for entry, st in to_hash:
+        current_hash = hashes[entry.source_file]
+        if current_hash is None:
+            results.append((entry.source_file, "error", "source file unreadable"))
+        elif current_hash == entry.source_hash:
+            entry.source_mtime_ns = st.st_mtime_ns
+            entry.source_size = st.st_size
+            # Entries from before git blobs were recorded pick up the clean one
+            entry.git_blob = blobs.get(git.path_key(entry.source_file)) or entry.git_blob
+            results.append((entry.source_file, "current", ""))
+        else:
+            edited.append(entry)
+
+    # Signature pass -- only edits to the public API can make the docs wrong
+    changed = []
+    for entry in edited:
+        try:
+            unchanged = entry.api_signature and _surface_unchanged(
+                entry, read_source(entry.source_file)
+            )
+        except (OSError, UnicodeDecodeError):
+            unchanged = False
+        if unchanged:
+            results.append((entry.source_file, "current", "public API unchanged"))
+        else:
+            changed.append(entry)
+
+    # LLM pass -- only for files whose content really changed
+    if changed:
+        display.info(f"{len(changed)} sources changed, checking accuracy...")
+        for entry, outcome in clients.run(_check_changed(changed, concurrency)):
+            if isinstance(outcome, Exception):
+                results.append((entry.source_file, "error", f"LLM error: {outcome}"))
+                continue
+            entry.status = DocStatus.STALE
+            results.append((entry.source_file, "stale", "source changed"))
+            display.warning(f"Docs may be stale for {entry.source_file}")
+            display.info(outcome)
+
+    # Import pass -- docs of dependents can describe behavior that just changed
+    if propagate and changed:
+        dependents = _propagate(db, [entry.source_file for entry in changed])
+        flagged = {source_file for source_file, _, _ in dependents}
+        reported = {source_file for source_file, outcome, _ in results if outcome != "current"}
+        results = [r for r in results if r[0] not in flagged or r[0] in reported]
+        results += [r for r in dependents if r[0] not in reported]
+
+    display.check_summary(results)
+
+    if any(outcome in ("missing", "error") for _, outcome, _ in results):
+        raise typer.Exit(EXIT_ERROR)
+
+
+@app.command()
+def check(
+    source_file: Annotated[
+        str | None, typer.Argument(help="source file to check docs against")
+    ] = None,
+    all_entries: Annotated[
+        bool, typer.Option("--all", "-a", help="check every tracked source file")
+    ] = False,
+    status: Annotated[
+        str | None,
+        typer.Option("--status", "-s", help="check tracked files with this status (current/stale/error)"),
+    ] = None,
+    concurrency: Annotated[
+        int, typer.Option("--concurrency", "-j", min=1, help="maximum concurrent LLM requests")
+    ] = DEFAULT_CONCURRENCY,
+    no_cache: Annotated[
+        bool, typer.Option("--no-cache", help="always call the LLM, bypassing the response cache")
+    ] = False,
+    propagate: Annotated[
+        bool,
+        typer.Option("--propagate", help="also mark docs of sources importing a changed file stale"),
+    ] = False,
+    since: Annotated[
+        str | None,
+        typer.Option("--since", help="only check sources changed since this git ref"),
+    ] = None,
+    shard: Annotated[
+        str | None,
+        typer.Option("--shard", help="only check shard i of N (e.g. 2/4), balanced by file size"),
+    ] = None,
+) -> None:
+    """Check if documentation is still accurate for a source file or all tracked files."""
+    cache.enabled = not no_cache
+    cache.reset_stats()
+
+    # Parse status filter
+    status_filter = None
+    if status:
+        try:
+            status_filter = DocStatus(status.lower())
+        except ValueError:
+            display.error(f"Invalid status: {status}. Use current, stale, or error")
+            raise typer.Exit(EXIT_INVALID_INPUT)
+
+    shard_spec = None
+    if shard is not None:
+        try:
+            shard_spec = sharding.parse_shard(shard)
+        except ValueError as e:
+            display.error(str(e))
+            raise typer.Exit(EXIT_INVALID_INPUT)
+
+    sweep = all_entries or status_filter is not None or since is not None or shard is not None
+    if sweep == (source_file is not None):
+        display.error("Provide either a source file or --all/--status/--since/--shard")
+        raise typer.Exit(EXIT_INVALID_INPUT)
+
+    # Resolve the ref up front; outside git every tracked source is swept
+    changed_since = None
+    if since is not None:
+        root = git.repo_root()
+        if root is None:
+            display.warning("Not a git repository, checking every tracked source")
+        else:
+            try:
+                changed_since = (since, git.changed_since(root, since))
+            except ValueError as e:
+                display.error(str(e))
+                raise typer.Exit(EXIT_INVALID_INPUT)
+
+    # Sharded sweeps export their results to docs.json for `docgen merge`
+    with storage.session() as db:
+        if sweep:
+            try:
+                _check_all(db, status_filter, concurrency, propagate, changed_since, shard_spec)
+            finally:
+                if shard_spec is not None:
+                    db.flush()
+                    storage.export_snapshot()
+        elif _check_file(db, source_file) and propagate:
+            for dependent, _, detail in _propagate(db, [str(Path(source_file))]):
+                display.warning(f"Docs may be stale for {dependent} ({detail})")
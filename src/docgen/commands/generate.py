@@ -1,26 +1,374 @@
-import hashlib
+import asyncio
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Annotated
 
 import typer
 
-from docgen import display
+from docgen import (
+    batch, cache, chunking, clients, compaction, display, metrics, objects, sharding,
+    similarity, storage,
+)
 from docgen.constants import EXIT_ERROR, EXIT_INVALID_INPUT
-from docgen.llm import generate_documentation
+from docgen.files import atomic_write
+from docgen.hashing import SourceSnapshot, git_blob_hash, read_source
+from docgen.llm import (
+    aadapt_documentation,
+    adapt_documentation,
+    agenerate_documentation,
+    generate_documentation,
+    stream_documentation,
+)
 from docgen.models import DocEntry, DocStatus
-from docgen.storage import add_entry, find_entry, load_entries, save_entries
+from docgen.signatures import api_signature
+from docgen.sources import SourceFile, discover_sources, is_glob
+from docgen.storage import find_entry
+
+DEFAULT_CONCURRENCY = 8
+
+# What to do with a new file that is a near-duplicate of a documented one
+SIMILAR_MODES = ("adapt", "reuse", "off")
 
 app = typer.Typer()
 
 
+def _previous_doc(entry: DocEntry | None) -> tuple[str | None, dict[str, str] | None]:
+    """Return the existing doc and its symbol hashes if it can be updated in place."""
+    if entry is None or not entry.symbol_hashes:
+        return None, None
+    doc_path = Path(entry.doc_file)
+    if not doc_path.exists():
+        return None, None
+    return doc_path.read_text(), entry.symbol_hashes
+
+
+@dataclass(frozen=True)
+class _Similar:
+    entry: DocEntry
+    source: str
+    doc: str
+
+
+def _find_similar(db: storage.Session, source_path: Path, source_code: str) -> _Similar | None:
+    """Return a documented near-duplicate of a source, with its source and doc.
+
+    The source is the snapshot the doc was written from, not the file on disk,
+    which may have been edited since. Without a snapshot there is no match, so
+    the file is documented from scratch.
+    """
+    match = similarity.find_similar(db, source_code, exclude=str(source_path))
+    if match is None:
+        return None
+    entry, _ = match
+    source = objects.get_text(entry.source_hash)
+    if source is None:
+        return None
+    try:
+        doc = Path(entry.doc_file).read_text()
+    except (OSError, UnicodeDecodeError):
+        return None
+    return _Similar(entry, source, doc)
+
+
+def record_entry(
+    db: storage.Session, source_path: Path, doc_path: Path, snapshot: SourceSnapshot
+) -> None:
+    """Update or add the storage entry for a freshly generated doc.
+
+    The source is snapshotted so later checks can diff against it.
+    """
+    data = snapshot.text.encode()
+    objects.put(data, snapshot.hash)
+    db.put(
+        DocEntry(
+            source_file=str(source_path),
+            doc_file=str(doc_path),
+            status=DocStatus.CURRENT,
+            source_hash=snapshot.hash,
+            source_mtime_ns=snapshot.mtime_ns,
+            source_size=snapshot.size,
+            symbol_hashes=chunking.symbol_hashes(snapshot.text, source_path.name),
+            simhash=similarity.simhash(snapshot.text),
+            api_signature=api_signature(snapshot.text, source_path.name),
+            git_blob=git_blob_hash(data),
+        )
+    )
+
+
+async def _generate_batch(
+    db: storage.Session,
+    sources: list[SourceFile],
+    output_path: Path,
+    concurrency: int,
+    similar_mode: str,
+) -> tuple[int, list[tuple[SourceFile, str]]]:
+    """Document many files concurrently, persisting each result as it finishes.
+
+    New files that are near-duplicates of a documented file (including one
+    documented earlier in the run) adapt or reuse its doc, per similar_mode.
+
+    Returns:
+        The number of docs written and (source, reason) pairs for failed files.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    failures: list[tuple[SourceFile, str]] = []
+    written = 0
+
+    with display.progress() as progress:
+        task = progress.add_task("Generating docs", total=len(sources))
+
+        async def _worker(source: SourceFile) -> None:
+            nonlocal written
+            try:
+                snapshot = read_source(source.path)
+                if not snapshot.text.strip():
+                    display.warning(f"Skipping empty file: {source.path}")
+                    return
+
+                entry = db.get(str(source.path))
+                existing_docs, symbol_hashes = _previous_doc(entry)
+                similar = None
+                if entry is None and similar_mode != "off":
+                    similar = _find_similar(db, source.path, snapshot.text)
+
+                if similar is not None and similar_mode == "reuse":
+                    metrics.increment("similar_reused")
+                    docs = similar.doc
+                elif similar is not None:
+                    metrics.increment("similar_adapted")
+                    async with semaphore:
+                        docs = await aadapt_documentation(
+                            snapshot.text, source.path.name, similar.source,
+                            Path(similar.entry.source_file).name, similar.doc,
+                        )
+                else:
+                    async with semaphore:
+                        docs = await agenerate_documentation(
+                            snapshot.text, source.path.name, existing_docs, symbol_hashes
+                        )
+
+                doc_path = output_path / source.relative.with_suffix(".md")
+                with atomic_write(doc_path) as f:
+                    f.write(docs)
+                record_entry(db, source.path, doc_path, snapshot)
+                # Persist now so a killed run keeps every doc it already wrote
+                db.flush()
+                written += 1
+            except typer.Exit:
+                raise
+            except Exception as e:
+                failures.append((source, str(e)))
+            finally:
+                progress.advance(task)
+
+        await asyncio.gather(*(_worker(source) for source in sources))
+
+    return written, failures
+
+
+def _write_streamed(source_code: str, filename: str, doc_path: Path, preview: bool) -> None:
+    """Write docs to a temp file as they stream in and rename it into place when done."""
+    with atomic_write(doc_path) as f:
+        for text in stream_documentation(source_code, filename):
+            f.write(text)
+            f.flush()
+            if preview:
+                display.preview(text)
+    if preview:
+        display.info("")
+
+
+def _report_compaction() -> None:
+    """Show the prompt tokens compaction removed, if any."""
+    stats = compaction.stats
+    if stats.saved > 0:
+        display.info(
+            f"Compaction: saved ~{stats.saved} of {stats.tokens_before} prompt tokens "
+            f"({stats.saved / stats.tokens_before:.0%})"
+        )
+
+
+def _discover(
+    targets: list[str], include: list[str] | None, exclude: list[str] | None
+) -> list[SourceFile]:
+    """Expand targets into source files, exiting on missing paths or no matches."""
+    try:
+        sources = discover_sources(targets, include=include, exclude=exclude)
+    except FileNotFoundError as e:
+        display.error(f"File not found: {e}")
+        raise typer.Exit(EXIT_INVALID_INPUT)
+    except ValueError as e:
+        display.error(str(e))
+        raise typer.Exit(EXIT_INVALID_INPUT)
+
+    if not sources:
+        display.error("No source files matched")
+        raise typer.Exit(EXIT_INVALID_INPUT)
+
+    return sources
+
+
+def _select_shard(
+    sources: list[SourceFile], shard: tuple[int, int] | None
+) -> list[SourceFile]:
+    """Keep the sources assigned to this CI shard, in discovery order."""
+    if shard is None:
+        return sources
+    index, count = shard
+    keep = sharding.select([str(s.path) for s in sources], index, count)
+    selected = [s for s in sources if str(s.path) in keep]
+    display.info(f"Shard {index}/{count}: {len(selected)} of {len(sources)} files")
+    return selected
+
+
+def _submit_batch(
+    targets: list[str],
+    output_dir: str,
+    include: list[str] | None,
+    exclude: list[str] | None,
+    shard: tuple[int, int] | None,
+) -> None:
+    """Submit every matching file as one Batch API job."""
+    sources = _select_shard(_discover(targets, include, exclude), shard)
+    if not sources:
+        return
+
+    display.info(f"Submitting batch job for {len(sources)} files...")
+
+    try:
+        batch_id, request_count, skipped = batch.submit(sources, Path(output_dir))
+    except ValueError:
+        display.error("All matched files are empty")
+        raise typer.Exit(EXIT_INVALID_INPUT)
+    except Exception as e:
+        display.error(f"LLM error: {e}")
+        raise typer.Exit(EXIT_ERROR)
+
+    for source in skipped:
+        display.warning(f"Skipping empty file: {source.path}")
+
+    display.success(f"Submitted batch {batch_id} ({request_count} requests)")
+    display.info(f"Run `docgen batch collect {batch_id}` to write the docs once it completes")
+
+
+def _generate_many(
+    targets: list[str],
+    output_dir: str,
+    include: list[str] | None,
+    exclude: list[str] | None,
+    concurrency: int,
+    similar_mode: str,
+    shard: tuple[int, int] | None,
+) -> None:
+    """Expand targets and document every matching file concurrently.
+
+    A sharded run also exports its entries to docs.json for `docgen merge`.
+    """
+    sources = _select_shard(_discover(targets, include, exclude), shard)
+    if not sources:
+        return
+
+    display.info(f"Generating docs for {len(sources)} files (concurrency {concurrency})...")
+
+    # One storage session for the whole run; each entry is flushed as it finishes
+    with storage.session() as db:
+        written, failures = clients.run(
+            _generate_batch(db, sources, Path(output_dir), concurrency, similar_mode)
+        )
+
+    if shard is not None:
+        storage.export_snapshot()
+
+    for source, reason in failures:
+        display.error(f"Failed: {source.path} ({reason})")
+
+    display.success(f"Generated {written} of {len(sources)} docs in {output_dir}")
+    if cache.enabled:
+        display.info(f"Cache: {cache.stats.hits} hits, {cache.stats.misses} misses")
+    _report_compaction()
+
+    if failures:
+        raise typer.Exit(EXIT_ERROR)
+
+
 @app.command()
 def generate(
-    source_file: Annotated[str, typer.Argument(help="path to source file to document")],
+    sources: Annotated[
+        list[str], typer.Argument(help="source files, directories or glob patterns to document")
+    ],
     output_dir: Annotated[
         str, typer.Option("--output", "-o", help="output directory for docs")
     ] = "docs",
+    include: Annotated[
+        list[str] | None,
+        typer.Option("--include", "-i", help="only document files matching this pattern"),
+    ] = None,
+    exclude: Annotated[
+        list[str] | None,
+        typer.Option("--exclude", "-x", help="skip files and directories matching this pattern"),
+    ] = None,
+    concurrency: Annotated[
+        int, typer.Option("--concurrency", "-j", min=1, help="maximum concurrent LLM requests")
+    ] = DEFAULT_CONCURRENCY,
+    no_cache: Annotated[
+        bool, typer.Option("--no-cache", help="always call the LLM, bypassing the response cache")
+    ] = False,
+    use_batch: Annotated[
+        bool,
+        typer.Option("--batch", help="submit an OpenAI Batch API job instead of calling the LLM now"),
+    ] = False,
+    stream: Annotated[
+        bool, typer.Option("--stream", help="write the doc as the response streams in")
+    ] = False,
+    preview: Annotated[
+        bool, typer.Option("--preview", help="stream and echo the doc to the terminal as it arrives")
+    ] = False,
+    similar: Annotated[
+        str,
+        typer.Option(
+            "--similar",
+            help="for new files nearly identical to a documented one: adapt its doc (adapt), "
+            "copy it (reuse) or document from scratch (off)",
+        ),
+    ] = "adapt",
+    shard: Annotated[
+        str | None,
+        typer.Option("--shard", help="only document shard i of N (e.g. 2/4), balanced by file size"),
+    ] = None,
 ) -> None:
-    """Generate documentation for a source file."""
+    """Generate documentation for source files, directories or globs."""
+    cache.enabled = not no_cache
+    cache.reset_stats()
+    compaction.reset_stats()
+
+    similar = similar.lower()
+    if similar not in SIMILAR_MODES:
+        display.error(f"Invalid --similar mode: {similar}. Use {', '.join(SIMILAR_MODES)}")
+        raise typer.Exit(EXIT_INVALID_INPUT)
+
+    shard_spec = None
+    if shard is not None:
+        try:
+            shard_spec = sharding.parse_shard(shard)
+        except ValueError as e:
+            display.error(str(e))
+            raise typer.Exit(EXIT_INVALID_INPUT)
+
+    # Batch jobs are collected later with `docgen batch collect`
+    if use_batch:
+        _submit_batch(sources, output_dir, include, exclude, shard_spec)
+        return
+
+    # Multiple targets, directories, globs and shards go through the batch pipeline
+    if (
+        shard_spec is not None
+        or len(sources) > 1 or is_glob(sources[0]) or Path(sources[0]).is_dir()
+    ):
+        _generate_many(sources, output_dir, include, exclude, concurrency, similar, shard_spec)
+        return
+
+    source_file = sources[0]
+
     # Validate source file exists
     source_path = Path(source_file)
     if not source_path.exists():
@@ -32,7 +380,8 @@ def generate(
         raise typer.Exit(EXIT_INVALID_INPUT)
 
     # Read source code
-    source_code = source_path.read_text()
+    snapshot = read_source(source_path)
+    source_code = snapshot.text
 
     if not source_code.strip():
         display.error(f"File is empty: {source_file}")
@@ -41,38 +390,57 @@ def generate(
     # Generate documentation via LLM
     display.info(f"Generating docs for {source_path.name}...")
 
+    # Reuse the previous doc so only changed symbols are regenerated
+    entry = find_entry(str(source_path))
+    existing_docs, symbol_hashes = _previous_doc(entry)
+
+    # A new file close to a documented one starts from that file's doc
+    similar_doc = None
+    if entry is None and similar != "off":
+        with storage.session() as db:
+            similar_doc = _find_similar(db, source_path, source_code)
+
+    doc_path = Path(output_dir) / (source_path.stem + ".md")
+
+    # Chunked files are documented concurrently, so only whole-file requests stream
+    streamed = (stream or preview) and not chunking.should_chunk(source_code, source_path.name)
+
+    # Docs are written to a temp file and renamed, so a failed or
+    # interrupted run never leaves a partial doc behind
     try:
-        docs = generate_documentation(source_code, source_path.name)
+        if similar_doc is not None:
+            similar_name = similar_doc.entry.source_file
+            if similar == "reuse":
+                display.info(f"Reusing docs of similar file {similar_name}")
+                metrics.increment("similar_reused")
+                docs = similar_doc.doc
+            else:
+                display.info(f"Adapting docs of similar file {similar_name}")
+                metrics.increment("similar_adapted")
+                docs = adapt_documentation(
+                    source_code, source_path.name, similar_doc.source,
+                    Path(similar_name).name, similar_doc.doc,
+                )
+            with atomic_write(doc_path) as f:
+                f.write(docs)
+        elif streamed:
+            _write_streamed(source_code, source_path.name, doc_path, preview)
+        else:
+            docs = generate_documentation(
+                source_code, source_path.name, existing_docs, symbol_hashes
+            )
+            with atomic_write(doc_path) as f:
+                f.write(docs)
     except Exception as e:
         display.error(f"LLM error: {e}")
         raise typer.Exit(EXIT_ERROR)
 
-    # Write documentation file
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-    doc_filename = source_path.stem + ".md"
-    doc_path = output_path / doc_filename
-    doc_path.write_text(docs)
-
-    # Compute source hash
-    source_hash = hashlib.sha256(source_code.encode()).hexdigest()
+    if cache.stats.hits and not cache.stats.misses:
+        display.info("Reused cached documentation (source unchanged)")
 
     # Update or add storage entry
-    existing = find_entry(str(source_path))
-    if existing:
-        entries = load_entries()
-        for entry in entries:
-            if entry.source_file == str(source_path):
-                entry.doc_file = str(doc_path)
-                entry.status = DocStatus.CURRENT
-                entry.source_hash = source_hash
-        save_entries(entries)
-    else:
-        entry = DocEntry(
-            source_file=str(source_path),
-            doc_file=str(doc_path),
-            source_hash=source_hash,
-        )
-        add_entry(entry)
+    with storage.session() as db:
+        record_entry(db, source_path, doc_path, snapshot)
 
     display.success(f"Generated: {doc_path}")
+    _report_compaction()
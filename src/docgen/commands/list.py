@@ -5,16 +5,34 @@ import typer
 from docgen import display
 from docgen.constants import EXIT_INVALID_INPUT
 from docgen.models import DocStatus
-from docgen.storage import get_entries
+from docgen.storage import SORT_COLUMNS, count_entries, iter_entries
 
 app = typer.Typer()
 
+FORMATS = ("table", "json", "ndjson", "csv")
+
 
 @app.command()
 def list(
     status: Annotated[
         str | None, typer.Option("--status", "-s", help="filter by status (current/stale/error)")
     ] = None,
+    prefix: Annotated[
+        str | None, typer.Option("--prefix", "-p", help="only sources whose path starts with this")
+    ] = None,
+    fmt: Annotated[
+        str, typer.Option("--format", "-f", help="output format (table/json/ndjson/csv)")
+    ] = "table",
+    sort: Annotated[
+        str | None, typer.Option("--sort", help="sort by source, doc, status or generated")
+    ] = None,
+    desc: Annotated[bool, typer.Option("--desc", help="sort in descending order")] = False,
+    limit: Annotated[
+        int | None, typer.Option("--limit", "-n", min=0, help="show at most this many entries")
+    ] = None,
+    offset: Annotated[
+        int, typer.Option("--offset", min=0, help="skip this many entries")
+    ] = 0,
 ) -> None:
     """List all generated documentation entries."""
     # Parse status filter
@@ -26,11 +44,29 @@ def list(
             display.error(f"Invalid status: {status}. Use current, stale, or error")
             raise typer.Exit(EXIT_INVALID_INPUT)
 
-    # Get filtered entries
-    entries = get_entries(status=status_filter)
+    fmt = fmt.lower()
+    if fmt not in FORMATS:
+        display.error(f"Invalid format: {fmt}. Use {', '.join(FORMATS)}")
+        raise typer.Exit(EXIT_INVALID_INPUT)
+
+    if sort and sort not in SORT_COLUMNS:
+        display.error(f"Invalid sort key: {sort}. Use {', '.join(SORT_COLUMNS)}")
+        raise typer.Exit(EXIT_INVALID_INPUT)
+
+    # Filtering, sorting and paging all happen in the database
+    entries = iter_entries(
+        status=status_filter, prefix=prefix, sort=sort, descending=desc, limit=limit, offset=offset
+    )
+
+    if fmt != "table":
+        display.records(entries, fmt)
+        return
 
-    if not entries:
+    counts = count_entries(prefix)
+    if status_filter:
+        counts = {s: n if s == status_filter else 0 for s, n in counts.items()}
+    if not any(counts.values()):
         display.warning("No documentation entries found")
         return
 
-    display.table(entries)
+    display.table(entries, counts, start=offset + 1)
@@ -0,0 +1,113 @@
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from docgen import display, objects, storage
+from docgen.constants import EXIT_ERROR, EXIT_INVALID_INPUT
+from docgen.files import atomic_write
+from docgen.models import DocEntry, DocStatus
+
+app = typer.Typer()
+
+
+def _manifest_path(shard: Path) -> Path:
+    """Return a shard's docs.json, given the manifest itself or the project directory.
+
+    Raises:
+        ValueError: If a manifest isn't inside a project's .docgen directory, since
+            its docs and snapshots are looked up relative to that project.
+    """
+    if not shard.is_file():
+        return shard / ".docgen" / "docs.json"
+    if shard.parent.name != storage.STORAGE_DIR.name:
+        raise ValueError(
+            f"Manifest outside a .docgen directory: {shard}. Pass the shard's project directory"
+        )
+    return shard
+
+
+def _newer(candidate: DocEntry, current: DocEntry) -> bool:
+    """Return True if candidate should replace current.
+
+    The latest generated_at wins. On a tie, a shard that found the docs
+    stale or failing wins over one that left them current.
+    """
+    return (candidate.generated_at, candidate.status != DocStatus.CURRENT) > (
+        current.generated_at, current.status != DocStatus.CURRENT
+    )
+
+
+def _copy_doc(root: Path, entry: DocEntry) -> bool:
+    """Copy an entry's doc from a shard's project directory into this one.
+
+    Returns:
+        False if the shard doesn't have the doc file.
+    """
+    target = Path(entry.doc_file)
+    source = target if target.is_absolute() else root / target
+    if not source.is_file():
+        return False
+    if source.resolve() != target.resolve():
+        with atomic_write(target, binary=True) as f:
+            f.write(source.read_bytes())
+    return True
+
+
+@app.command()
+def merge(
+    shards: Annotated[
+        list[str],
+        typer.Argument(help="shard project directories, or the .docgen/docs.json inside them"),
+    ],
+) -> None:
+    """Merge the manifests and docs of CI shards into this project."""
+    manifests: list[tuple[Path, list[DocEntry]]] = []
+    for shard in shards:
+        try:
+            path = _manifest_path(Path(shard))
+            if not path.is_file():
+                display.error(f"Manifest not found: {path}")
+                raise typer.Exit(EXIT_INVALID_INPUT)
+            manifests.append((path.parent.parent, storage.read_manifest(path)))
+        except ValueError as e:
+            display.error(str(e))
+            raise typer.Exit(EXIT_INVALID_INPUT)
+
+    # The newest generation of each source wins across shards
+    winners: dict[str, tuple[Path, DocEntry]] = {}
+    conflicts = 0
+    for root, entries in manifests:
+        for entry in entries:
+            current = winners.get(entry.source_file)
+            # Shards that recorded the same entry agree; only differences are conflicts
+            if current is not None and current[1] != entry:
+                conflicts += 1
+            if current is None or _newer(entry, current[1]):
+                winners[entry.source_file] = (root, entry)
+
+    merged = 0
+    missing: list[DocEntry] = []
+    with storage.session() as db:
+        for source_file, (root, entry) in winners.items():
+            local = db.get(source_file)
+            if local is not None and not _newer(entry, local):
+                continue
+            if not _copy_doc(root, entry):
+                missing.append(entry)
+                continue
+            # Bring the documented source along so later checks can diff against it
+            objects.copy_from(root / ".docgen" / "objects", entry.source_hash)
+            db.put(entry)
+            merged += 1
+
+    storage.export_snapshot()
+
+    display.success(f"Merged {merged} entries from {len(manifests)} manifests")
+    if conflicts:
+        display.info(f"{conflicts} duplicate entries resolved by generated_at")
+    for entry in missing:
+        display.error(f"Doc file missing: {entry.doc_file} (for {entry.source_file})")
+
+    if missing:
+        raise typer.Exit(EXIT_ERROR)
@@ -0,0 +1,128 @@
+import io
+import os
+import socket
+import socketserver
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+import click
+import typer
+from rich.console import Console
+
+from docgen import clients, display, remote, storage
+from docgen.constants import EXIT_ERROR
+
+app = typer.Typer()
+
+
+def run_command(argv: list[str], tty: bool = False, width: int | None = None) -> dict:
+    """Run a CLI command in this process, capturing its output and exit code."""
+    from docgen.commands import app as cli
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    console = display.console
+    display.console = Console(file=stdout, force_terminal=tty, width=width)
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                cli(argv, prog_name="docgen")
+                exit_code = 0
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception:
+                traceback.print_exc()
+                exit_code = EXIT_ERROR
+    finally:
+        display.console = console
+
+    return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        data = self.rfile.read()
+        if not data:
+            # Liveness probe from another server starting up
+            return
+        request = remote.decode(data)
+        argv = request["argv"]
+
+        # Paths and storage are relative to the server's project directory
+        if request["cwd"] != os.getcwd() or not argv or argv[0] not in remote.FORWARDED_COMMANDS:
+            response = {"refused": True}
+        else:
+            response = run_command(argv, request.get("tty", False), request.get("width"))
+
+        self.wfile.write(remote.encode(response))
+
+
+def _is_listening(path: Path) -> bool:
+    """Return True if a server already answers on the socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def make_server(path: Path) -> socketserver.UnixStreamServer:
+    """Bind the server socket, replacing a stale one left by a dead server.
+
+    Requests are handled one at a time, since commands share the display
+    console and process-wide settings such as the response cache toggle.
+
+    Raises:
+        FileExistsError: If another server is already listening on path.
+    """
+    if path.exists():
+        if _is_listening(path):
+            raise FileExistsError(path)
+        path.unlink()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Create the socket owner-only, so no other user can connect before a chmod
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(str(path), _Handler)
+    finally:
+        os.umask(umask)
+    return server
+
+
+def _warm_up() -> None:
+    """Load the forwarded commands and open the LLM client ahead of the first request."""
+    from docgen.commands import app as cli
+
+    group = typer.main.get_command(cli)
+    ctx = click.Context(group)
+    for name in remote.FORWARDED_COMMANDS:
+        group.get_command(ctx, name)
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if api_key:
+        clients.get_client(api_key)
+
+
+@app.command()
+def serve() -> None:
+    """Keep docgen loaded and answer generate, check and list over a local socket."""
+    path = storage.STORAGE_DIR / remote.SOCKET_NAME
+
+    try:
+        server = make_server(path)
+    except FileExistsError:
+        display.error(f"A docgen server is already running on {path}")
+        raise typer.Exit(EXIT_ERROR)
+
+    _warm_up()
+    display.info(f"Serving on {path}, press Ctrl+C to stop...")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        display.info("Server stopped")
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
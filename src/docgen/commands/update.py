@@ -1,6 +1,4 @@
 import typer
-import json
-import hashlib
 from pathlib import Path
 
 app = typer.Typer()
@@ -16,19 +14,20 @@ def update(source_file, output_dir="docs"):
     path = Path(source_file)
 
     # BAD: no input validation -- no check if file exists
-    source_code = path.read_text()
-
-    # BAD: inline LLM call instead of using llm.py module
-    from openai import OpenAI
-    client = OpenAI()
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "Generate docs."},
-            {"role": "user", "content": source_code},
-        ],
-    )
-    docs = response.choices[0].message.content
+    from docgen.hashing import read_source
+    snapshot = read_source(path)
+    source_code = snapshot.text
+
+    # Only symbols that changed since the last run are sent to the LLM
+    from docgen.llm import generate_documentation
+    from docgen.storage import find_entry
+    existing = find_entry(source_file)
+    existing_docs = None
+    symbol_hashes = None
+    if existing and existing.symbol_hashes and Path(existing.doc_file).exists():
+        existing_docs = Path(existing.doc_file).read_text()
+        symbol_hashes = existing.symbol_hashes
+    docs = generate_documentation(source_code, path.name, existing_docs, symbol_hashes)
 
     # BAD: no error handling around file operations
     output_path = Path(output_dir)
@@ -36,25 +35,12 @@ def update(source_file, output_dir="docs"):
     doc_path = output_path / (path.stem + ".md")
     doc_path.write_text(docs)
 
-    # BAD: directly manipulating storage instead of using storage module
-    from docgen.storage import STORAGE_PATH, _ensure_storage_exists
-    _ensure_storage_exists()
-    data = json.loads(STORAGE_PATH.read_text())
-    found = False
-    for entry in data["entries"]:
-        if entry["source_file"] == source_file:
-            entry["status"] = "current"
-            entry["source_hash"] = hashlib.sha256(source_code.encode()).hexdigest()
-            found = True
-    if not found:
-        data["entries"].append({
-            "source_file": source_file,
-            "doc_file": str(doc_path),
-            "status": "current",
-            "generated_at": "unknown",
-            "source_hash": hashlib.sha256(source_code.encode()).hexdigest(),
-        })
-    STORAGE_PATH.write_text(json.dumps(data))
+    # Recorded the same way as generate, so the hash, stat, signature and
+    # snapshot all describe the source the doc was written from
+    from docgen.commands.generate import record_entry
+    from docgen.storage import session
+    with session() as db:
+        record_entry(db, path, doc_path, snapshot)
 
     # BAD: wrong exit code (using 1 for success)
     print("Done!")
@@ -0,0 +1,164 @@
+import copy
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from docgen import chunking, display, objects, similarity, storage
+from docgen.files import atomic_write
+from docgen.hashing import git_blob_hash, read_source
+from docgen.llm import generate_documentation
+from docgen.models import DocEntry, DocStatus
+from docgen.signatures import api_signature
+from docgen.watcher import (
+    DEFAULT_POLL_INTERVAL,
+    Debouncer,
+    InotifyWatcher,
+    PollingWatcher,
+    create_watcher,
+)
+
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_CONCURRENCY = 4
+
+# How long to block waiting for file events when nothing else is due
+IDLE_TIMEOUT = 0.5
+
+app = typer.Typer()
+
+
+def _regenerate(entry: DocEntry) -> tuple[DocEntry, bool]:
+    """Regenerate the doc for a changed source, runs on a worker thread.
+
+    Returns:
+        The updated entry and whether the doc was regenerated (False when
+        the write didn't change the content).
+    """
+    source_path = Path(entry.source_file)
+    snapshot = read_source(source_path)
+
+    entry.source_mtime_ns = snapshot.mtime_ns
+    entry.source_size = snapshot.size
+    if snapshot.hash == entry.source_hash:
+        return entry, False
+
+    # Only symbols that changed since the last run are sent to the LLM
+    doc_path = Path(entry.doc_file)
+    existing_docs = doc_path.read_text() if entry.symbol_hashes and doc_path.exists() else None
+    docs = generate_documentation(
+        snapshot.text, source_path.name, existing_docs, entry.symbol_hashes or None
+    )
+    with atomic_write(doc_path) as f:
+        f.write(docs)
+
+    entry.status = DocStatus.CURRENT
+    entry.generated_at = datetime.now()
+    entry.source_hash = snapshot.hash
+    data = snapshot.text.encode()
+    entry.git_blob = git_blob_hash(data)
+    objects.put(data, snapshot.hash)
+    entry.symbol_hashes = chunking.symbol_hashes(snapshot.text, source_path.name)
+    entry.simhash = similarity.simhash(snapshot.text)
+    entry.api_signature = api_signature(snapshot.text, source_path.name)
+    return entry, True
+
+
+def _finish(db: storage.Session, source_file: str, future: Future) -> None:
+    """Record the outcome of a regeneration and persist it right away."""
+    try:
+        entry, regenerated = future.result()
+    except Exception as e:
+        display.error(f"Failed: {source_file} ({e})")
+        return
+
+    db.put(entry)
+    db.flush()
+    if regenerated:
+        display.success(f"Regenerated: {entry.doc_file}")
+
+
+def _watch(
+    db: storage.Session,
+    watcher: InotifyWatcher | PollingWatcher,
+    debounce: float,
+    concurrency: int,
+    stop: threading.Event,
+) -> None:
+    """Run the event loop until stop is set.
+
+    Events are debounced per file. A file is never regenerated twice at
+    once; if it changes again while in flight it is queued once more.
+    Storage is only touched from this thread.
+    """
+    debouncer = Debouncer(debounce)
+    in_flight: dict[str, Future] = {}
+    requeue: set[str] = set()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while not stop.is_set():
+            timeout = debouncer.timeout()
+            timeout = IDLE_TIMEOUT if timeout is None else min(timeout, IDLE_TIMEOUT)
+            if in_flight:
+                timeout = min(timeout, 0.05)
+
+            for source_file in watcher.poll(timeout):
+                debouncer.touch(source_file)
+
+            for source_file in debouncer.ready():
+                if source_file in in_flight:
+                    requeue.add(source_file)
+                    continue
+                entry = db.get(source_file)
+                if entry is not None:
+                    in_flight[source_file] = pool.submit(_regenerate, copy.deepcopy(entry))
+
+            for source_file, future in list(in_flight.items()):
+                if not future.done():
+                    continue
+                del in_flight[source_file]
+                _finish(db, source_file, future)
+                if source_file in requeue:
+                    requeue.discard(source_file)
+                    debouncer.touch(source_file)
+
+        for source_file, future in in_flight.items():
+            _finish(db, source_file, future)
+
+
+@app.command()
+def watch(
+    debounce: Annotated[
+        float, typer.Option("--debounce", min=0, help="seconds a file must stay quiet before regenerating")
+    ] = DEFAULT_DEBOUNCE,
+    concurrency: Annotated[
+        int, typer.Option("--concurrency", "-j", min=1, help="maximum concurrent regenerations")
+    ] = DEFAULT_CONCURRENCY,
+    polling: Annotated[
+        bool, typer.Option("--polling", help="poll file stats instead of using inotify")
+    ] = False,
+    poll_interval: Annotated[
+        float, typer.Option("--poll-interval", min=0.05, help="seconds between polling scans")
+    ] = DEFAULT_POLL_INTERVAL,
+) -> None:
+    """Watch tracked source files and regenerate their docs as they change."""
+    # One session for the lifetime of the daemon, flushed after every regeneration
+    with storage.session() as db:
+        sources = [entry.source_file for entry in db.entries()]
+        if not sources:
+            display.warning("No documentation entries found")
+            return
+
+        watcher = create_watcher(sources, polling=polling, interval=poll_interval)
+        mode = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+        display.info(f"Watching {len(sources)} files ({mode}), press Ctrl+C to stop...")
+
+        stop = threading.Event()
+        try:
+            _watch(db, watcher, debounce, concurrency, stop)
+        except KeyboardInterrupt:
+            display.info("Stopped watching")
+        finally:
+            watcher.close()
@@ -0,0 +1,190 @@
+import os
+import re
+from dataclasses import dataclass
+
+from docgen import metrics
+
+# Every compaction step, in the order they run
+STEPS = ("license", "banners", "dedupe", "literals", "whitespace")
+
+# Comma-separated steps to run; "none" sends sources unchanged
+ENABLED_STEPS = tuple(
+    step.strip()
+    for step in os.environ.get("DOCGEN_COMPACT", ",".join(STEPS)).lower().split(",")
+    if step.strip() in STEPS
+)
+
+# String literals longer than this many characters are truncated
+MAX_LITERAL = int(os.environ.get("DOCGEN_COMPACT_MAX_LITERAL", "200"))
+
+# Runs of more data-only lines than this (number tables, lists of strings) are cut short
+MAX_DATA_LINES = 10
+
+# Repeated comment blocks shorter than this are kept, since they are cheap
+MIN_DEDUPE_LINES = 3
+
+_COMMENT_RE = re.compile(r"^\s*(#|//|/\*|\*|--|;)")
+_BANNER_RE = re.compile(r"^\s*(#|//|/\*|\*|--|;)\s*([-=*#/~_+.])\2{3,}\s*(\*/)?\s*$")
+_ENCODING_RE = re.compile(r"^#.*coding[:=]")
+_LICENSE_RE = re.compile(
+    r"copyright|licen[sc]e|spdx-license-identifier|all rights reserved", re.IGNORECASE
+)
+_LITERAL_RE = re.compile(r"""(["'])((?:\\.|(?!\1)[^\\\n]){%d,})\1""" % (MAX_LITERAL + 1))
+_ITEM = r"""(?:[-+]?(?:0[xX][0-9a-fA-F]+|\d[\d_]*(?:\.\d*)?(?:[eE][-+]?\d+)?)|"[^"]*"|'[^']*')"""
+_DATA_RE = re.compile(rf"^\s*[\[({{]?\s*{_ITEM}(?:\s*[,:]\s*{_ITEM})*\s*[\])}}]?\s*,?\s*$")
+
+
+@dataclass
+class CompactionStats:
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+stats = CompactionStats()
+
+
+def reset_stats() -> None:
+    global stats
+    stats = CompactionStats()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens in a text, with the scheduler's four characters per token."""
+    return len(text) // 4
+
+
+def _is_comment(line: str) -> bool:
+    return bool(_COMMENT_RE.match(line))
+
+
+def strip_license(lines: list[str]) -> list[str]:
+    """Remove a leading comment block that holds a license or copyright notice."""
+    start = 0
+    # Keep a shebang or encoding line
+    while start < len(lines) and (
+        lines[start].startswith("#!") or _ENCODING_RE.match(lines[start])
+    ):
+        start += 1
+
+    end = start
+    while end < len(lines) and _is_comment(lines[end]):
+        end += 1
+
+    if end > start and _LICENSE_RE.search("".join(lines[start:end])):
+        return lines[:start] + lines[end:]
+    return lines
+
+
+def strip_banners(lines: list[str]) -> list[str]:
+    """Remove comment lines made only of decoration such as # ---- or //=====."""
+    return [line for line in lines if not _BANNER_RE.match(line)]
+
+
+def dedupe_comments(lines: list[str]) -> list[str]:
+    """Drop comment blocks identical to one seen earlier, e.g. a repeated license."""
+    seen = set()
+    result = []
+    i = 0
+    while i < len(lines):
+        if not _is_comment(lines[i]):
+            result.append(lines[i])
+            i += 1
+            continue
+
+        end = i
+        while end < len(lines) and _is_comment(lines[end]):
+            end += 1
+        block = tuple(line.strip() for line in lines[i:end])
+        if len(block) < MIN_DEDUPE_LINES or block not in seen:
+            seen.add(block)
+            result.extend(lines[i:end])
+        i = end
+    return result
+
+
+def _truncate_literal(match: re.Match) -> str:
+    quote, body = match.group(1), match.group(2)
+    return f"{quote}{body[:40]}...[{len(body) - 40} chars truncated]{quote}"
+
+
+def truncate_literals(lines: list[str]) -> list[str]:
+    """Shorten long string literals and long runs of data-only lines."""
+    result = []
+    run: list[str] = []
+
+    def _flush() -> None:
+        if len(run) > MAX_DATA_LINES:
+            indent = run[0][:len(run[0]) - len(run[0].lstrip())]
+            result.extend(run[:3])
+            result.append(f"{indent}... ({len(run) - 3} more lines of data)\n")
+        else:
+            result.extend(run)
+        run.clear()
+
+    for line in lines:
+        if _DATA_RE.match(line):
+            run.append(line)
+            continue
+        _flush()
+        result.append(_LITERAL_RE.sub(_truncate_literal, line))
+    _flush()
+    return result
+
+
+def collapse_whitespace(lines: list[str]) -> list[str]:
+    """Strip trailing whitespace and collapse runs of blank lines into one."""
+    result = []
+    for line in lines:
+        line = line.rstrip() + "\n"
+        if line == "\n" and (not result or result[-1] == "\n"):
+            continue
+        result.append(line)
+    while result and result[-1] == "\n":
+        result.pop()
+    return result
+
+
+_STEP_FUNCTIONS = {
+    "license": strip_license,
+    "banners": strip_banners,
+    "dedupe": dedupe_comments,
+    "literals": truncate_literals,
+    "whitespace": collapse_whitespace,
+}
+
+
+def compact(source_code: str, steps: tuple[str, ...] | None = None) -> str:
+    """Remove boilerplate that costs prompt tokens without helping the LLM.
+
+    Indentation and code are left alone, so the result still reads as the
+    same program.
+
+    Args:
+        source_code: The source text to send in a prompt.
+        steps: Steps of STEPS to run. Defaults to those enabled by DOCGEN_COMPACT.
+    """
+    steps = ENABLED_STEPS if steps is None else steps
+    if not steps:
+        return source_code
+
+    lines = source_code.splitlines(keepends=True)
+    for step in STEPS:
+        if step in steps:
+            lines = _STEP_FUNCTIONS[step](lines)
+    return "".join(lines).rstrip("\n")
+
+
+def compact_prompt(source_code: str, filename: str | None = None) -> str:
+    """Compact a source for a prompt and record the tokens saved for the file."""
+    compacted = compact(source_code)
+    before, after = estimate_tokens(source_code), estimate_tokens(compacted)
+    stats.tokens_before += before
+    stats.tokens_after += after
+    metrics.increment("compaction_tokens_saved", before - after)
+    if filename:
+        metrics.increment_file(filename, "compaction_tokens_saved", before - after)
+    return compacted
@@ -1,8 +1,17 @@
+import csv
+import json
+import sys
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, TextIO
+
 from rich.console import Console
 from rich.table import Table
 
 from docgen.models import DocEntry, DocStatus
 
+if TYPE_CHECKING:
+    from rich.progress import Progress
+
 console = Console()
 
 STATUS_COLORS = {
@@ -11,6 +20,16 @@ STATUS_COLORS = {
     DocStatus.ERROR: "red",
 }
 
+# Fields written by records(), in column order
+RECORD_FIELDS = ("source_file", "doc_file", "status", "generated_at", "source_hash")
+
+CHECK_COLORS = {
+    "current": "green",
+    "stale": "yellow",
+    "missing": "red",
+    "error": "red",
+}
+
 
 def success(message: str) -> None:
     """Display a success message."""
@@ -32,8 +51,44 @@ def info(message: str) -> None:
     console.print(message)
 
 
-def table(entries: list[DocEntry]) -> None:
-    """Display documentation entries in a formatted table."""
+def preview(text: str) -> None:
+    """Echo streamed text as-is, without a trailing newline or markup."""
+    console.print(text, end="", markup=False, highlight=False, soft_wrap=True)
+
+
+def progress() -> "Progress":
+    """Create a live progress bar for batch operations."""
+    # Imported here to keep it off the startup path of quick commands
+    from rich.progress import (
+        BarColumn,
+        MofNCompleteColumn,
+        Progress,
+        SpinnerColumn,
+        TextColumn,
+        TimeElapsedColumn,
+    )
+
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+        console=console,
+    )
+
+
+def table(
+    entries: Iterable[DocEntry], counts: dict[DocStatus, int] | None = None, start: int = 1
+) -> None:
+    """Display documentation entries in a formatted table.
+
+    Args:
+        entries: Entries to show, in order.
+        counts: Entries per status across all pages, for the summary.
+            Counted from entries when omitted.
+        start: Row number of the first entry.
+    """
     tbl = Table()
     tbl.add_column("#", style="dim", width=4)
     tbl.add_column("Source File")
@@ -41,8 +96,10 @@ def table(entries: list[DocEntry]) -> None:
     tbl.add_column("Status")
     tbl.add_column("Generated")
 
-    for idx, entry in enumerate(entries, start=1):
+    shown = dict.fromkeys(DocStatus, 0)
+    for idx, entry in enumerate(entries, start=start):
         status_color = STATUS_COLORS[entry.status]
+        shown[entry.status] += 1
 
         generated_str = entry.generated_at.strftime("%b %d %H:%M")
 
@@ -57,7 +114,112 @@ def table(entries: list[DocEntry]) -> None:
     console.print(tbl)
 
     # Summary
-    total = len(entries)
-    current_count = sum(1 for e in entries if e.status == DocStatus.CURRENT)
-    stale_count = sum(1 for e in entries if e.status == DocStatus.STALE)
-    info(f"\n  {total} docs ({current_count} current, {stale_count} stale)")
+    if counts is None:
+        counts = shown
+    total = sum(counts.values())
+    summary = (
+        f"\n  {total} docs ({counts[DocStatus.CURRENT]} current, "
+        f"{counts[DocStatus.STALE]} stale)"
+    )
+    if sum(shown.values()) < total:
+        summary += f", showing {sum(shown.values())}"
+    info(summary)
+
+
+def _record(entry: DocEntry) -> dict:
+    return {
+        "source_file": entry.source_file,
+        "doc_file": entry.doc_file,
+        "status": entry.status.value,
+        "generated_at": entry.generated_at.isoformat(),
+        "source_hash": entry.source_hash,
+    }
+
+
+def records(entries: Iterable[DocEntry], fmt: str, file: TextIO | None = None) -> None:
+    """Write entries for scripts as json, ndjson or csv, one row at a time.
+
+    Rows are written as they are read, so output starts immediately and
+    memory use doesn't grow with the number of entries.
+    """
+    out = file or sys.stdout
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=RECORD_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        for entry in entries:
+            writer.writerow(_record(entry))
+    elif fmt == "ndjson":
+        for entry in entries:
+            out.write(json.dumps(_record(entry)) + "\n")
+    else:
+        separator = "[\n  "
+        for entry in entries:
+            out.write(separator + json.dumps(_record(entry)))
+            separator = ",\n  "
+        out.write("[]\n" if separator.startswith("[") else "\n]\n")
+
+
+def check_summary(results: list[tuple[str, str, str]]) -> None:
+    """Display the outcome of a multi-file check.
+
+    Args:
+        results: (source file, outcome, detail) triples. Only files that
+            need attention are listed; current files are just counted.
+    """
+    flagged = [r for r in results if r[1] != "current"]
+
+    if flagged:
+        tbl = Table()
+        tbl.add_column("Source File")
+        tbl.add_column("Result")
+        tbl.add_column("Detail")
+        for source_file, outcome, detail in flagged:
+            color = CHECK_COLORS[outcome]
+            tbl.add_row(source_file, f"[{color}]{outcome}[/{color}]", detail)
+        console.print(tbl)
+
+    counts = {outcome: 0 for outcome in CHECK_COLORS}
+    for _, outcome, _ in results:
+        counts[outcome] += 1
+    info(
+        f"\n  {len(results)} checked ({counts['current']} current, {counts['stale']} stale, "
+        f"{counts['missing']} missing, {counts['error']} errors)"
+    )
+
+
+def profile_summary(report: dict) -> None:
+    """Display per-phase timings, token usage and estimated cost of a run.
+
+    Args:
+        report: Collected metrics, as returned by metrics.report().
+    """
+    tbl = Table(title="Profile")
+    tbl.add_column("Phase")
+    tbl.add_column("Time", justify="right")
+    tbl.add_column("Calls", justify="right")
+    for name, stats in report["phases"].items():
+        tbl.add_row(name, f"{stats['seconds']:.3f}s", str(stats["calls"]))
+    console.print(tbl)
+
+    if report["models"]:
+        tbl = Table()
+        tbl.add_column("Model")
+        tbl.add_column("Requests", justify="right")
+        tbl.add_column("Prompt tokens", justify="right")
+        tbl.add_column("Completion tokens", justify="right")
+        tbl.add_column("Cost", justify="right")
+        for model, usage in report["models"].items():
+            cost = "unknown" if usage["cost_usd"] is None else f"${usage['cost_usd']:.4f}"
+            tbl.add_row(
+                model,
+                str(usage["requests"]),
+                str(usage["prompt_tokens"]),
+                str(usage["completion_tokens"]),
+                cost,
+            )
+        console.print(tbl)
+
+    counters = ", ".join(f"{n} {name.replace('_', ' ')}" for name, n in report["counters"].items())
+    info(f"\n  {report['wall_seconds']:.3f}s wall, ${report['cost_usd']:.4f} estimated cost")
+    if counters:
+        info(f"  {counters}")
@@ -0,0 +1,9 @@
+def load() -> None:
+    """Load variables from a .env file into os.environ.
+
+    Variables already set in the environment take precedence. Called before
+    the LLM stack is imported so DOCGEN_* settings in .env apply everywhere.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
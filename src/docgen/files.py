@@ -0,0 +1,52 @@
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO
+
+from docgen import metrics
+
+# The process umask, read once: setting it to read it isn't thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _target_mode(path: Path) -> int:
+    """Return the mode a file written to path should have.
+
+    An existing file keeps its permissions; a new one gets what open() would
+    give it, rather than the owner-only mode of a temp file.
+    """
+    try:
+        return path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+@contextmanager
+def atomic_write(path: Path, binary: bool = False) -> Iterator[IO]:
+    """Open a temp file next to path and rename it over path on success.
+
+    Readers only ever see the previous file or the complete new one. If the
+    block raises (including KeyboardInterrupt), the temp file is removed and
+    any existing file at path is left untouched. With binary=True the temp
+    file is opened for bytes instead of text. The file ends up with the
+    previous file's permissions, or the umask default for a new file.
+    """
+    start = time.perf_counter()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    # Time spent in the caller's block (e.g. waiting on a stream) isn't write time
+    elapsed = time.perf_counter() - start
+    try:
+        os.fchmod(fd, _target_mode(path))
+        with os.fdopen(fd, "wb" if binary else "w") as f:
+            yield f
+            start = time.perf_counter()
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    metrics.add_time("write", elapsed + time.perf_counter() - start)
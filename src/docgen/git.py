@@ -0,0 +1,78 @@
+import subprocess
+from pathlib import Path
+
+from docgen import metrics
+
+# Regular files; symlinks (120000) and submodules (160000) have no source to compare
+_FILE_MODES = ("100644", "100755")
+
+
+def _git(*args: str) -> str | None:
+    """Run a git command, returning its output or None if git or the command failed."""
+    try:
+        result = subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout
+
+
+def _paths(output: str) -> list[str]:
+    """Split NUL-separated git output (-z) into its paths."""
+    return [path for path in output.split("\0") if path]
+
+
+def repo_root() -> Path | None:
+    """Return the top of the git work tree holding the current directory, or None."""
+    output = _git("rev-parse", "--show-toplevel")
+    return Path(output.strip()) if output else None
+
+
+def path_key(path: str | Path) -> str:
+    """Normalize a path so entries and git output can be matched."""
+    return str(Path(path).resolve())
+
+
+@metrics.timed("git")
+def tracked_files(root: Path) -> dict[str, str | None]:
+    """Return the blob ID of every tracked file whose working copy matches the index.
+
+    Files modified since they were last staged map to None, since their
+    index blob no longer describes them. Untracked files are left out.
+    Keys are resolved absolute paths.
+    """
+    staged = _git("-C", str(root), "ls-files", "--stage", "-z")
+    modified = _git("-C", str(root), "diff-files", "--name-only", "-z")
+    if staged is None or modified is None:
+        return {}
+
+    dirty = set(_paths(modified))
+    blobs: dict[str, str | None] = {}
+    for record in _paths(staged):
+        info, name = record.split("\t", 1)
+        mode, blob, stage = info.split()
+        if mode not in _FILE_MODES:
+            continue
+        # Unmerged paths list several stages; none of them is the working copy
+        clean = stage == "0" and name not in dirty
+        blobs[path_key(root / name)] = blob if clean else None
+    return blobs
+
+
+@metrics.timed("git")
+def changed_since(root: Path, ref: str) -> set[str]:
+    """Return the files that differ between a ref and the working tree.
+
+    Staged and unstaged edits count, as do files added, deleted or renamed
+    since the ref. Paths are resolved absolute paths.
+
+    Raises:
+        ValueError: If the ref doesn't name a commit.
+    """
+    if _git("-C", str(root), "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}") is None:
+        raise ValueError(f"Unknown git ref: {ref}")
+    output = _git("-C", str(root), "diff", "--name-only", "--no-renames", "-z", ref, "--")
+    if output is None:
+        raise ValueError(f"Could not diff against {ref}")
+    return {path_key(root / name) for name in _paths(output)}
@@ -0,0 +1,97 @@
+import hashlib
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from docgen import metrics
+from docgen.models import DocEntry
+
+# Read large files in 1 MiB slices so hashing never holds a whole file in memory
+CHUNK_SIZE = 1024 * 1024
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+
+@dataclass(frozen=True)
+class SourceSnapshot:
+    text: str
+    hash: str
+    mtime_ns: int
+    size: int
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the SHA-256 hex digest of raw source bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def git_blob_hash(data: bytes) -> str:
+    """Return the object ID git assigns these bytes when stored as a blob."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+@metrics.timed("hash")
+def hash_file(path: str | Path) -> str:
+    """Hash a file with chunked, memory-mapped reads."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for offset in range(0, size, CHUNK_SIZE):
+                    digest.update(view[offset:offset + CHUNK_SIZE])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def _hash_or_none(path: str) -> str | None:
+    """Hash a file, returning None if it can't be read."""
+    try:
+        return hash_file(path)
+    except OSError:
+        return None
+
+
+@metrics.timed("hash")
+def hash_files(paths: list[str], workers: int | None = None) -> dict[str, str | None]:
+    """Hash many files, spreading the work over a process pool for large sets.
+
+    Returns:
+        A mapping of path to hex digest, or None for unreadable files.
+    """
+    if len(paths) < PARALLEL_THRESHOLD:
+        return {path: _hash_or_none(path) for path in paths}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+        return dict(zip(paths, pool.map(_hash_or_none, paths, chunksize=chunksize)))
+
+
+@metrics.timed("read")
+def read_source(path: str | Path) -> SourceSnapshot:
+    """Read a source file once, returning its text, hash and stat fingerprint."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+    return SourceSnapshot(
+        text=data.decode(),
+        hash=hash_bytes(data),
+        mtime_ns=st.st_mtime_ns,
+        size=st.st_size,
+    )
+
+
+def stat_matches(entry: DocEntry, st: os.stat_result) -> bool:
+    """Return True if a file's size and mtime match what was recorded for the entry."""
+    return (
+        entry.source_mtime_ns != 0
+        and entry.source_mtime_ns == st.st_mtime_ns
+        and entry.source_size == st.st_size
+    )
@@ -0,0 +1,147 @@
+import ast
+import os
+from collections import deque
+from collections.abc import Iterable
+from pathlib import Path
+
+from docgen import metrics, storage
+from docgen.hashing import read_source
+from docgen.models import ImportRecord
+
+
+def module_name(path: Path) -> str:
+    """Return the dotted module name of a source file.
+
+    The name is built from the enclosing packages, i.e. the parent
+    directories that contain an __init__.py.
+    """
+    path = path.absolute()
+    parts = [] if path.stem == "__init__" else [path.stem]
+    parent = path.parent
+    while (parent / "__init__.py").exists():
+        parts.insert(0, parent.name)
+        parent = parent.parent
+    return ".".join(parts)
+
+
+def parse_imports(source_code: str, module: str, is_package: bool = False) -> list[str]:
+    """Return the absolute names a module imports, including imports inside functions.
+
+    `from pkg import name` is recorded as "pkg.name", since name may be a
+    submodule; resolve() falls back to "pkg" when it isn't. Relative
+    imports are made absolute against the module's package.
+    """
+    try:
+        tree = ast.parse(source_code)
+    except SyntaxError:
+        return []
+
+    package = module if is_package else module.rpartition(".")[0]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                # Each level beyond the first climbs one package up
+                parts = package.split(".") if package else []
+                parts = parts[:max(0, len(parts) - node.level + 1)]
+                base = ".".join([*parts, base] if base else parts)
+            for alias in node.names:
+                if alias.name == "*":
+                    names.add(base)
+                else:
+                    names.add(f"{base}.{alias.name}" if base else alias.name)
+    return sorted(n for n in names if n)
+
+
+def resolve(name: str, modules: dict[str, str]) -> str | None:
+    """Map an imported name to the tracked source file that defines it, if any."""
+    while name:
+        if name in modules:
+            return modules[name]
+        name = name.rpartition(".")[0]
+    return None
+
+
+class ImportGraph:
+    """Reverse import edges between tracked Python sources."""
+
+    def __init__(self, records: Iterable[ImportRecord]) -> None:
+        records = list(records)
+        modules = {r.module: r.source_file for r in records}
+        self.dependents: dict[str, set[str]] = {}
+        for record in records:
+            for name in record.imports:
+                target = resolve(name, modules)
+                if target is not None and target != record.source_file:
+                    self.dependents.setdefault(target, set()).add(record.source_file)
+
+    def affected(self, changed: Iterable[str]) -> dict[str, tuple[int, str]]:
+        """Find every source that imports a changed source, directly or transitively.
+
+        Returns:
+            Dependent source file -> (import distance, changed source it
+            depends on). Changed sources themselves are not included.
+        """
+        changed = set(changed)
+        found: dict[str, tuple[int, str]] = {}
+        queue = deque((source, 0, source) for source in sorted(changed))
+        while queue:
+            source, distance, origin = queue.popleft()
+            for dependent in sorted(self.dependents.get(source, ())):
+                if dependent in changed or dependent in found:
+                    continue
+                found[dependent] = (distance + 1, origin)
+                queue.append((dependent, distance + 1, origin))
+        return found
+
+
+@metrics.timed("imports")
+def update_graph(source_files: Iterable[str]) -> ImportGraph:
+    """Bring the cached import graph up to date and return it.
+
+    Only files whose size or mtime changed are read, and only those whose
+    content hash changed are parsed again. Records of files that are no
+    longer tracked are dropped.
+    """
+    records = storage.load_imports()
+    tracked = set()
+    updated = []
+
+    for source_file in source_files:
+        if not source_file.endswith(".py"):
+            continue
+        tracked.add(source_file)
+        record = records.get(source_file)
+        try:
+            st = os.stat(source_file)
+            if (
+                record is not None
+                and record.source_mtime_ns == st.st_mtime_ns
+                and record.source_size == st.st_size
+            ):
+                continue
+            snapshot = read_source(source_file)
+        except (OSError, UnicodeDecodeError):
+            tracked.discard(source_file)
+            continue
+
+        if record is None or record.source_hash != snapshot.hash:
+            path = Path(source_file)
+            module = module_name(path)
+            record = ImportRecord(
+                source_file=source_file,
+                module=module,
+                imports=parse_imports(snapshot.text, module, path.stem == "__init__"),
+                source_hash=snapshot.hash,
+            )
+        record.source_mtime_ns = snapshot.mtime_ns
+        record.source_size = snapshot.size
+        records[source_file] = record
+        updated.append(record)
+
+    removed = [source_file for source_file in records if source_file not in tracked]
+    storage.save_imports(updated, removed)
+    return ImportGraph(r for s, r in records.items() if s in tracked)
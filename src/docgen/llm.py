@@ -1,88 +1,476 @@
+import asyncio
+import difflib
 import os
+import time
+from collections.abc import Iterator
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 import typer
 
-from docgen import display
+from docgen import cache, chunking, clients, compaction, display, env, metrics
+from docgen.scheduler import get_scheduler
 from docgen.constants import EXIT_ERROR
 
-# Load environment variables from .env file
-load_dotenv()
+MODEL = "gpt-4o-mini"
 
+# Bump whenever a prompt template changes so cached responses are not reused
+PROMPT_VERSION = 1
 
-def _get_client() -> OpenAI:
-    """Create an OpenAI client. Uses OPENAI_API_KEY env var."""
+
+def _api_key() -> str:
+    """Return OPENAI_API_KEY, exiting with an error if it is not set."""
+    env.load()
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         display.error("OPENAI_API_KEY environment variable is not set")
         raise typer.Exit(EXIT_ERROR)
-    return OpenAI(api_key=api_key)
+    return api_key
+
+
+def _get_client() -> OpenAI:
+    """Return the shared OpenAI client. Uses OPENAI_API_KEY env var."""
+    return clients.get_client(_api_key())
+
+
+def _get_async_client() -> AsyncOpenAI:
+    """Return the shared async OpenAI client for the running event loop."""
+    return clients.get_async_client(_api_key())
+
+
+def _complete(messages: list[dict]) -> str:
+    """Run a chat completion, serving byte-identical prompts from the cache."""
+    key = cache.make_key(MODEL, PROMPT_VERSION, messages)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    client = _get_client()
+    response = get_scheduler().run(
+        messages, lambda: client.chat.completions.create(model=MODEL, messages=messages)
+    )
+    metrics.record_usage(MODEL, response.usage)
+    content = response.choices[0].message.content
+
+    cache.put(key, MODEL, content)
+    return content
+
+
+async def _acomplete(messages: list[dict]) -> str:
+    """Async variant of _complete."""
+    key = cache.make_key(MODEL, PROMPT_VERSION, messages)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
 
+    client = _get_async_client()
+    response = await get_scheduler().arun(
+        messages, lambda: client.chat.completions.create(model=MODEL, messages=messages)
+    )
+    metrics.record_usage(MODEL, response.usage)
+    content = response.choices[0].message.content
+
+    cache.put(key, MODEL, content)
+    return content
+
+
+def _documentation_messages(source_code: str, filename: str) -> list[dict]:
+    """Build the chat messages used to document a source file."""
+    return [
+        {
+            "role": "system",
+            "content": "You are a technical documentation writer. "
+            "Generate clear, comprehensive markdown documentation "
+            "for the provided source code. Include: overview, "
+            "functions/classes, parameters, return values, and usage examples.",
+        },
+        {
+            "role": "user",
+            "content": f"Generate documentation for `{filename}`:\n\n"
+            f"```\n{compaction.compact_prompt(source_code, filename)}\n```",
+        },
+    ]
+
+
+def _chunk_messages(chunk: chunking.Chunk, filename: str, symbols: list[str]) -> list[dict]:
+    """Build the chat messages used to document one chunk of a large file."""
+    if chunk.kind == "module":
+        task = (
+            f"Write the overview section for `{filename}`. Below is its module-level "
+            f"code (imports, constants, docstring). It also defines: {', '.join(symbols)}."
+        )
+    else:
+        task = (
+            f"Document the {chunk.kind} `{chunk.name}` from `{filename}` as one "
+            "markdown section starting with a level-2 heading."
+        )
+
+    return [
+        {
+            "role": "system",
+            "content": "You are a technical documentation writer. You are documenting "
+            "one part of a larger file. Include parameters, return values and a short "
+            "usage example where relevant. Do not add a document title.",
+        },
+        {
+            "role": "user",
+            "content": f"{task}\n\n```\n{compaction.compact_prompt(chunk.source, filename)}\n```",
+        },
+    ]
+
+
+async def _agenerate_chunked(
+    chunks: list[chunking.Chunk],
+    filename: str,
+    existing_docs: str | None = None,
+    symbol_hashes: dict[str, str] | None = None,
+) -> str:
+    """Document chunks concurrently and merge them in source order.
+
+    When the previous doc and its per-symbol hashes are given, only added
+    or edited chunks are sent to the LLM; unchanged sections are reused and
+    sections of removed symbols are dropped.
+    """
+    symbols = [c.name for c in chunks if c.kind != "module"]
+    sections = chunking.parse_sections(existing_docs) if existing_docs else {}
+
+    if sections and symbol_hashes:
+        todo = chunking.changed_chunks(chunks, symbol_hashes, sections)
+    else:
+        todo = chunks
+
+    results = await asyncio.gather(
+        *(_acomplete(_chunk_messages(chunk, filename, symbols)) for chunk in todo)
+    )
+    sections.update({chunk.name: section for chunk, section in zip(todo, results)})
 
-def generate_documentation(source_code: str, filename: str) -> str:
+    return chunking.merge_sections(filename, chunks, [sections[c.name] for c in chunks])
+
+
+def generate_documentation(
+    source_code: str,
+    filename: str,
+    existing_docs: str | None = None,
+    symbol_hashes: dict[str, str] | None = None,
+) -> str:
     """Generate markdown documentation for source code using an LLM.
 
+    Large Python files are split at class and function boundaries and the
+    chunks are documented concurrently.
+
+    Args:
+        source_code: The contents of the source file.
+        filename: The name of the source file (for context).
+        existing_docs: The previous doc, to regenerate only changed symbols.
+        symbol_hashes: Per-symbol hashes recorded when existing_docs was generated.
+
+    Returns:
+        Generated markdown documentation as a string.
+    """
+    if chunking.should_chunk(source_code, filename):
+        chunks = chunking.split_python(source_code)
+        if chunks:
+            return clients.run_sync(
+                _agenerate_chunked(chunks, filename, existing_docs, symbol_hashes)
+            )
+
+    return _complete(_documentation_messages(source_code, filename))
+
+
+async def agenerate_documentation(
+    source_code: str,
+    filename: str,
+    existing_docs: str | None = None,
+    symbol_hashes: dict[str, str] | None = None,
+) -> str:
+    """Async variant of generate_documentation for concurrent batch runs.
+
     Args:
         source_code: The contents of the source file.
         filename: The name of the source file (for context).
+        existing_docs: The previous doc, to regenerate only changed symbols.
+        symbol_hashes: Per-symbol hashes recorded when existing_docs was generated.
 
     Returns:
         Generated markdown documentation as a string.
     """
+    if chunking.should_chunk(source_code, filename):
+        chunks = chunking.split_python(source_code)
+        if chunks:
+            return await _agenerate_chunked(chunks, filename, existing_docs, symbol_hashes)
+
+    return await _acomplete(_documentation_messages(source_code, filename))
+
+
+def stream_documentation(source_code: str, filename: str) -> Iterator[str]:
+    """Generate documentation for a single-request file, yielding text as it arrives.
+
+    A cached response is yielded in one piece. The full response is cached
+    once the stream completes, so an interrupted stream is never cached.
+
+    Args:
+        source_code: The contents of the source file.
+        filename: The name of the source file (for context).
+
+    Yields:
+        Consecutive pieces of the markdown documentation.
+    """
+    messages = _documentation_messages(source_code, filename)
+    key = cache.make_key(MODEL, PROMPT_VERSION, messages)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
     client = _get_client()
+    stream = get_scheduler().run(
+        messages,
+        lambda: client.chat.completions.create(
+            model=MODEL, messages=messages, stream=True, stream_options={"include_usage": True}
+        ),
+    )
+
+    # The scheduler timed opening the stream; reading it is LLM time too
+    start = time.perf_counter()
+    parts = []
+    usage = None
+    for event in stream:
+        # With include_usage, the final event carries usage and no choices
+        usage = getattr(event, "usage", None) or usage
+        if not event.choices:
+            continue
+        delta = event.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+
+    metrics.add_time("llm", time.perf_counter() - start)
+    metrics.record_usage(MODEL, usage)
+    cache.put(key, MODEL, "".join(parts))
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a technical documentation writer. "
-                "Generate clear, comprehensive markdown documentation "
-                "for the provided source code. Include: overview, "
-                "functions/classes, parameters, return values, and usage examples.",
-            },
-            {
-                "role": "user",
-                "content": f"Generate documentation for `{filename}`:\n\n```\n{source_code}\n```",
-            },
-        ],
+
+def _adapt_messages(
+    source_code: str, filename: str, similar_source: str, similar_filename: str, similar_doc: str
+) -> list[dict]:
+    """Build the chat messages that adapt a near-duplicate file's doc from a diff."""
+    diff = "".join(difflib.unified_diff(
+        similar_source.splitlines(keepends=True),
+        source_code.splitlines(keepends=True),
+        fromfile=similar_filename,
+        tofile=filename,
+        n=2,
+    ))
+    return [
+        {
+            "role": "system",
+            "content": "You are a technical documentation writer. You are given the "
+            "documentation of a source file and a diff from that file to a new, nearly "
+            "identical one. Write the documentation for the new file: keep everything the "
+            "diff doesn't affect and update the names, values and behavior it changes. "
+            "Return only the markdown document.",
+        },
+        {
+            "role": "user",
+            "content": f"Documentation of `{similar_filename}`:\n\n{similar_doc}\n\n"
+            f"Diff to `{filename}`:\n```diff\n{diff}```",
+        },
+    ]
+
+
+def adapt_documentation(
+    source_code: str, filename: str, similar_source: str, similar_filename: str, similar_doc: str
+) -> str:
+    """Document a file by adapting the doc of a near-identical file.
+
+    Only the diff between the two sources and the existing doc are sent,
+    which is much cheaper than documenting the file from scratch.
+
+    Args:
+        source_code: The contents of the new source file.
+        filename: The name of the new source file.
+        similar_source: The contents of the already documented file.
+        similar_filename: The name of the already documented file.
+        similar_doc: The documentation of the already documented file.
+
+    Returns:
+        Generated markdown documentation as a string.
+    """
+    return _complete(
+        _adapt_messages(source_code, filename, similar_source, similar_filename, similar_doc)
+    )
+
+
+async def aadapt_documentation(
+    source_code: str, filename: str, similar_source: str, similar_filename: str, similar_doc: str
+) -> str:
+    """Async variant of adapt_documentation for concurrent batch runs."""
+    return await _acomplete(
+        _adapt_messages(source_code, filename, similar_source, similar_filename, similar_doc)
+    )
+
+
+def documentation_prompts(
+    source_code: str, filename: str
+) -> tuple[list[chunking.Chunk] | None, list[list[dict]]]:
+    """Return the prompts generate_documentation would send for a file.
+
+    Returns:
+        The chunks (None for a single-request file) and one message list
+        per request, in chunk order.
+    """
+    if chunking.should_chunk(source_code, filename):
+        chunks = chunking.split_python(source_code)
+        if chunks:
+            symbols = [c.name for c in chunks if c.kind != "module"]
+            return chunks, [_chunk_messages(chunk, filename, symbols) for chunk in chunks]
+
+    return None, [_documentation_messages(source_code, filename)]
+
+
+def batch_request(custom_id: str, messages: list[dict]) -> dict:
+    """Build one line of a Batch API input file."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {"model": MODEL, "messages": messages},
+    }
+
+
+def submit_batch(jsonl: str) -> str:
+    """Upload a JSONL batch input file and start a batch job.
+
+    Returns:
+        The batch job ID.
+    """
+    client = _get_client()
+    input_file = client.files.create(file=("docgen-batch.jsonl", jsonl.encode()), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
     )
+    return batch.id
 
-    return response.choices[0].message.content
 
+def get_batch(batch_id: str):
+    """Fetch the current state of a batch job."""
+    return _get_client().batches.retrieve(batch_id)
 
-def check_accuracy(source_code: str, existing_docs: str) -> str:
+
+def batch_file_content(file_id: str) -> str:
+    """Download a batch output or error file."""
+    return _get_client().files.content(file_id).text
+
+
+def _diff_accuracy_messages(
+    source_code: str, existing_docs: str, filename: str, previous_source: str
+) -> list[dict] | None:
+    """Build review messages holding only the source diff and the doc sections it affects.
+
+    Returns:
+        The messages, or None when the diff is no smaller than the source itself.
+    """
+    diff = "".join(difflib.unified_diff(
+        previous_source.splitlines(keepends=True),
+        source_code.splitlines(keepends=True),
+        fromfile=f"{filename} (documented)",
+        tofile=f"{filename} (current)",
+    ))
+    if len(diff) >= len(source_code):
+        return None
+
+    sections = chunking.affected_sections(previous_source, source_code, filename, existing_docs)
+    return [
+        {
+            "role": "system",
+            "content": "You are a documentation reviewer. You are given a diff of a "
+            "source file since its documentation was written, and the documentation "
+            "sections the change may affect. Report any inaccuracies, missing items, or "
+            "outdated information the change introduced. Be concise.",
+        },
+        {
+            "role": "user",
+            "content": f"Diff:\n```diff\n{diff}```\n\n"
+            f"Affected documentation:\n{sections}",
+        },
+    ]
+
+
+def _accuracy_messages(
+    source_code: str,
+    existing_docs: str,
+    filename: str | None = None,
+    previous_source: str | None = None,
+) -> list[dict]:
+    """Build the chat messages used to review existing documentation."""
+    if previous_source is not None and filename:
+        messages = _diff_accuracy_messages(
+            source_code, existing_docs, filename, previous_source
+        )
+        if messages:
+            return messages
+
+    return [
+        {
+            "role": "system",
+            "content": "You are a documentation reviewer. Compare the source code "
+            "against the existing documentation. Report any inaccuracies, "
+            "missing items, or outdated information. Be concise.",
+        },
+        {
+            "role": "user",
+            "content": "Source code:\n"
+            f"```\n{compaction.compact_prompt(source_code, filename)}\n```\n\n"
+            f"Existing documentation:\n{existing_docs}",
+        },
+    ]
+
+
+def check_accuracy(
+    source_code: str,
+    existing_docs: str,
+    filename: str | None = None,
+    previous_source: str | None = None,
+) -> str:
     """Check if existing documentation is still accurate for the current source code.
 
+    When the source the docs were generated from is known, only a unified
+    diff against it and the doc sections it affects are sent, unless the
+    diff is larger than the source.
+
     Args:
         source_code: The current contents of the source file.
         existing_docs: The existing markdown documentation.
+        filename: The source file, for reporting tokens saved by compaction.
+        previous_source: The source as it was when the docs were generated.
 
     Returns:
         An accuracy report as a string.
     """
-    client = _get_client()
+    return _complete(_accuracy_messages(source_code, existing_docs, filename, previous_source))
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a documentation reviewer. Compare the source code "
-                "against the existing documentation. Report any inaccuracies, "
-                "missing items, or outdated information. Be concise.",
-            },
-            {
-                "role": "user",
-                "content": f"Source code:\n```\n{source_code}\n```\n\n"
-                f"Existing documentation:\n{existing_docs}",
-            },
-        ],
-    )
 
-    return response.choices[0].message.content
+async def acheck_accuracy(
+    source_code: str,
+    existing_docs: str,
+    filename: str | None = None,
+    previous_source: str | None = None,
+) -> str:
+    """Async variant of check_accuracy for sweeping many files.
+
+    Args:
+        source_code: The current contents of the source file.
+        existing_docs: The existing markdown documentation.
+        filename: The source file, for reporting tokens saved by compaction.
+        previous_source: The source as it was when the docs were generated.
+
+    Returns:
+        An accuracy report as a string.
+    """
+    return await _acomplete(
+        _accuracy_messages(source_code, existing_docs, filename, previous_source)
+    )
 
 
 def generate_summary(source_code: str, filename: str) -> str:
@@ -95,22 +483,16 @@ def generate_summary(source_code: str, filename: str) -> str:
     Returns:
         A one-paragraph summary as a string.
     """
-    client = _get_client()
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a technical writer. Generate a single concise "
-                "paragraph summarizing what the provided source code does. "
-                "Focus on purpose, key functionality, and important details.",
-            },
-            {
-                "role": "user",
-                "content": f"Summarize `{filename}`:\n\n```\n{source_code}\n```",
-            },
-        ],
-    )
-
-    return response.choices[0].message.content
+    return _complete([
+        {
+            "role": "system",
+            "content": "You are a technical writer. Generate a single concise "
+            "paragraph summarizing what the provided source code does. "
+            "Focus on purpose, key functionality, and important details.",
+        },
+        {
+            "role": "user",
+            "content": f"Summarize `{filename}`:\n\n"
+            f"```\n{compaction.compact_prompt(source_code, filename)}\n```",
+        },
+    ])
@@ -1,4 +1,22 @@
-from docgen.commands import app
+import sys
+
+
+def main() -> None:
+    """Console entry point.
+
+    Hands generate, check and list to a running `docgen serve` before the
+    CLI stack is imported, and runs the command in-process otherwise.
+    """
+    from docgen import remote
+
+    exit_code = remote.forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    from docgen.commands import app
+
+    app(prog_name="docgen")
+
 
 if __name__ == "__main__":
-    app()
+    main()
@@ -0,0 +1,188 @@
+import functools
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# USD per million (prompt, completion) tokens
+PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+
+@dataclass
+class PhaseStats:
+    seconds: float = 0.0
+    calls: int = 0
+
+
+@dataclass
+class ModelUsage:
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def cost(self, model: str) -> float | None:
+        """Estimated cost in USD, or None for a model without a known price."""
+        if model not in PRICES:
+            return None
+        prompt_price, completion_price = PRICES[model]
+        return (self.prompt_tokens * prompt_price + self.completion_tokens * completion_price) / 1e6
+
+
+@dataclass
+class Metrics:
+    """Timings and usage collected while a command runs.
+
+    Phase times are busy time: work running concurrently (for example
+    parallel LLM requests) adds up, so phases can exceed the wall time.
+    """
+
+    started: float = field(default_factory=time.perf_counter)
+    phases: dict[str, PhaseStats] = field(default_factory=dict)
+    models: dict[str, ModelUsage] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+    files: dict[str, dict[str, int]] = field(default_factory=dict)
+
+
+_lock = threading.Lock()
+current = Metrics()
+
+# Phases being timed in the current thread or task, so nested timing counts once
+_active: ContextVar[frozenset[str]] = ContextVar("docgen_active_phases", default=frozenset())
+
+
+def reset() -> None:
+    """Start collecting for a new command."""
+    global current
+    current = Metrics()
+
+
+def add_time(phase: str, seconds: float) -> None:
+    with _lock:
+        stats = current.phases.setdefault(phase, PhaseStats())
+        stats.seconds += seconds
+        stats.calls += 1
+
+
+def increment(counter: str, amount: int = 1) -> None:
+    with _lock:
+        current.counters[counter] = current.counters.get(counter, 0) + amount
+
+
+def increment_file(source: str, counter: str, amount: int = 1) -> None:
+    """Add to a per-file counter (exported as JSON only, to keep Prometheus cardinality low)."""
+    with _lock:
+        counters = current.files.setdefault(source, {})
+        counters[counter] = counters.get(counter, 0) + amount
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a block as part of a phase. Nested blocks of the same phase count once."""
+    active = _active.get()
+    if name in active:
+        yield
+        return
+
+    token = _active.set(active | {name})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _active.reset(token)
+        add_time(name, time.perf_counter() - start)
+
+
+def timed(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator that times every call of a function as part of a phase."""
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_usage(model: str, usage) -> None:
+    """Add the token counts of an API response's usage field."""
+    prompt = getattr(usage, "prompt_tokens", None)
+    completion = getattr(usage, "completion_tokens", None)
+    with _lock:
+        stats = current.models.setdefault(model, ModelUsage())
+        stats.requests += 1
+        if isinstance(prompt, int):
+            stats.prompt_tokens += prompt
+        if isinstance(completion, int):
+            stats.completion_tokens += completion
+
+
+def report(command: str | None) -> dict:
+    """Return the collected metrics as a JSON-serializable dict."""
+    with _lock:
+        models = {
+            model: {
+                "requests": usage.requests,
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "cost_usd": usage.cost(model),
+            }
+            for model, usage in current.models.items()
+        }
+        return {
+            "command": command,
+            "wall_seconds": time.perf_counter() - current.started,
+            "phases": {
+                name: {"seconds": stats.seconds, "calls": stats.calls}
+                for name, stats in sorted(current.phases.items())
+            },
+            "models": models,
+            "counters": dict(sorted(current.counters.items())),
+            "files": {source: dict(c) for source, c in sorted(current.files.items())},
+            "cost_usd": sum(m["cost_usd"] or 0.0 for m in models.values()),
+        }
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{k}="{v}"' for k, v in labels.items())
+
+
+def to_prometheus(data: dict) -> str:
+    """Render a report in the Prometheus text exposition format (for textfile collectors)."""
+    command = data["command"] or ""
+    lines = []
+
+    def _metric(name: str, help_text: str, samples: list[tuple[str, float]]) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{{{labels}}} {value}" for labels, value in samples)
+
+    _metric("docgen_run_duration_seconds", "Wall time of the last docgen run.",
+            [(_labels(command=command), data["wall_seconds"])])
+    _metric("docgen_run_phase_seconds", "Busy time per phase in the last run.",
+            [(_labels(command=command, phase=p), s["seconds"]) for p, s in data["phases"].items()])
+    _metric("docgen_run_phase_calls", "Timed calls per phase in the last run.",
+            [(_labels(command=command, phase=p), s["calls"]) for p, s in data["phases"].items()])
+    _metric("docgen_run_llm_requests", "LLM API requests in the last run.",
+            [(_labels(command=command, model=m), u["requests"]) for m, u in data["models"].items()])
+    _metric("docgen_run_llm_tokens", "LLM tokens used in the last run.",
+            [(_labels(command=command, model=m, kind=kind), u[f"{kind}_tokens"])
+             for m, u in data["models"].items() for kind in ("prompt", "completion")])
+    _metric("docgen_run_llm_cost_usd", "Estimated LLM cost of the last run in USD.",
+            [(_labels(command=command, model=m), u["cost_usd"] or 0.0)
+             for m, u in data["models"].items()])
+    _metric("docgen_run_events", "Event counts (cache hits, retries, ...) in the last run.",
+            [(_labels(command=command, event=e), n) for e, n in data["counters"].items()])
+    return "\n".join(lines) + "\n"
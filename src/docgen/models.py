@@ -16,3 +16,19 @@ class DocEntry:
     status: DocStatus = DocStatus.CURRENT
     generated_at: datetime = field(default_factory=datetime.now)
     source_hash: str = ""
+    source_mtime_ns: int = 0
+    source_size: int = 0
+    symbol_hashes: dict[str, str] = field(default_factory=dict)
+    simhash: int = 0
+    api_signature: str = ""
+    git_blob: str = ""
+
+
+@dataclass
+class ImportRecord:
+    source_file: str
+    module: str
+    imports: list[str] = field(default_factory=list)
+    source_hash: str = ""
+    source_mtime_ns: int = 0
+    source_size: int = 0
@@ -0,0 +1,132 @@
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from docgen import storage
+from docgen.files import atomic_write
+from docgen.hashing import hash_bytes
+
+# Collect garbage after this many new objects so the store can't grow unbounded
+GC_EVERY = 100
+
+# Unreferenced objects younger than this are kept: a running command or a
+# pending batch job (24h completion window) may not have recorded its entry yet
+GC_GRACE_SECONDS = 2 * 24 * 60 * 60
+
+
+@dataclass
+class ObjectStats:
+    writes: int = 0
+    collected: int = 0
+
+
+stats = ObjectStats()
+
+
+def objects_dir() -> Path:
+    """Return the snapshot store inside the project storage directory."""
+    return storage.STORAGE_DIR / "objects"
+
+
+def _object_path(digest: str) -> Path:
+    """Return the file holding a snapshot, sharded by hash prefix."""
+    return objects_dir() / digest[:2] / digest[2:]
+
+
+def put(data: bytes, digest: str | None = None) -> str:
+    """Store a source snapshot under the SHA-256 of its bytes.
+
+    The key is the same hash recorded as an entry's source_hash, so the
+    source a doc was generated from can be looked up from the entry alone.
+    Storing content that is already present is a no-op.
+
+    Returns:
+        The hex digest the snapshot is stored under.
+    """
+    digest = digest or hash_bytes(data)
+    path = _object_path(digest)
+    if path.exists():
+        return digest
+
+    with atomic_write(path, binary=True) as f:
+        f.write(zlib.compress(data))
+
+    stats.writes += 1
+    if stats.writes % GC_EVERY == 0:
+        gc()
+    return digest
+
+
+def get(digest: str) -> bytes | None:
+    """Return a stored snapshot, or None if it was never stored or is corrupt."""
+    if not digest:
+        return None
+    try:
+        return zlib.decompress(_object_path(digest).read_bytes())
+    except (FileNotFoundError, zlib.error):
+        return None
+
+
+def get_text(digest: str) -> str | None:
+    """Return a stored snapshot decoded as source text, or None."""
+    data = get(digest)
+    if data is None:
+        return None
+    try:
+        return data.decode()
+    except UnicodeDecodeError:
+        return None
+
+
+def copy_from(directory: Path, digest: str) -> bool:
+    """Copy a snapshot from another object store, such as a CI shard's, if missing here.
+
+    Returns:
+        True if the snapshot was copied.
+    """
+    source = directory / digest[:2] / digest[2:]
+    if not digest or _object_path(digest).exists() or not source.exists():
+        return False
+    with atomic_write(_object_path(digest), binary=True) as f:
+        f.write(source.read_bytes())
+    return True
+
+
+def gc(grace: float | None = None) -> int:
+    """Remove snapshots no tracked entry refers to.
+
+    Returns:
+        The number of snapshots removed.
+    """
+    grace = GC_GRACE_SECONDS if grace is None else grace
+    root = objects_dir()
+    if not root.exists():
+        return 0
+
+    referenced = storage.source_hashes()
+    now = time.time()
+    removed = 0
+    for path in root.glob("*/*"):
+        if path.name.startswith(".") or path.parent.name + path.name in referenced:
+            continue
+        try:
+            if now - path.stat().st_mtime <= grace:
+                continue
+        except FileNotFoundError:
+            continue
+        path.unlink(missing_ok=True)
+        removed += 1
+
+    # Drop shard directories emptied by the sweep
+    for shard in root.iterdir():
+        if shard.is_dir() and not any(shard.iterdir()):
+            shard.rmdir()
+
+    stats.collected += removed
+    return removed
+
+
+def reset_stats() -> None:
+    global stats
+    stats = ObjectStats()
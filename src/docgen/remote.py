@@ -0,0 +1,94 @@
+# Thin client for a running `docgen serve`. The console entry point imports
+# this before anything else, so it must only use the standard library.
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+from docgen.constants import EXIT_ERROR
+
+SOCKET_NAME = "docgen.sock"
+
+# Commands a running server answers; everything else always runs in-process
+FORWARDED_COMMANDS = ("generate", "check", "list")
+
+# Set to skip the server and always run in-process
+DISABLE_ENV = "DOCGEN_NO_SERVER"
+
+
+def socket_path() -> Path:
+    """Return the server socket of the project in the current directory."""
+    return Path.cwd() / ".docgen" / SOCKET_NAME
+
+
+def should_forward(argv: list[str]) -> bool:
+    """Return True if a command line can be answered by the server."""
+    if os.environ.get(DISABLE_ENV) or not argv or argv[0] not in FORWARDED_COMMANDS:
+        return False
+    # A live preview needs the terminal as output arrives, not at the end
+    return "--preview" not in argv
+
+
+def encode(message: dict) -> bytes:
+    """Encode one protocol message as a JSON line."""
+    return json.dumps(message).encode() + b"\n"
+
+
+def decode(data: bytes) -> dict:
+    return json.loads(data)
+
+
+def _terminal() -> tuple[bool, int | None]:
+    """Return whether stdout is a terminal, and its width."""
+    if not sys.stdout.isatty():
+        return False, None
+    try:
+        return True, os.get_terminal_size().columns
+    except OSError:
+        return True, None
+
+
+def forward(argv: list[str], path: Path | None = None) -> int | None:
+    """Run a command on the server and replay its output.
+
+    Returns:
+        The command's exit code, or None if it should run in-process
+        because the command isn't forwarded or no server is listening.
+        Once the request is sent the server may have run the command, so
+        a lost reply is an error rather than a reason to run it again.
+    """
+    if not should_forward(argv):
+        return None
+
+    path = path or socket_path()
+    if not path.exists():
+        return None
+
+    tty, width = _terminal()
+    request = {"argv": argv, "cwd": os.getcwd(), "tty": tty, "width": width}
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            # Stale socket from a server that is gone
+            return None
+        try:
+            sock.sendall(encode(request))
+            sock.shutdown(socket.SHUT_WR)
+            data = b"".join(iter(lambda: sock.recv(65536), b""))
+            response = decode(data)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"Error: lost the reply from the docgen server at {path} ({e})\n")
+            return EXIT_ERROR
+
+    if response.get("refused"):
+        return None
+
+    sys.stdout.write(response["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(response["stderr"])
+    sys.stderr.flush()
+    return response["exit_code"]
@@ -0,0 +1,282 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+
+import openai
+
+from docgen import metrics
+
+T = TypeVar("T")
+
+# Account-level limits and retry policy (DOCGEN_RPM, DOCGEN_TPM, ... override them)
+DEFAULT_RPM = 500
+DEFAULT_TPM = 200_000
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_MAX_RETRIES = 6
+
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+
+# Rough allowance for the completion, which also counts against TPM
+COMPLETION_TOKENS_ESTIMATE = 500
+
+# Throttles within this many seconds of a decrease don't decrease the limit again
+THROTTLE_WINDOW = 2.0
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+def estimate_tokens(messages: list[dict]) -> int:
+    """Estimate the tokens a request will consume (about four characters per token)."""
+    prompt = sum(len(m["content"]) // 4 + 4 for m in messages)
+    return prompt + COMPLETION_TOKENS_ESTIMATE
+
+
+def retry_after(error: Exception) -> float | None:
+    """Return the server-requested delay in seconds from a Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Return True for throttling and transient server or network errors."""
+    if not isinstance(error, RETRYABLE_ERRORS):
+        return False
+    # An exhausted quota won't recover by waiting
+    return getattr(error, "code", None) != "insufficient_quota"
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate.
+
+    reserve() deducts immediately and returns how long the caller must wait
+    before its share is actually available, so it works for both threads
+    and coroutines without holding a lock while sleeping.
+    """
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens and return the seconds to wait before using them."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that halves on throttling and grows back on success.
+
+    One limiter is shared by every thread and event loop in the process
+    (the sync chunked path runs its own loop per call), so its state is
+    guarded by a lock and waiters are woken on their own loop.
+    """
+
+    def __init__(self, maximum: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maximum = maximum
+        self.limit = max(1, maximum // 2)
+        self.in_flight = 0
+        self._successes = 0
+        self._throttled_at: float | None = None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        while True:
+            with self._lock:
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+            await waiter
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+
+    def on_success(self) -> None:
+        """Additive increase: one more slot after a full window of successes."""
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+                self._wake()
+
+    def on_throttle(self) -> None:
+        """Multiplicative decrease after a 429, at most once per THROTTLE_WINDOW.
+
+        A burst of concurrent requests all hitting the same limit counts as
+        one throttle instead of halving the limit down to 1.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._throttled_at is not None and now - self._throttled_at < THROTTLE_WINDOW:
+                return
+            self._throttled_at = now
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+
+    def _wake(self) -> None:
+        """Wake every waiter on its own loop; they re-check the limit. Call with the lock held."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            try:
+                waiter.get_loop().call_soon_threadsafe(_resolve, waiter)
+            except RuntimeError:
+                # The waiter's loop already closed
+                pass
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+
+
+class Scheduler:
+    """Runs LLM requests within RPM/TPM budgets, retrying transient failures."""
+
+    def __init__(
+        self,
+        rpm: int = DEFAULT_RPM,
+        tpm: int = DEFAULT_TPM,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        asleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.limiter = AdaptiveLimiter(max_concurrency, clock)
+        self.max_retries = max_retries
+        self.stats = SchedulerStats()
+        self._sleep = sleep
+        self._asleep = asleep
+
+    def _budget_wait(self, messages: list[dict]) -> float:
+        """Reserve one request and its estimated tokens; return the wait needed."""
+        return max(self.requests.reserve(1), self.tokens.reserve(estimate_tokens(messages)))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Jittered exponential backoff, never shorter than the server's Retry-After."""
+        backoff = min(MAX_DELAY, BASE_DELAY * 2 ** attempt)
+        delay = random.uniform(backoff / 2, backoff)
+        requested = retry_after(error)
+        return max(delay, requested) if requested is not None else delay
+
+    def _on_error(self, error: Exception, attempt: int) -> float:
+        """Record a failed attempt and return the delay before retrying, or re-raise."""
+        if attempt >= self.max_retries or not _is_retryable(error):
+            raise error
+        if isinstance(error, openai.RateLimitError):
+            self.stats.throttled += 1
+            metrics.increment("throttled")
+            self.limiter.on_throttle()
+        self.stats.retries += 1
+        metrics.increment("retries")
+        return self._retry_delay(error, attempt)
+
+    def run(self, messages: list[dict], call: Callable[[], T]) -> T:
+        """Run a blocking request under the rate limits with retries."""
+        for attempt in range(self.max_retries + 1):
+            wait = self._budget_wait(messages)
+            if wait:
+                metrics.add_time("rate_limit_wait", wait)
+                self._sleep(wait)
+            self.stats.requests += 1
+            try:
+                # Only the request itself is LLM time; budget waits are counted above
+                with metrics.phase("llm"):
+                    result = call()
+            except Exception as e:
+                self._sleep(self._on_error(e, attempt))
+                continue
+            self.limiter.on_success()
+            return result
+        raise AssertionError("unreachable")
+
+    async def arun(self, messages: list[dict], call: Callable[[], Awaitable[T]]) -> T:
+        """Run an async request under the rate and adaptive concurrency limits with retries."""
+        for attempt in range(self.max_retries + 1):
+            wait = self._budget_wait(messages)
+            if wait:
+                metrics.add_time("rate_limit_wait", wait)
+                await self._asleep(wait)
+            await self.limiter.acquire()
+            self.stats.requests += 1
+            try:
+                with metrics.phase("llm"):
+                    result = await call()
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+            else:
+                self.limiter.on_success()
+                return result
+            finally:
+                self.limiter.release()
+            await self._asleep(delay)
+        raise AssertionError("unreachable")
+
+
+_scheduler: Scheduler | None = None
+
+
+def get_scheduler() -> Scheduler:
+    """Return the process-wide scheduler, created from the environment on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler(
+            rpm=int(os.environ.get("DOCGEN_RPM", DEFAULT_RPM)),
+            tpm=int(os.environ.get("DOCGEN_TPM", DEFAULT_TPM)),
+            max_concurrency=int(os.environ.get("DOCGEN_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+            max_retries=int(os.environ.get("DOCGEN_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        )
+    return _scheduler
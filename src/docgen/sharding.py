@@ -0,0 +1,57 @@
+import hashlib
+import heapq
+import os
+import re
+
+_SPEC_RE = re.compile(r"^(\d+)/(\d+)$")
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse a shard spec such as "2/4" into a 1-based index and a shard count.
+
+    Raises:
+        ValueError: If the spec is malformed or the index is out of range.
+    """
+    match = _SPEC_RE.match(spec.strip())
+    if not match:
+        raise ValueError(f"Invalid shard: {spec}. Use i/N, e.g. 1/4")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard: {spec}. The index must be between 1 and {count}")
+    return index, count
+
+
+def _stable_hash(path: str) -> bytes:
+    """Hash a path the same way on every machine, unlike the salted built-in hash()."""
+    return hashlib.blake2b(path.encode(), digest_size=8).digest()
+
+
+def partition(sizes: dict[str, int], count: int) -> list[list[str]]:
+    """Split paths into count shards of roughly equal total size.
+
+    Files are placed largest first, each on the currently lightest shard,
+    with ties broken by a stable hash of the path. Every node given the
+    same files therefore computes the same split.
+    """
+    shards: list[list[str]] = [[] for _ in range(count)]
+    loads = [(0, i) for i in range(count)]
+    for path in sorted(sizes, key=lambda p: (-sizes[p], _stable_hash(p))):
+        load, i = heapq.heappop(loads)
+        shards[i].append(path)
+        # Empty files still count, so they spread over shards instead of piling up
+        heapq.heappush(loads, (load + max(sizes[path], 1), i))
+    return shards
+
+
+def select(paths: list[str], index: int, count: int) -> set[str]:
+    """Return the paths that belong to shard index (1-based) of count.
+
+    Paths are weighed by their size on disk; missing files weigh nothing.
+    """
+    sizes = {}
+    for path in paths:
+        try:
+            sizes[path] = os.stat(path).st_size
+        except OSError:
+            sizes[path] = 0
+    return set(partition(sizes, count)[index - 1])
@@ -0,0 +1,76 @@
+import ast
+import hashlib
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _is_public(name: str) -> bool:
+    """Public names, plus dunders such as __init__ and __all__ that shape the API."""
+    return not name.startswith("_") or (name.startswith("__") and name.endswith("__"))
+
+
+def _decorators(node: ast.AST) -> list[str]:
+    return [f"@{ast.unparse(d)}" for d in getattr(node, "decorator_list", [])]
+
+
+def _function(node: ast.FunctionDef | ast.AsyncFunctionDef) -> list[str]:
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return [
+        *_decorators(node),
+        f"{prefix} {node.name}({ast.unparse(node.args)}){returns}",
+        repr(ast.get_docstring(node)),
+    ]
+
+
+def _assigned_names(node: ast.Assign | ast.AnnAssign) -> list[str]:
+    targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+    return [n.id for t in targets for n in ast.walk(t) if isinstance(n, ast.Name)]
+
+
+def _surface(body: list[ast.stmt], prefix: str = "") -> list[str]:
+    """Describe the public definitions in a body, without function bodies."""
+    items = []
+    for node in body:
+        if isinstance(node, _FUNCTION_NODES):
+            if _is_public(node.name):
+                items.extend(prefix + line for line in _function(node))
+        elif isinstance(node, ast.ClassDef):
+            if _is_public(node.name):
+                bases = ", ".join(ast.unparse(b) for b in [*node.bases, *node.keywords])
+                items.extend(prefix + d for d in _decorators(node))
+                items.append(f"{prefix}class {node.name}({bases})")
+                items.append(prefix + repr(ast.get_docstring(node)))
+                items.extend(_surface(node.body, prefix + "  "))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            if any(_is_public(name) for name in _assigned_names(node)):
+                items.append(prefix + ast.unparse(node))
+        elif isinstance(node, ast.If):
+            items.extend(_surface(node.body + node.orelse, prefix))
+        elif isinstance(node, ast.Try):
+            items.extend(_surface(
+                node.body + [s for h in node.handlers for s in h.body] + node.orelse, prefix
+            ))
+    return items
+
+
+def api_signature(source_code: str, filename: str) -> str:
+    """Fingerprint the public surface of a Python source.
+
+    The fingerprint covers public functions, classes, methods and module
+    or class attributes: their names, parameters, defaults, annotations,
+    decorators and docstrings. Formatting, comments, private names and
+    function bodies don't affect it, so edits to them keep docs current.
+
+    Returns:
+        A hex digest, or "" for non-Python or unparsable sources.
+    """
+    if not filename.endswith(".py"):
+        return ""
+    try:
+        tree = ast.parse(source_code)
+    except SyntaxError:
+        return ""
+
+    items = [repr(ast.get_docstring(tree)), *_surface(tree.body)]
+    return hashlib.sha256("\n".join(items).encode()).hexdigest()
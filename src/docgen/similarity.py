@@ -0,0 +1,89 @@
+import hashlib
+import re
+from collections import Counter
+
+from docgen import storage
+from docgen.models import DocEntry
+
+# Fingerprints are split into this many bands; sources within BANDS - 1 differing
+# bits share at least one band exactly, which is what the index looks up
+BANDS = 4
+BAND_BITS = 64 // BANDS
+MAX_DISTANCE = BANDS - 1
+
+# Tokens per shingle, and the fewest tokens worth fingerprinting
+SHINGLE = 4
+MIN_TOKENS = 32
+
+_TOKEN_RE = re.compile(r"""\w+|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[^\w\s]""")
+
+
+def _normalize(token: str) -> str:
+    """Map literals to placeholders so files differing only in values match."""
+    if token[0] in "\"'":
+        return "<str>"
+    if token[0].isdigit():
+        return "<num>"
+    return token.lower()
+
+
+def simhash(source_code: str) -> int:
+    """Return a 64-bit SimHash of a source's normalized token shingles.
+
+    Near-identical sources get fingerprints that differ in few bits. The
+    value is signed, as SQLite stores it, and 0 means the source is too
+    short to fingerprint reliably.
+    """
+    tokens = [_normalize(t) for t in _TOKEN_RE.findall(source_code)]
+    if len(tokens) < MIN_TOKENS:
+        return 0
+
+    shingles = Counter(
+        " ".join(tokens[i:i + SHINGLE]) for i in range(len(tokens) - SHINGLE + 1)
+    )
+    weights = [0] * 64
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += count if value >> bit & 1 else -count
+
+    fingerprint = sum(1 << bit for bit in range(64) if weights[bit] > 0)
+    if fingerprint >= 1 << 63:
+        fingerprint -= 1 << 64
+    return fingerprint or 1
+
+
+def bands(fingerprint: int) -> list[int]:
+    """Split a fingerprint into the band values the index is keyed on."""
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (i * BAND_BITS)) & mask for i in range(BANDS)]
+
+
+def distance(a: int, b: int) -> int:
+    """Return the number of differing bits between two fingerprints."""
+    return ((a ^ b) & ((1 << 64) - 1)).bit_count()
+
+
+def find_similar(
+    db: storage.Session, source_code: str, exclude: str | None = None
+) -> tuple[DocEntry, int] | None:
+    """Find the closest documented source within MAX_DISTANCE bits of a source.
+
+    Only entries sharing a band with the source are compared, so lookups
+    go through the band indexes instead of scanning every entry.
+
+    Returns:
+        The matching entry and its distance, or None if nothing is close enough.
+    """
+    fingerprint = simhash(source_code)
+    if not fingerprint:
+        return None
+
+    best = None
+    for entry in db.find_by_bands(bands(fingerprint)):
+        if entry.source_file == exclude:
+            continue
+        d = distance(fingerprint, entry.simhash)
+        if d <= MAX_DISTANCE and (best is None or d < best[1]):
+            best = (entry, d)
+    return best
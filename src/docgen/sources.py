@@ -0,0 +1,133 @@
+import glob
+import os
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+
+# Used when walking a directory and no --include pattern was given
+DEFAULT_INCLUDE = ("*.py",)
+
+# Directory and file names that are never worth documenting
+DEFAULT_EXCLUDE = (".*", "__pycache__", "node_modules", "*.pyc")
+
+
+@dataclass(frozen=True)
+class SourceFile:
+    path: Path
+    relative: Path
+
+
+def is_glob(target: str) -> bool:
+    """Return True if a target contains glob wildcards."""
+    return glob.has_magic(target)
+
+
+def _matches(relative: Path, patterns: tuple[str, ...] | list[str]) -> bool:
+    """Check a relative path against patterns by file name or full path."""
+    posix = relative.as_posix()
+    return any(fnmatch(relative.name, p) or fnmatch(posix, p) for p in patterns)
+
+
+def _glob_root(pattern: str) -> Path:
+    """Return the longest leading directory of a glob pattern without wildcards."""
+    parts = []
+    for part in Path(pattern).parts:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return Path(*parts) if parts else Path(".")
+
+
+def _walk(root: Path, include: tuple[str, ...] | list[str], exclude: list[str]) -> list[SourceFile]:
+    """Recursively collect files under a directory, pruning excluded directories."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        current = Path(dirpath)
+        dirnames[:] = sorted(
+            d for d in dirnames if not _matches((current / d).relative_to(root), exclude)
+        )
+        for name in sorted(filenames):
+            relative = (current / name).relative_to(root)
+            if _matches(relative, include) and not _matches(relative, exclude):
+                found.append(SourceFile(path=current / name, relative=relative))
+    return found
+
+
+def discover_sources(
+    targets: list[str],
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+) -> list[SourceFile]:
+    """Expand files, directories and glob patterns into a list of source files.
+
+    Args:
+        targets: Paths or glob patterns given on the command line.
+        include: Patterns a file must match (defaults to DEFAULT_INCLUDE for directories).
+        exclude: Patterns that remove files and prune directories.
+
+    Returns:
+        Unique source files in a stable order. Explicit file targets are
+        always kept; include/exclude only filter directory and glob matches.
+        They are placed relative to the closest directory holding all of them.
+
+    Raises:
+        FileNotFoundError: If a non-glob target does not exist.
+        ValueError: If two sources would be documented at the same output path.
+    """
+    exclude = list(DEFAULT_EXCLUDE) + list(exclude or [])
+    seen: set[Path] = set()
+    sources: list[SourceFile] = []
+
+    # So a/util.py and b/util.py keep their directories instead of both being util
+    files = [
+        os.path.abspath(t) for t in targets
+        if not is_glob(t) and os.path.isfile(t)
+    ]
+    files_root = Path(os.path.commonpath([os.path.dirname(f) for f in files])) if files else None
+
+    def _add(found: list[SourceFile]) -> None:
+        for source in found:
+            key = source.path.resolve()
+            if key not in seen:
+                seen.add(key)
+                sources.append(source)
+
+    for target in targets:
+        if is_glob(target):
+            root = _glob_root(target)
+            matches = sorted(Path(p) for p in glob.glob(target, recursive=True))
+            _add([
+                SourceFile(path=p, relative=p.relative_to(root))
+                for p in matches
+                if p.is_file()
+                and (not include or _matches(p.relative_to(root), include))
+                and not _matches(p.relative_to(root), exclude)
+            ])
+            continue
+
+        path = Path(target)
+        if not path.exists():
+            raise FileNotFoundError(target)
+        if path.is_dir():
+            _add(_walk(path, include or DEFAULT_INCLUDE, exclude))
+        else:
+            relative = Path(os.path.abspath(path)).relative_to(files_root)
+            _add([SourceFile(path=path, relative=relative)])
+
+    _check_collisions(sources)
+    return sources
+
+
+def _check_collisions(sources: list[SourceFile]) -> None:
+    """Raise if two sources share a relative path once their suffix is dropped.
+
+    Their docs would otherwise overwrite each other in the output directory.
+    """
+    owners: dict[Path, Path] = {}
+    for source in sources:
+        key = source.relative.with_suffix("")
+        if key in owners:
+            raise ValueError(
+                f"{owners[key]} and {source.path} map to the same doc path ({key})"
+            )
+        owners[key] = source.path
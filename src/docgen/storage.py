@@ -1,18 +1,117 @@
+import copy
+import fcntl
 import json
+import os
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
-from docgen.models import DocEntry, DocStatus
+from docgen import metrics
+from docgen.files import atomic_write
+from docgen.models import DocEntry, DocStatus, ImportRecord
 
 STORAGE_DIR = Path.cwd() / ".docgen"
 STORAGE_PATH = STORAGE_DIR / "docs.json"
+DB_PATH = STORAGE_DIR / "docs.db"
 
+# Seconds to wait for another process's write transaction before giving up
+BUSY_TIMEOUT = float(os.environ.get("DOCGEN_BUSY_TIMEOUT", "30"))
 
-def _ensure_storage_exists() -> None:
-    """Create storage directory and file if they don't exist."""
-    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-    if not STORAGE_PATH.exists():
-        STORAGE_PATH.write_text(json.dumps({"version": 1, "entries": []}))
+# Once the write-ahead log grows past this, it is checkpointed into docs.db
+# and a docs.json snapshot is exported
+COMPACT_WAL_BYTES = 4 * 1024 * 1024
+
+# Each step upgrades the schema by one version (tracked in PRAGMA user_version)
+_MIGRATIONS = [
+    """
+    CREATE TABLE entries (
+        source_file TEXT PRIMARY KEY,
+        doc_file TEXT NOT NULL,
+        status TEXT NOT NULL,
+        generated_at TEXT NOT NULL,
+        source_hash TEXT NOT NULL DEFAULT ''
+    );
+    CREATE INDEX idx_entries_status ON entries (status);
+    """,
+    """
+    ALTER TABLE entries ADD COLUMN source_mtime_ns INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE entries ADD COLUMN source_size INTEGER NOT NULL DEFAULT 0;
+    """,
+    """
+    ALTER TABLE entries ADD COLUMN symbol_hashes TEXT NOT NULL DEFAULT '{}';
+    """,
+    """
+    CREATE INDEX idx_entries_generated_at ON entries (generated_at);
+    """,
+    """
+    CREATE TABLE imports (
+        source_file TEXT PRIMARY KEY,
+        module TEXT NOT NULL,
+        imports TEXT NOT NULL DEFAULT '[]',
+        source_hash TEXT NOT NULL DEFAULT '',
+        source_mtime_ns INTEGER NOT NULL DEFAULT 0,
+        source_size INTEGER NOT NULL DEFAULT 0
+    );
+    """,
+    """
+    ALTER TABLE entries ADD COLUMN simhash INTEGER NOT NULL DEFAULT 0;
+    CREATE INDEX idx_entries_simhash_band0 ON entries ((simhash >> 0) & 65535);
+    CREATE INDEX idx_entries_simhash_band1 ON entries ((simhash >> 16) & 65535);
+    CREATE INDEX idx_entries_simhash_band2 ON entries ((simhash >> 32) & 65535);
+    CREATE INDEX idx_entries_simhash_band3 ON entries ((simhash >> 48) & 65535);
+    """,
+    """
+    ALTER TABLE entries ADD COLUMN api_signature TEXT NOT NULL DEFAULT '';
+    """,
+    """
+    ALTER TABLE entries ADD COLUMN git_blob TEXT NOT NULL DEFAULT '';
+    """,
+]
+
+_COLUMNS = (
+    "source_file",
+    "doc_file",
+    "status",
+    "generated_at",
+    "source_hash",
+    "source_mtime_ns",
+    "source_size",
+    "symbol_hashes",
+    "simhash",
+    "api_signature",
+    "git_blob",
+)
+
+# Columns stored as JSON text in the database
+_JSON_COLUMNS = ("symbol_hashes",)
+
+# Columns that are only valid together. Everything recorded from one read of
+# the source goes in one group, so a session that changes any of them writes
+# all of them and never pairs its source_hash with another process's status.
+_COLUMN_GROUPS = (
+    ("doc_file",),
+    (
+        "status",
+        "generated_at",
+        "source_hash",
+        "source_mtime_ns",
+        "source_size",
+        "symbol_hashes",
+        "simhash",
+        "api_signature",
+        "git_blob",
+    ),
+)
+
+# Sort keys accepted by iter_entries, mapped to their columns
+SORT_COLUMNS = {
+    "source": "source_file",
+    "doc": "doc_file",
+    "status": "status",
+    "generated": "generated_at",
+}
 
 
 def _entry_to_dict(entry: DocEntry) -> dict:
@@ -23,62 +122,516 @@ def _entry_to_dict(entry: DocEntry) -> dict:
         "status": entry.status.value,
         "generated_at": entry.generated_at.isoformat(),
         "source_hash": entry.source_hash,
+        "source_mtime_ns": entry.source_mtime_ns,
+        "source_size": entry.source_size,
+        "symbol_hashes": entry.symbol_hashes,
+        "simhash": entry.simhash,
+        "api_signature": entry.api_signature,
+        "git_blob": entry.git_blob,
     }
 
 
 def _dict_to_entry(data: dict) -> DocEntry:
     """Convert a dictionary to a DocEntry object."""
+    try:
+        generated_at = datetime.fromisoformat(data["generated_at"])
+    except ValueError:
+        # Older manifests could contain placeholder timestamps
+        generated_at = datetime.now()
+
     return DocEntry(
         source_file=data["source_file"],
         doc_file=data["doc_file"],
         status=DocStatus(data["status"]),
-        generated_at=datetime.fromisoformat(data["generated_at"]),
+        generated_at=generated_at,
         source_hash=data["source_hash"],
+        source_mtime_ns=data.get("source_mtime_ns", 0),
+        source_size=data.get("source_size", 0),
+        symbol_hashes=data.get("symbol_hashes", {}),
+        simhash=data.get("simhash", 0),
+        api_signature=data.get("api_signature", ""),
+        git_blob=data.get("git_blob", ""),
+    )
+
+
+def _row_values(entry: DocEntry) -> dict:
+    """Convert a DocEntry to its column values."""
+    data = _entry_to_dict(entry)
+    for column in _JSON_COLUMNS:
+        data[column] = json.dumps(data[column], sort_keys=True)
+    return data
+
+
+def _row_params(entry: DocEntry) -> tuple:
+    """Convert a DocEntry to a tuple of column values in _COLUMNS order."""
+    data = _row_values(entry)
+    return tuple(data[column] for column in _COLUMNS)
+
+
+def _row_to_entry(row: sqlite3.Row) -> DocEntry:
+    """Convert a database row to a DocEntry object."""
+    data = dict(row)
+    for column in _JSON_COLUMNS:
+        data[column] = json.loads(data[column])
+    return _dict_to_entry(data)
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    """Run statements in a write transaction, rolling back on error."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _migrate_json(conn: sqlite3.Connection) -> None:
+    """Import entries from a legacy docs.json manifest and keep it as a backup."""
+    if not STORAGE_PATH.exists():
+        return
+
+    data = json.loads(STORAGE_PATH.read_text())
+    conn.executemany(
+        f"INSERT OR REPLACE INTO entries ({', '.join(_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+        [_row_params(_dict_to_entry(e)) for e in data["entries"]],
     )
+    STORAGE_PATH.rename(STORAGE_PATH.with_suffix(".json.bak"))
 
 
+@metrics.timed("storage")
+def _prepare(conn: sqlite3.Connection) -> None:
+    """Bring the schema up to date, migrating docs.json on first use."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] == len(_MIGRATIONS):
+        return
+
+    with _transaction(conn):
+        # Re-read inside the lock in case another process migrated first
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for step in _MIGRATIONS[version:]:
+            for statement in step.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+        if version == 0:
+            _migrate_json(conn)
+        conn.execute(f"PRAGMA user_version = {len(_MIGRATIONS)}")
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """Open the storage database, creating and migrating it if needed."""
+    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    try:
+        # Readers never block writers in WAL mode; writers call compact() to
+        # checkpoint the log once it grows large
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA wal_autocheckpoint = 0")
+        _prepare(conn)
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _write() -> Iterator[sqlite3.Connection]:
+    """Open the database for a single write transaction, compacting afterwards."""
+    with _connect() as conn:
+        with _transaction(conn):
+            yield conn
+        # Closing the last connection checkpoints the log anyway, so check it first
+        compact()
+
+
+def _update(conn: sqlite3.Connection, entry: DocEntry, original: DocEntry) -> None:
+    """Write only the column groups of an entry that changed since it was loaded.
+
+    Groups other processes changed in the meantime are left alone. If the
+    row was deleted meanwhile, the entry is inserted again.
+    """
+    new, old = _row_values(entry), _row_values(original)
+    columns = [
+        c for group in _COLUMN_GROUPS
+        if any(new[c] != old[c] for c in group)
+        for c in group
+    ]
+    if not columns:
+        return
+    cursor = conn.execute(
+        f"UPDATE entries SET {', '.join(f'{c} = ?' for c in columns)} WHERE source_file = ?",
+        [new[c] for c in columns] + [entry.source_file],
+    )
+    if cursor.rowcount == 0:
+        _upsert(conn, [entry])
+
+
+def _upsert(conn: sqlite3.Connection, entries: list[DocEntry]) -> None:
+    """Insert entries, replacing existing rows for the same source file."""
+    updates = ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c != "source_file")
+    conn.executemany(
+        f"INSERT INTO entries ({', '.join(_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in _COLUMNS)}) "
+        f"ON CONFLICT (source_file) DO UPDATE SET {updates}",
+        [_row_params(e) for e in entries],
+    )
+
+
+@metrics.timed("storage")
 def load_entries() -> list[DocEntry]:
     """Load all documentation entries from storage."""
-    _ensure_storage_exists()
-    data = json.loads(STORAGE_PATH.read_text())
-    return [_dict_to_entry(e) for e in data["entries"]]
+    with _connect() as conn:
+        rows = conn.execute("SELECT * FROM entries ORDER BY rowid").fetchall()
+    return [_row_to_entry(row) for row in rows]
 
 
+@metrics.timed("storage")
 def save_entries(entries: list[DocEntry]) -> None:
-    """Save all documentation entries to storage."""
-    _ensure_storage_exists()
-    data = {"version": 1, "entries": [_entry_to_dict(e) for e in entries]}
-    STORAGE_PATH.write_text(json.dumps(data, indent=2))
+    """Replace all documentation entries in storage."""
+    with _write() as conn:
+        conn.execute("DELETE FROM entries")
+        _upsert(conn, entries)
 
 
+@metrics.timed("storage")
 def add_entry(entry: DocEntry) -> None:
-    """Add an entry and save to storage."""
-    entries = load_entries()
-    entries.append(entry)
-    save_entries(entries)
+    """Add an entry, or replace the existing entry for the same source file."""
+    with _write() as conn:
+        _upsert(conn, [entry])
+
 
+@metrics.timed("storage")
+def set_status(source_file: str, status: DocStatus) -> None:
+    """Update the status of a single entry."""
+    with _write() as conn:
+        conn.execute(
+            "UPDATE entries SET status = ? WHERE source_file = ?", (status.value, source_file)
+        )
 
+
+@metrics.timed("storage")
 def get_entries(status: DocStatus | None = None) -> list[DocEntry]:
     """Get entries with optional filtering by status."""
-    entries = load_entries()
+    with _connect() as conn:
+        if status is None:
+            rows = conn.execute("SELECT * FROM entries ORDER BY rowid").fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT * FROM entries WHERE status = ? ORDER BY rowid", (status.value,)
+            ).fetchall()
+    return [_row_to_entry(row) for row in rows]
+
+
+def _prefix_filter(prefix: str | None) -> tuple[str, tuple]:
+    """Build a WHERE clause matching source files that start with prefix.
+
+    A range over the primary key is used instead of LIKE so SQLite can
+    answer it from the index, and so % and _ in paths aren't wildcards.
+    """
+    if not prefix:
+        return "1", ()
+    return "source_file >= ? AND source_file < ?", (prefix, prefix + "\U0010ffff")
+
 
+def iter_entries(
+    status: DocStatus | None = None,
+    prefix: str | None = None,
+    sort: str | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+    offset: int = 0,
+) -> Iterator[DocEntry]:
+    """Yield entries one at a time, filtered, sorted and paged by the database.
+
+    Args:
+        status: Only yield entries with this status.
+        prefix: Only yield entries whose source path starts with this prefix.
+        sort: A key of SORT_COLUMNS. Defaults to storage order.
+        descending: Reverse the sort order.
+        limit: Maximum number of entries to yield.
+        offset: Number of matching entries to skip.
+    """
+    where, params = _prefix_filter(prefix)
     if status is not None:
-        entries = [e for e in entries if e.status == status]
+        where += " AND status = ?"
+        params += (status.value,)
+    order = SORT_COLUMNS[sort] if sort else "rowid"
+    # Tie-break on the primary key so pages are stable
+    direction = "DESC" if descending else "ASC"
+    query = (
+        f"SELECT * FROM entries WHERE {where} "
+        f"ORDER BY {order} {direction}, source_file {direction} LIMIT ? OFFSET ?"
+    )
+    params += (-1 if limit is None else limit, offset)
+
+    with _connect() as conn:
+        for row in conn.execute(query, params):
+            yield _row_to_entry(row)
 
-    return entries
 
+@metrics.timed("storage")
+def count_entries(prefix: str | None = None) -> dict[DocStatus, int]:
+    """Count entries per status, optionally under a source path prefix."""
+    where, params = _prefix_filter(prefix)
+    counts = dict.fromkeys(DocStatus, 0)
+    with _connect() as conn:
+        for status, count in conn.execute(
+            f"SELECT status, COUNT(*) FROM entries WHERE {where} GROUP BY status", params
+        ):
+            counts[DocStatus(status)] = count
+    return counts
 
+
+@metrics.timed("storage")
 def find_entry(source_file: str) -> DocEntry | None:
     """Find an entry by source file path. Returns None if not found."""
-    entries = load_entries()
-    for entry in entries:
-        if entry.source_file == source_file:
-            return entry
-    return None
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT * FROM entries WHERE source_file = ?", (source_file,)
+        ).fetchone()
+    return _row_to_entry(row) if row else None
 
 
+@metrics.timed("storage")
 def delete_entry(source_file: str) -> None:
     """Delete an entry by source file path."""
-    entries = load_entries()
-    entries = [e for e in entries if e.source_file != source_file]
-    save_entries(entries)
+    with _write() as conn:
+        conn.execute("DELETE FROM entries WHERE source_file = ?", (source_file,))
+
+
+@metrics.timed("storage")
+def source_hashes() -> set[str]:
+    """Return the source hashes recorded by any entry."""
+    with _connect() as conn:
+        return {row[0] for row in conn.execute("SELECT DISTINCT source_hash FROM entries")}
+
+
+@metrics.timed("storage")
+def load_imports() -> dict[str, ImportRecord]:
+    """Load the cached import graph, keyed by source file."""
+    with _connect() as conn:
+        rows = conn.execute("SELECT * FROM imports").fetchall()
+    records = {}
+    for row in rows:
+        data = dict(row)
+        data["imports"] = json.loads(data["imports"])
+        records[row["source_file"]] = ImportRecord(**data)
+    return records
+
+
+@metrics.timed("storage")
+def save_imports(records: list[ImportRecord], removed: list[str]) -> None:
+    """Upsert import graph records and drop those of untracked files."""
+    if not records and not removed:
+        return
+    with _write() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO imports "
+            "(source_file, module, imports, source_hash, source_mtime_ns, source_size) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (r.source_file, r.module, json.dumps(r.imports), r.source_hash,
+                 r.source_mtime_ns, r.source_size)
+                for r in records
+            ],
+        )
+        conn.executemany("DELETE FROM imports WHERE source_file = ?", [(s,) for s in removed])
+
+
+class Session:
+    """Unit of work over the storage database.
+
+    Entries are read at most once per session and kept in memory keyed by
+    source path. Callers may mutate returned entries in place or put new
+    ones; flush() writes only the entries that actually changed.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+        self._entries: dict[str, DocEntry | None] = {}
+        self._original: dict[str, DocEntry] = {}
+        self._loaded_all = False
+
+    def _remember(self, entry: DocEntry) -> DocEntry:
+        """Cache an entry loaded from the database with a pristine copy."""
+        self._entries[entry.source_file] = entry
+        self._original[entry.source_file] = copy.deepcopy(entry)
+        return entry
+
+    @metrics.timed("storage")
+    def _load_all(self) -> None:
+        """Load every entry not already cached, in storage order."""
+        if self._loaded_all:
+            return
+        for row in self._conn.execute("SELECT * FROM entries ORDER BY rowid"):
+            if row["source_file"] not in self._entries:
+                self._remember(_row_to_entry(row))
+        self._loaded_all = True
+
+    @metrics.timed("storage")
+    def get(self, source_file: str) -> DocEntry | None:
+        """Return the entry for a source file, or None if it isn't tracked."""
+        if source_file not in self._entries and not self._loaded_all:
+            row = self._conn.execute(
+                "SELECT * FROM entries WHERE source_file = ?", (source_file,)
+            ).fetchone()
+            if row is None:
+                self._entries[source_file] = None
+            else:
+                self._remember(_row_to_entry(row))
+        return self._entries.get(source_file)
+
+    def put(self, entry: DocEntry) -> None:
+        """Add an entry or replace the entry for the same source file."""
+        self.get(entry.source_file)
+        self._entries[entry.source_file] = entry
+
+    def delete(self, source_file: str) -> None:
+        """Remove an entry from storage on the next flush."""
+        self.get(source_file)
+        self._entries[source_file] = None
+
+    @metrics.timed("storage")
+    def find_by_bands(self, bands: list[int]) -> list[DocEntry]:
+        """Return entries whose SimHash shares any 16-bit band with the given bands.
+
+        Entries put in this session but not yet flushed are included.
+        """
+        terms = " OR ".join(f"((simhash >> {16 * i}) & 65535) = ?" for i in range(len(bands)))
+        for row in self._conn.execute(
+            f"SELECT * FROM entries WHERE simhash != 0 AND ({terms})", bands
+        ):
+            if row["source_file"] not in self._entries:
+                self._remember(_row_to_entry(row))
+
+        return [
+            e for e in self._entries.values()
+            if e is not None and e.simhash
+            and any(((e.simhash >> (16 * i)) & 65535) == b for i, b in enumerate(bands))
+        ]
+
+    def entries(self, status: DocStatus | None = None) -> list[DocEntry]:
+        """Return all tracked entries with optional filtering by status."""
+        self._load_all()
+        return [
+            e for e in self._entries.values()
+            if e is not None and (status is None or e.status == status)
+        ]
+
+    def dirty(self) -> tuple[list[DocEntry], list[str]]:
+        """Return the entries to upsert and the source files to delete."""
+        changed = []
+        deleted = []
+        for source_file, entry in self._entries.items():
+            original = self._original.get(source_file)
+            if entry is None:
+                if original is not None:
+                    deleted.append(source_file)
+            elif entry != original:
+                changed.append(entry)
+        return changed, deleted
+
+    @metrics.timed("storage")
+    def flush(self) -> bool:
+        """Write pending changes in one transaction, compacting if the log has grown.
+
+        Entries loaded from storage only have their changed column groups
+        written, so concurrent processes editing unrelated fields don't undo
+        each other.
+
+        Returns:
+            True if anything was written, False if the session was clean.
+        """
+        changed, deleted = self.dirty()
+        if not changed and not deleted:
+            return False
+
+        added = [e for e in changed if e.source_file not in self._original]
+        with _transaction(self._conn):
+            if added:
+                _upsert(self._conn, added)
+            for entry in changed:
+                if entry.source_file in self._original:
+                    _update(self._conn, entry, self._original[entry.source_file])
+            self._conn.executemany(
+                "DELETE FROM entries WHERE source_file = ?", [(s,) for s in deleted]
+            )
+
+        for entry in changed:
+            self._original[entry.source_file] = copy.deepcopy(entry)
+        for source_file in deleted:
+            self._original.pop(source_file, None)
+        compact()
+        return True
+
+
+@contextmanager
+def session() -> Iterator[Session]:
+    """Open a storage session that flushes its changes once on exit.
+
+    Changes are flushed even when the block raises, so work that completed
+    before an error (for example part of a batch run) is not lost.
+    """
+    with _connect() as conn:
+        db = Session(conn)
+        try:
+            yield db
+        finally:
+            db.flush()
+
+
+@metrics.timed("storage")
+def export_snapshot(path: Path | None = None) -> int:
+    """Write every entry to a docs.json-format manifest, atomically.
+
+    Returns:
+        The number of entries written.
+    """
+    with _connect() as conn:
+        rows = conn.execute("SELECT * FROM entries ORDER BY rowid").fetchall()
+    entries = [_entry_to_dict(_row_to_entry(row)) for row in rows]
+    with atomic_write(path or STORAGE_PATH) as f:
+        json.dump({"version": 1, "entries": entries}, f, indent=2)
+    return len(entries)
+
+
+def read_manifest(path: Path) -> list[DocEntry]:
+    """Read the entries of a docs.json manifest, such as one written by export_snapshot.
+
+    Raises:
+        ValueError: If the file isn't a docs.json manifest.
+    """
+    try:
+        data = json.loads(path.read_text())
+        return [_dict_to_entry(e) for e in data["entries"]]
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid manifest: {path}") from e
+
+
+@metrics.timed("storage")
+def compact(force: bool = False) -> bool:
+    """Checkpoint the write-ahead log into docs.db and export docs.json.
+
+    Runs once the log passes COMPACT_WAL_BYTES, or always with force. Only
+    one process compacts at a time; others skip instead of waiting.
+
+    Returns:
+        True if this process compacted.
+    """
+    wal = DB_PATH.with_name(DB_PATH.name + "-wal")
+    if not force and (not wal.exists() or wal.stat().st_size < COMPACT_WAL_BYTES):
+        return False
+
+    with open(STORAGE_DIR / "compact.lock", "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        with _connect() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        export_snapshot()
+    return True
@@ -0,0 +1,162 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+# inotify event flags (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Editors save in place or write a temp file and rename it over the original
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# struct inotify_event: int wd; uint32_t mask, cookie, len; char name[len]
+_EVENT = struct.Struct("iIII")
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+class Debouncer:
+    """Collapse bursts of events per path into one, once the path goes quiet."""
+
+    def __init__(self, delay: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.delay = delay
+        self._clock = clock
+        self._last: dict[str, float] = {}
+
+    def touch(self, path: str) -> None:
+        """Record an event for a path, pushing back its deadline."""
+        self._last[path] = self._clock()
+
+    def ready(self) -> list[str]:
+        """Return and forget the paths that have been quiet for the delay."""
+        now = self._clock()
+        done = [p for p, t in self._last.items() if now - t >= self.delay]
+        for path in done:
+            del self._last[path]
+        return done
+
+    def timeout(self) -> float | None:
+        """Return the seconds until the next path becomes ready, or None if idle."""
+        if not self._last:
+            return None
+        return max(0.0, min(self._last.values()) + self.delay - self._clock())
+
+
+class PollingWatcher:
+    """Detect changes by comparing size and mtime of each path at an interval."""
+
+    def __init__(self, paths: Iterable[str], interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        self.interval = interval
+        self._stats = {path: self._stat(path) for path in paths}
+        self._next_scan = time.monotonic() + interval
+
+    @staticmethod
+    def _stat(path: str) -> tuple[int, int] | None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self, timeout: float) -> set[str]:
+        """Wait up to timeout seconds and return the paths that changed."""
+        wait = self._next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        self._next_scan = time.monotonic() + self.interval
+
+        changed = set()
+        for path, previous in self._stats.items():
+            current = self._stat(path)
+            if current is not None and current != previous:
+                changed.add(path)
+            self._stats[path] = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher over the directories containing the paths.
+
+    Watching directories rather than files keeps working when editors
+    replace a file by renaming a temp file over it.
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc = libc
+
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # Resolved path -> path as tracked in storage
+        self._tracked = {str(Path(p).resolve()): p for p in paths}
+        self._dirs: dict[int, str] = {}
+        try:
+            for directory in {os.path.dirname(p) for p in self._tracked}:
+                wd = libc.inotify_add_watch(self._fd, directory.encode(), _WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+                self._dirs[wd] = directory
+        except OSError:
+            self.close()
+            raise
+
+    def poll(self, timeout: float) -> set[str]:
+        """Wait up to timeout seconds and return the tracked paths that changed."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, _mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+                path = os.path.join(self._dirs.get(wd, ""), name)
+                if path in self._tracked:
+                    changed.add(self._tracked[path])
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(
+    paths: Iterable[str], polling: bool = False, interval: float = DEFAULT_POLL_INTERVAL
+) -> InotifyWatcher | PollingWatcher:
+    """Return an inotify watcher where available, falling back to polling."""
+    paths = list(paths)
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except OSError:
+            pass
+    return PollingWatcher(paths, interval)
@@ -1,5 +1,5 @@
 import json
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from typer.testing import CliRunner
@@ -11,18 +11,32 @@ def runner():
     return CliRunner()
 
 
-@pytest.fixture
-def temp_storage(tmp_path, monkeypatch):
-    """Empty storage for testing."""
+@pytest.fixture(autouse=True)
+def reset_cache(monkeypatch):
+    """Start every test with the response cache enabled and empty counters."""
+    from docgen import cache
+    monkeypatch.setattr(cache, "enabled", True)
+    cache.reset_stats()
+
+
+@pytest.fixture(autouse=True)
+def isolated_storage(tmp_path, monkeypatch):
+    """Point storage at the test's temp directory so no test touches the repo's .docgen."""
     storage_dir = tmp_path / ".docgen"
-    storage_dir.mkdir()
-    storage_file = storage_dir / "docs.json"
-    storage_file.write_text(json.dumps({"version": 1, "entries": []}))
 
     from docgen import storage
     monkeypatch.setattr(storage, "STORAGE_DIR", storage_dir)
-    monkeypatch.setattr(storage, "STORAGE_PATH", storage_file)
+    monkeypatch.setattr(storage, "STORAGE_PATH", storage_dir / "docs.json")
+    monkeypatch.setattr(storage, "DB_PATH", storage_dir / "docs.db")
+    return storage_dir
+
 
+@pytest.fixture
+def temp_storage(isolated_storage):
+    """Empty storage for testing."""
+    isolated_storage.mkdir()
+    storage_file = isolated_storage / "docs.json"
+    storage_file.write_text(json.dumps({"version": 1, "entries": []}))
     return storage_file
 
 
@@ -55,9 +69,30 @@ def sample_data(temp_storage):
 @pytest.fixture
 def mock_llm():
     """Mock the LLM module to avoid real API calls in tests."""
-    with patch("docgen.llm._get_client") as mock_client:
+    with (
+        patch("docgen.llm._get_client") as mock_client,
+        patch("docgen.llm._get_async_client") as mock_async_client,
+    ):
         mock_response = MagicMock()
         mock_response.choices = [MagicMock()]
         mock_response.choices[0].message.content = "# Mock Documentation\n\nGenerated docs."
         mock_client.return_value.chat.completions.create.return_value = mock_response
+        mock_async_client.return_value.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+        mock_client.async_client = mock_async_client
         yield mock_client
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Local fake OpenAI API with the SDK pointed at it."""
+    from docgen import clients
+    from tests.fake_openai import FakeOpenAIServer
+
+    server = FakeOpenAIServer().start()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    yield server
+    clients.reset()
+    server.stop()
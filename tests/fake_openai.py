@@ -0,0 +1,223 @@
+"""A local stand-in for the OpenAI HTTP API used by tests.
+
+Implements just enough of the chat completions, files and batches
+endpoints for the OpenAI SDK to talk to it. Start it with
+``FakeOpenAIServer().start()`` and point OPENAI_BASE_URL at ``base_url``.
+"""
+
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _completion(content: str, model: str = "gpt-4o-mini") -> dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def _multipart_file(body: bytes, content_type: str) -> bytes:
+    """Extract the 'file' part from a multipart/form-data body."""
+    boundary = content_type.split("boundary=")[1].strip('"').encode()
+    for part in body.split(b"--" + boundary):
+        if b'name="file"' in part:
+            content = part.split(b"\r\n\r\n", 1)[1]
+            return content[:-2] if content.endswith(b"\r\n") else content
+    raise ValueError("no file part")
+
+
+class FakeOpenAIServer:
+    """In-process fake OpenAI API server.
+
+    Args:
+        latency: Seconds to sleep before answering a chat completion.
+        error_rate: Fraction of chat completions answered with HTTP 429.
+        polls_until_complete: Batch status checks before a batch completes.
+        failing_custom_ids: Batch requests that come back as errors.
+        respond: Function building the completion text from the request messages.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        polls_until_complete: int = 1,
+        failing_custom_ids: set[str] | None = None,
+        respond=None,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.polls_until_complete = polls_until_complete
+        self.failing_custom_ids = failing_custom_ids or set()
+        self.respond = respond or (lambda messages: "# Fake Documentation\n\nGenerated docs.")
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.connections = 0
+        self._ids = itertools.count(1)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_id(self, prefix: str) -> str:
+        with self._lock:
+            return f"{prefix}-{next(self._ids)}"
+
+    def _run_batch(self, batch: dict) -> None:
+        """Answer every request of a batch and attach output and error files."""
+        output, errors = [], []
+        for line in self.files[batch["input_file_id"]].decode().splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            custom_id = request["custom_id"]
+            if custom_id in self.failing_custom_ids:
+                errors.append({
+                    "id": f"batch_req_{custom_id}",
+                    "custom_id": custom_id,
+                    "response": {"status_code": 500, "body": {"error": {"message": "boom"}}},
+                    "error": None,
+                })
+                continue
+            content = self.respond(request["body"]["messages"])
+            output.append({
+                "id": f"batch_req_{custom_id}",
+                "custom_id": custom_id,
+                "response": {"status_code": 200, "request_id": "req", "body": _completion(content)},
+                "error": None,
+            })
+
+        for key, records in (("output_file_id", output), ("error_file_id", errors)):
+            if records:
+                file_id = self._next_id("file")
+                self.files[file_id] = "\n".join(json.dumps(r) for r in records).encode()
+                batch[key] = file_id
+        batch["status"] = "completed"
+        batch["request_counts"] = {
+            "total": len(output) + len(errors),
+            "completed": len(output),
+            "failed": len(errors),
+        }
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 so clients can keep connections alive between requests
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload, raw: bool = False, headers=None):
+                body = payload if raw else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/octet-stream" if raw else "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_POST(self):
+                body = self._body()
+                fake.requests.append(("POST", self.path))
+
+                if self.path == "/v1/chat/completions":
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    with fake._lock:
+                        throttled = fake._random.random() < fake.error_rate
+                    if throttled:
+                        self._send(
+                            429,
+                            {"error": {"message": "Rate limit reached", "type": "requests"}},
+                            headers={"retry-after-ms": "10"},
+                        )
+                        return
+                    request = json.loads(body)
+                    self._send(200, _completion(fake.respond(request["messages"]), request["model"]))
+                elif self.path == "/v1/files":
+                    file_id = fake._next_id("file")
+                    fake.files[file_id] = _multipart_file(body, self.headers["Content-Type"])
+                    self._send(200, {
+                        "id": file_id,
+                        "object": "file",
+                        "bytes": len(fake.files[file_id]),
+                        "created_at": int(time.time()),
+                        "filename": "input.jsonl",
+                        "purpose": "batch",
+                        "status": "processed",
+                    })
+                elif self.path == "/v1/batches":
+                    request = json.loads(body)
+                    batch_id = fake._next_id("batch")
+                    fake.batches[batch_id] = {
+                        "id": batch_id,
+                        "object": "batch",
+                        "endpoint": request["endpoint"],
+                        "input_file_id": request["input_file_id"],
+                        "completion_window": request["completion_window"],
+                        "created_at": int(time.time()),
+                        "status": "validating",
+                        "polls": 0,
+                    }
+                    self._send(200, fake.batches[batch_id])
+                else:
+                    self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+            def do_GET(self):
+                fake.requests.append(("GET", self.path))
+                parts = self.path.strip("/").split("/")
+
+                if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+                    batch = fake.batches[parts[2]]
+                    batch["polls"] += 1
+                    if batch["status"] != "completed":
+                        if batch["polls"] >= fake.polls_until_complete:
+                            fake._run_batch(batch)
+                        else:
+                            batch["status"] = "in_progress"
+                    self._send(200, batch)
+                elif parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content":
+                    self._send(200, fake.files[parts[2]], raw=True)
+                else:
+                    self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        return Handler
@@ -0,0 +1,103 @@
+"""Tests for Batch API mode (generate --batch and batch collect)."""
+
+from docgen import batch, storage
+from docgen.commands import app
+
+
+def _sources(tmp_path, count=2):
+    paths = []
+    for i in range(count):
+        source = tmp_path / f"module{i}.py"
+        source.write_text(f"def f{i}(): pass\n")
+        paths.append(source)
+    return paths
+
+
+class TestBatchSubmit:
+    """Test suite for generate --batch."""
+
+    def test_submits_one_job(self, runner, temp_storage, fake_openai, tmp_path):
+        """Test that all sources go out as a single batch job."""
+        sources = _sources(tmp_path)
+
+        result = runner.invoke(app, ["generate", "--batch", *map(str, sources)])
+
+        assert result.exit_code == 0
+        assert len(fake_openai.batches) == 1
+        batch_id = next(iter(fake_openai.batches))
+        assert batch_id in result.output
+        assert batch.pending_jobs() == [batch_id]
+
+    def test_does_not_write_docs_yet(self, runner, temp_storage, fake_openai, tmp_path):
+        """Test that submitting leaves docs and storage untouched."""
+        sources = _sources(tmp_path)
+        output_dir = tmp_path / "docs"
+
+        runner.invoke(app, ["generate", "--batch", "-o", str(output_dir), *map(str, sources)])
+
+        assert not output_dir.exists()
+        assert storage.load_entries() == []
+
+
+class TestBatchCollect:
+    """Test suite for batch collect."""
+
+    def test_writes_docs_and_entries(self, runner, temp_storage, fake_openai, tmp_path):
+        """Test that collecting a finished job writes every doc and entry."""
+        sources = _sources(tmp_path)
+        output_dir = tmp_path / "docs"
+        runner.invoke(app, ["generate", "--batch", "-o", str(output_dir), *map(str, sources)])
+        batch_id = batch.pending_jobs()[0]
+
+        result = runner.invoke(app, ["batch", "collect", batch_id, "--poll-interval", "0"])
+
+        assert result.exit_code == 0
+        assert (output_dir / "module0.md").read_text() == "# Fake Documentation\n\nGenerated docs."
+        assert (output_dir / "module1.md").exists()
+        assert len(storage.load_entries()) == 2
+        assert batch.pending_jobs() == []
+
+    def test_waits_for_completion(self, runner, temp_storage, fake_openai, tmp_path, monkeypatch):
+        """Test that collect polls until the job completes."""
+        monkeypatch.chdir(tmp_path)
+        fake_openai.polls_until_complete = 3
+        runner.invoke(app, ["generate", "--batch", *map(str, _sources(tmp_path, 1))])
+
+        result = runner.invoke(app, ["batch", "collect", "--poll-interval", "0"])
+
+        assert result.exit_code == 0
+        assert "in_progress" in result.output
+        assert len(storage.load_entries()) == 1
+
+    def test_no_wait_leaves_job_pending(self, runner, temp_storage, fake_openai, tmp_path):
+        """Test that --no-wait returns while the job is still running."""
+        fake_openai.polls_until_complete = 3
+        runner.invoke(app, ["generate", "--batch", *map(str, _sources(tmp_path, 1))])
+
+        result = runner.invoke(app, ["batch", "collect", "--no-wait"])
+
+        assert result.exit_code == 0
+        assert "still" in result.output
+        assert len(batch.pending_jobs()) == 1
+
+    def test_reports_failed_requests(
+        self, runner, temp_storage, fake_openai, tmp_path, monkeypatch
+    ):
+        """Test that files whose requests failed are reported and not recorded."""
+        monkeypatch.chdir(tmp_path)
+        fake_openai.failing_custom_ids = {"1:0"}
+        sources = _sources(tmp_path)
+        runner.invoke(app, ["generate", "--batch", *map(str, sources)])
+
+        result = runner.invoke(app, ["batch", "collect", "--poll-interval", "0"])
+
+        assert result.exit_code == 1
+        assert "Failed" in result.output
+        assert [e.source_file for e in storage.load_entries()] == [str(sources[0])]
+
+    def test_unknown_job_shows_error(self, runner, temp_storage):
+        """Test that an unknown job ID is rejected."""
+        result = runner.invoke(app, ["batch", "collect", "batch-missing"])
+
+        assert result.exit_code == 2
+        assert "Unknown batch job" in result.output
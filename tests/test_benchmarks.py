@@ -0,0 +1,71 @@
+"""Tests for the benchmark suite helpers."""
+
+import json
+
+from benchmarks import compare, run, synthetic
+from docgen import storage
+from docgen.commands import app
+
+
+class TestPercentile:
+    """Test suite for latency percentiles."""
+
+    def test_nearest_rank(self):
+        """Test p50 and p99 on a known distribution."""
+        samples = [float(i) for i in range(1, 101)]
+
+        assert run.percentile(samples, 50) == 50.0
+        assert run.percentile(samples, 99) == 99.0
+        assert run.percentile([], 50) == 0.0
+
+
+class TestSynthetic:
+    """Test suite for synthetic projects."""
+
+    def test_manifest_matches_project(self, runner, temp_storage, tmp_path, monkeypatch):
+        """Test that a synthetic manifest checks out as current."""
+        monkeypatch.chdir(tmp_path)
+        sources = synthetic.make_project(tmp_path, 5)
+        synthetic.write_manifest(tmp_path, sources)
+
+        result = runner.invoke(app, ["check", "--all"])
+
+        assert result.exit_code == 0
+        assert len(storage.load_entries()) == 5
+        assert "5 checked (5 current" in result.output
+
+
+class TestCompare:
+    """Test suite for comparing result files."""
+
+    def test_reports_improvement_direction(self):
+        """Test that higher throughput and lower latency both count as improvements."""
+        base = {"results": [{"command": "list", "files": 10, "throughput_files_s": 100.0,
+                             "p50_ms": 10.0, "p99_ms": 20.0, "peak_rss_mb": 50.0,
+                             "manifest_io_s": 0.1}]}
+        head = {"results": [{"command": "list", "files": 10, "throughput_files_s": 200.0,
+                             "p50_ms": 5.0, "p99_ms": 20.0, "peak_rss_mb": 60.0,
+                             "manifest_io_s": 0.1}]}
+
+        rows = {r["metric"]: r["improvement_pct"] for r in compare.compare(base, head)}
+
+        assert rows["throughput_files_s"] == 100.0
+        assert rows["p50_ms"] == 50.0
+        assert rows["p99_ms"] == 0.0
+        assert rows["peak_rss_mb"] == -20.0
+
+
+class TestRun:
+    """Smoke test for the benchmark runner."""
+
+    def test_small_run_writes_results(self, tmp_path):
+        """Test that a tiny run produces a complete results file."""
+        output = tmp_path / "results.json"
+
+        run.main(["--files", "3", "--commands", "list", "check", "--repeat", "1",
+                  "--latency", "0", "--output", str(output)])
+
+        document = json.loads(output.read_text())
+        assert [r["command"] for r in document["results"]] == ["list", "check"]
+        assert document["results"][0]["files"] == 3
+        assert document["results"][1]["llm_requests"] == 1
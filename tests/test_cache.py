@@ -0,0 +1,103 @@
+"""Tests for the LLM response cache."""
+
+import os
+import time
+
+from docgen import cache
+from docgen.commands import app
+
+
+class TestCache:
+    """Test suite for the on-disk response cache."""
+
+    def test_rerun_on_unchanged_source_hits_cache(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that byte-identical source is served from the cache."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+        result = runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+
+        assert result.exit_code == 0
+        assert mock_llm.return_value.chat.completions.create.call_count == 1
+        assert cache.stats.hits == 1
+        assert (tmp_path / "docs" / "example.md").read_text() == "# Mock Documentation\n\nGenerated docs."
+
+    def test_changed_source_misses_cache(
+        self, runner, temp_storage, mock_llm, tmp_path, monkeypatch
+    ):
+        """Test that a source edit produces a new cache key."""
+        monkeypatch.chdir(tmp_path)
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+        runner.invoke(app, ["generate", str(source)])
+
+        source.write_text("def hello(): return 1")
+        runner.invoke(app, ["generate", str(source)])
+
+        assert mock_llm.return_value.chat.completions.create.call_count == 2
+
+    def test_no_cache_flag_bypasses_cache(
+        self, runner, temp_storage, mock_llm, tmp_path, monkeypatch
+    ):
+        """Test that --no-cache always calls the LLM."""
+        monkeypatch.chdir(tmp_path)
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+
+        runner.invoke(app, ["generate", str(source)])
+        runner.invoke(app, ["generate", str(source), "--no-cache"])
+
+        assert mock_llm.return_value.chat.completions.create.call_count == 2
+
+    def test_key_depends_on_model_and_prompt_version(self):
+        """Test that keys change with the model and prompt template version."""
+        messages = [{"role": "user", "content": "hi"}]
+
+        key = cache.make_key("gpt-4o-mini", 1, messages)
+
+        assert key == cache.make_key("gpt-4o-mini", 1, messages)
+        assert key != cache.make_key("gpt-4o", 1, messages)
+        assert key != cache.make_key("gpt-4o-mini", 2, messages)
+
+
+class TestEviction:
+    """Test suite for cache eviction."""
+
+    def _fill(self, count):
+        keys = [cache.make_key("m", 1, [{"content": str(i)}]) for i in range(count)]
+        for i, key in enumerate(keys):
+            cache.put(key, "m", "x" * 100)
+            # Spread access times so LRU order is deterministic
+            os.utime(cache._entry_path(key), (time.time() - 100 + i * 10, time.time() - 100 + i * 10))
+        return keys
+
+    def test_evicts_least_recently_used_over_size_limit(self, temp_storage):
+        """Test that the oldest entries go first when over the size limit."""
+        keys = self._fill(5)
+        entry_size = cache._entry_path(keys[0]).stat().st_size
+
+        removed = cache.evict(max_bytes=entry_size * 2 + entry_size // 2, max_age=3600)
+
+        assert removed == 3
+        assert not cache._entry_path(keys[0]).exists()
+        assert cache._entry_path(keys[4]).exists()
+
+    def test_evicts_expired_entries(self, temp_storage):
+        """Test that entries unused for longer than the max age are dropped."""
+        keys = self._fill(3)
+
+        removed = cache.evict(max_bytes=10**9, max_age=95)
+
+        assert removed == 1
+        assert not cache._entry_path(keys[0]).exists()
+
+    def test_hit_refreshes_recency(self, temp_storage):
+        """Test that reading an entry protects it from LRU eviction."""
+        keys = self._fill(3)
+        entry_size = cache._entry_path(keys[0]).stat().st_size
+
+        cache.get(keys[0])
+        cache.evict(max_bytes=entry_size + entry_size // 2, max_age=3600)
+
+        assert cache._entry_path(keys[0]).exists()
@@ -1,6 +1,15 @@
 """Tests for the check command."""
 
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from docgen import objects, storage
 from docgen.commands import app
+from docgen.hashing import git_blob_hash, hash_bytes
+from docgen.models import DocStatus
 
 
 class TestCheck:
@@ -22,3 +31,367 @@ class TestCheck:
 
         assert result.exit_code == 2
         assert "No documentation found" in result.output
+
+    def test_changed_source_marks_docs_stale(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that a changed source is checked by the LLM and marked stale."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+        source.write_text("def hello(name): return 1")
+
+        result = runner.invoke(app, ["check", str(source)])
+
+        assert result.exit_code == 0
+        assert "Docs may be stale" in result.output
+        assert storage.find_entry(str(source)).status == DocStatus.STALE
+
+    def test_unchanged_source_is_up_to_date(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that an unchanged source skips the LLM."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+
+        result = runner.invoke(app, ["check", str(source)])
+
+        assert result.exit_code == 0
+        assert "Docs are up to date" in result.output
+        assert mock_llm.return_value.chat.completions.create.call_count == 1
+
+
+class TestCheckAll:
+    """Test suite for sweeping all tracked entries."""
+
+    def _generate(self, runner, tmp_path, *names):
+        sources = []
+        for name in names:
+            source = tmp_path / name
+            source.write_text(f"def {name[:-3]}(): pass")
+            runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+            sources.append(source)
+        return sources
+
+    def test_unchanged_files_skip_reading(self, runner, temp_storage, mock_llm, tmp_path, monkeypatch):
+        """Test that files with matching size and mtime are not hashed."""
+        self._generate(runner, tmp_path, "a.py", "b.py")
+        from docgen.commands import check as check_module
+        monkeypatch.setattr(check_module, "hash_files", lambda paths: pytest.fail("hashed") if paths else {})
+
+        result = runner.invoke(app, ["check", "--all"])
+
+        assert result.exit_code == 0
+        assert "2 checked (2 current" in result.output
+
+    def test_touched_but_identical_file_refreshes_stat(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that a touched file with the same content is current and its stat recorded."""
+        (source,) = self._generate(runner, tmp_path, "a.py")
+        os.utime(source, ns=(1, 1))
+
+        result = runner.invoke(app, ["check", "--all"])
+
+        assert result.exit_code == 0
+        assert storage.find_entry(str(source)).source_mtime_ns == 1
+        assert mock_llm.return_value.chat.completions.create.call_count == 1
+
+    def test_changed_files_are_checked_and_marked_stale(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that only files whose content changed go to the LLM."""
+        a, b = self._generate(runner, tmp_path, "a.py", "b.py")
+        a.write_text("def a(x): return 1")
+
+        result = runner.invoke(app, ["check", "--all"])
+
+        assert result.exit_code == 0
+        assert mock_llm.async_client.return_value.chat.completions.create.await_count == 1
+        assert storage.find_entry(str(a)).status == DocStatus.STALE
+        assert storage.find_entry(str(b)).status == DocStatus.CURRENT
+        assert "1 stale" in result.output
+
+    def test_missing_source_exits_with_error(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that a deleted source is reported as missing."""
+        (source,) = self._generate(runner, tmp_path, "a.py")
+        source.unlink()
+
+        result = runner.invoke(app, ["check", "--all"])
+
+        assert result.exit_code == 1
+        assert "missing" in result.output
+
+    def test_status_filter_limits_sweep(self, runner, sample_data):
+        """Test that --status only sweeps matching entries."""
+        result = runner.invoke(app, ["check", "--status", "stale"])
+
+        assert "main.py" in result.output
+        assert "utils.py" not in result.output
+
+    def test_shard_limits_sweep(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that each shard checks its own share of the tracked files."""
+        self._generate(runner, tmp_path, "a.py", "b.py", "c.py")
+
+        outputs = [runner.invoke(app, ["check", "--shard", f"{i}/2"]).output for i in (1, 2)]
+
+        assert "Shard 1/2: 2 of 3 sources" in outputs[0]
+        assert "Shard 2/2: 1 of 3 sources" in outputs[1]
+
+    def test_requires_file_or_sweep(self, runner, temp_storage):
+        """Test that check needs a source file or --all."""
+        result = runner.invoke(app, ["check"])
+
+        assert result.exit_code == 2
+        assert "Provide either a source file" in result.output
+
+
+class TestCheckPropagate:
+    """Test suite for propagating staleness through imports."""
+
+    def _project(self, runner, tmp_path):
+        """Create pkg/base.py <- pkg/mid.py <- app.py plus an unrelated file, all documented."""
+        pkg = tmp_path / "pkg"
+        pkg.mkdir()
+        (pkg / "__init__.py").write_text("")
+        files = {
+            pkg / "base.py": "def base(): pass",
+            pkg / "mid.py": "from .base import base\n\ndef mid(): return base()",
+            tmp_path / "app.py": "def main():\n    from pkg import mid\n    return mid.mid()",
+            tmp_path / "other.py": "import json",
+        }
+        for path, source in files.items():
+            path.write_text(source)
+            runner.invoke(app, ["generate", str(path), "-o", str(tmp_path / "docs")])
+        return list(files)
+
+    def test_marks_dependents_stale(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that direct and transitive importers of a changed file become stale."""
+        base, mid, main, other = self._project(runner, tmp_path)
+        base.write_text("def base(x): return 1")
+
+        result = runner.invoke(app, ["check", "--all", "--propagate"])
+
+        assert result.exit_code == 0
+        assert storage.find_entry(str(mid)).status == DocStatus.STALE
+        assert storage.find_entry(str(main)).status == DocStatus.STALE
+        assert storage.find_entry(str(other)).status == DocStatus.CURRENT
+        # Only the changed file itself goes to the LLM
+        assert mock_llm.async_client.return_value.chat.completions.create.await_count == 1
+        assert "3 stale" in result.output
+
+    def test_without_propagate_dependents_stay_current(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that dependents are left alone by default."""
+        base, mid, _, _ = self._project(runner, tmp_path)
+        base.write_text("def base(x): return 1")
+
+        runner.invoke(app, ["check", "--all"])
+
+        assert storage.find_entry(str(mid)).status == DocStatus.CURRENT
+
+    def test_single_file(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that checking one changed file flags its importers."""
+        base, mid, _, _ = self._project(runner, tmp_path)
+        base.write_text("def base(x): return 1")
+
+        result = runner.invoke(app, ["check", str(base), "--propagate"])
+
+        assert storage.find_entry(str(mid)).status == DocStatus.STALE
+        # Long temp paths wrap, so compare with the line breaks taken out
+        assert f"Docs may be stale for {mid}" in " ".join(result.output.split())
+
+
+class TestCheckSignature:
+    """Test suite for the local public API tier of check."""
+
+    SOURCE = 'def greet(name: str) -> str:\n    """Say hello."""\n    return "hi " + name\n'
+
+    def _generate(self, runner, tmp_path):
+        source = tmp_path / "greet.py"
+        source.write_text(self.SOURCE)
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+        return source
+
+    def test_body_and_comment_changes_skip_llm(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that edits outside the public API are current without an LLM call."""
+        source = self._generate(runner, tmp_path)
+        source.write_text(
+            "# greeting helpers\n\n"
+            'def greet(name: str) -> str:\n    """Say hello."""\n'
+            "    greeting = 'hi '  # shorter\n    return greeting + name\n\n"
+            "def _helper():\n    pass\n"
+        )
+
+        result = runner.invoke(app, ["check", str(source)])
+
+        assert result.exit_code == 0
+        assert "API unchanged" in result.output
+        assert mock_llm.return_value.chat.completions.create.call_count == 1
+        # The new version is recorded so the next check is a stat match
+        assert storage.find_entry(str(source)).source_size == source.stat().st_size
+
+    def test_signature_change_goes_to_llm(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that a changed parameter default is checked by the LLM."""
+        source = self._generate(runner, tmp_path)
+        source.write_text(self.SOURCE.replace("name: str", "name: str = 'world'"))
+
+        result = runner.invoke(app, ["check", "--all"])
+
+        assert mock_llm.async_client.return_value.chat.completions.create.await_count == 1
+        assert storage.find_entry(str(source)).status == DocStatus.STALE
+        assert "1 stale" in result.output
+
+    def test_docstring_change_goes_to_llm(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that docstrings are part of the public API."""
+        source = self._generate(runner, tmp_path)
+        source.write_text(self.SOURCE.replace("Say hello.", "Say hello politely."))
+
+        runner.invoke(app, ["check", "--all"])
+
+        assert storage.find_entry(str(source)).status == DocStatus.STALE
+
+    @pytest.mark.parametrize("target", ["file", "--all"])
+    def test_crlf_source_is_stored_byte_for_byte(
+        self, runner, temp_storage, mock_llm, tmp_path, target
+    ):
+        """Test that a CRLF source is snapshotted and hashed as it is on disk."""
+        source = self._generate(runner, tmp_path)
+        data = self.SOURCE.replace('"hi "', '"hello "').replace("\n", "\r\n").encode()
+        source.write_bytes(data)
+
+        runner.invoke(app, ["check", str(source) if target == "file" else "--all"])
+
+        entry = storage.find_entry(str(source))
+        assert entry.source_hash == hash_bytes(data)
+        assert objects.get(entry.source_hash) == data
+        assert entry.git_blob == git_blob_hash(data)
+
+    def test_sweep_counts_implementation_changes_as_current(
+        self, runner, temp_storage, mock_llm, tmp_path
+    ):
+        """Test that a sweep skips the LLM for body-only edits."""
+        source = self._generate(runner, tmp_path)
+        source.write_text(self.SOURCE.replace('"hi "', '"hello "'))
+
+        result = runner.invoke(app, ["check", "--all"])
+
+        assert result.exit_code == 0
+        assert mock_llm.async_client.return_value.chat.completions.create.await_count == 0
+        assert "1 checked (1 current" in result.output
+
+
+class TestCheckDiff:
+    """Test suite for checking docs against a diff of the documented source."""
+
+    SOURCE = "".join(
+        f'def step_{i}(value):\n    """Step {i}."""\n    return value + {i}\n\n\n' for i in range(20)
+    )
+
+    def _prompt(self, create):
+        return create.call_args.kwargs["messages"][-1]["content"]
+
+    def test_sends_diff_instead_of_source(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that a small edit sends only a unified diff against the snapshot."""
+        source = tmp_path / "steps.py"
+        source.write_text(self.SOURCE)
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+        source.write_text(self.SOURCE.replace("def step_3(value)", "def step_3(value, scale)"))
+
+        runner.invoke(app, ["check", str(source)])
+
+        prompt = self._prompt(mock_llm.return_value.chat.completions.create)
+        assert "```diff" in prompt
+        assert "+def step_3(value, scale)" in prompt
+        assert "def step_10" not in prompt
+
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test_sweep_sends_diff(self, runner, temp_storage, mock_llm, tmp_path, newline):
+        """Test that concurrent sweeps also diff against the snapshot, whatever the line endings."""
+        source = tmp_path / "steps.py"
+        source.write_bytes(self.SOURCE.replace("\n", newline).encode())
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+        edited = self.SOURCE.replace("def step_3(value)", "def step_3(value, scale)")
+        source.write_bytes(edited.replace("\n", newline).encode())
+
+        runner.invoke(app, ["check", "--all"])
+
+        prompt = self._prompt(mock_llm.async_client.return_value.chat.completions.create)
+        assert "```diff" in prompt
+        assert "def step_10" not in prompt
+
+    def test_missing_snapshot_sends_full_source(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that entries without a snapshot fall back to the whole source."""
+        source = tmp_path / "steps.py"
+        source.write_text(self.SOURCE)
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+        shutil.rmtree(objects.objects_dir())
+        source.write_text(self.SOURCE.replace("def step_3(value)", "def step_3(value, scale)"))
+
+        runner.invoke(app, ["check", str(source)])
+
+        prompt = self._prompt(mock_llm.return_value.chat.completions.create)
+        assert "```diff" not in prompt
+        assert "def step_10" in prompt
+
+
+class TestCheckGit:
+    """Test suite for git-aware change detection in sweeps."""
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        """Run in a fresh git repository."""
+        for args in (
+            ["init", "-q"],
+            ["config", "user.email", "test@example.com"],
+            ["config", "user.name", "Test"],
+        ):
+            subprocess.run(["git", *args], cwd=tmp_path, check=True)
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
+    def _commit(self, repo, *names):
+        for name in names:
+            (repo / name).write_text(f"def {name[:-3]}(): pass\n")
+        subprocess.run(["git", "add", *names], cwd=repo, check=True)
+        subprocess.run(["git", "commit", "-q", "-m", "update"], cwd=repo, check=True)
+
+    def _generate(self, runner, repo, *names):
+        for name in names:
+            runner.invoke(app, ["generate", name, "-o", "docs"])
+
+    def test_checkout_mtime_skips_hashing(self, runner, temp_storage, mock_llm, repo, monkeypatch):
+        """Test that clean files with a new mtime are current without being read."""
+        self._commit(repo, "a.py")
+        self._generate(runner, repo, "a.py")
+        os.utime(repo / "a.py", ns=(1, 1))
+        subprocess.run(["git", "update-index", "--refresh"], cwd=repo, capture_output=True)
+        from docgen.commands import check as check_module
+        monkeypatch.setattr(check_module, "hash_files", lambda paths: pytest.fail("hashed") if paths else {})
+
+        result = runner.invoke(app, ["check", "--all"])
+
+        assert result.exit_code == 0
+        assert storage.find_entry("a.py").source_mtime_ns == 1
+
+    def test_since_only_checks_changed_files(self, runner, temp_storage, mock_llm, repo):
+        """Test that --since sweeps only the files in the diff."""
+        self._commit(repo, "a.py", "b.py")
+        self._generate(runner, repo, "a.py", "b.py")
+        (repo / "a.py").write_text("def a(x): return 1\n")
+        os.utime(repo / "b.py", ns=(1, 1))
+
+        result = runner.invoke(app, ["check", "--since", "HEAD"])
+
+        assert result.exit_code == 0
+        assert "1 sources unchanged since HEAD" in result.output
+        assert "1 checked (0 current, 1 stale" in result.output
+        assert storage.find_entry("b.py").source_mtime_ns != 1
+
+    def test_since_unknown_ref(self, runner, temp_storage, repo):
+        """Test that an unknown ref is rejected."""
+        result = runner.invoke(app, ["check", "--since", "no-such-branch"])
+
+        assert result.exit_code == 2
+        assert "Unknown git ref" in result.output
+
+    def test_since_outside_git_sweeps_everything(self, runner, sample_data, tmp_path, monkeypatch):
+        """Test that --since falls back to checking every source outside git."""
+        monkeypatch.chdir(tmp_path)
+
+        result = runner.invoke(app, ["check", "--since", "HEAD"])
+
+        assert "Not a git repository" in result.output
+        assert "utils.py" in result.output
@@ -0,0 +1,199 @@
+"""Tests for chunked documentation of large source files."""
+
+from docgen import cache, chunking, storage
+from docgen.commands import app
+
+SOURCE = '''"""Module docstring."""
+import os
+
+LIMIT = 3
+
+
+@decorator
+def first(a):
+    return a
+
+
+class Thing:
+    """A thing."""
+
+    size = 1
+
+    def grow(self):
+        self.size += 1
+
+    def shrink(self):
+        self.size -= 1
+
+
+async def last():
+    pass
+'''
+
+
+class TestSplit:
+    """Test suite for splitting Python source into chunks."""
+
+    def test_splits_at_top_level_symbols(self):
+        """Test that each top-level function and class is its own chunk."""
+        chunks = chunking.split_python(SOURCE)
+
+        assert [c.name for c in chunks] == [chunking.MODULE_CHUNK, "first", "Thing", "last"]
+        assert chunks[1].source.startswith("@decorator\ndef first")
+        assert "import os" in chunks[0].source
+        assert "def first" not in chunks[0].source
+
+    def test_oversized_class_split_at_methods(self, monkeypatch):
+        """Test that a class over the size limit is split into methods."""
+        monkeypatch.setattr(chunking, "MAX_CHUNK_LINES", 5)
+
+        chunks = chunking.split_python(SOURCE)
+
+        names = [c.name for c in chunks]
+        assert names == [chunking.MODULE_CHUNK, "first", "Thing", "Thing.grow", "Thing.shrink", "last"]
+        header = chunks[2].source
+        assert "size = 1" in header
+        assert "def grow" not in header
+
+    def test_invalid_python_is_not_split(self):
+        """Test that unparsable source falls back to a single request."""
+        assert chunking.split_python("def broken(:") is None
+
+    def test_merge_keeps_source_order(self):
+        """Test that merged sections follow source order regardless of input order."""
+        chunks = chunking.split_python(SOURCE)
+        sections = [f"## {c.name}" for c in chunks]
+
+        merged = chunking.merge_sections("mod.py", chunks[::-1], sections[::-1])
+
+        assert merged.index("## first") < merged.index("## Thing") < merged.index("## last")
+        assert merged.startswith("# `mod.py`")
+        assert chunking.section_marker("Thing") in merged
+
+
+class TestChunkedGenerate:
+    """Test suite for generating docs for large files."""
+
+    def test_large_file_documented_per_chunk(self, runner, temp_storage, mock_llm, tmp_path, monkeypatch):
+        """Test that a file over the threshold is documented chunk by chunk."""
+        monkeypatch.setattr(chunking, "CHUNK_THRESHOLD_LINES", 10)
+        source = tmp_path / "big.py"
+        source.write_text(SOURCE)
+        output_dir = tmp_path / "docs"
+
+        result = runner.invoke(app, ["generate", str(source), "-o", str(output_dir)])
+
+        assert result.exit_code == 0
+        create = mock_llm.async_client.return_value.chat.completions.create
+        assert create.await_count == 4
+        doc = (output_dir / "big.md").read_text()
+        assert doc.count("<!-- docgen:section") == 4
+
+    def test_small_file_uses_single_request(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that files under the threshold keep the single-request path."""
+        source = tmp_path / "small.py"
+        source.write_text(SOURCE)
+
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+
+        assert mock_llm.return_value.chat.completions.create.call_count == 1
+
+
+class TestIncremental:
+    """Test suite for symbol-level incremental regeneration."""
+
+    def _generate(self, runner, source, output_dir, *extra):
+        return runner.invoke(app, ["generate", str(source), "-o", str(output_dir), *extra])
+
+    def test_records_symbol_hashes(self, runner, temp_storage, mock_llm, tmp_path, monkeypatch):
+        """Test that chunked generation stores one hash per symbol."""
+        monkeypatch.setattr(chunking, "CHUNK_THRESHOLD_LINES", 10)
+        source = tmp_path / "big.py"
+        source.write_text(SOURCE)
+
+        self._generate(runner, source, tmp_path / "docs")
+
+        entry = storage.find_entry(str(source))
+        assert set(entry.symbol_hashes) == {chunking.MODULE_CHUNK, "first", "Thing", "last"}
+
+    def test_only_edited_symbol_is_reprompted(self, runner, temp_storage, mock_llm, tmp_path, monkeypatch):
+        """Test that editing one function re-documents only that function."""
+        monkeypatch.setattr(chunking, "CHUNK_THRESHOLD_LINES", 10)
+        source = tmp_path / "big.py"
+        source.write_text(SOURCE)
+        self._generate(runner, source, tmp_path / "docs")
+        create = mock_llm.async_client.return_value.chat.completions.create
+        create.reset_mock()
+
+        source.write_text(SOURCE.replace("return a", "return a + 1"))
+        result = self._generate(runner, source, tmp_path / "docs", "--no-cache")
+
+        assert result.exit_code == 0
+        assert create.await_count == 1
+        prompt = create.await_args.kwargs["messages"][1]["content"]
+        assert "`first`" in prompt
+
+    def test_removed_symbol_section_dropped(self, runner, temp_storage, mock_llm, tmp_path, monkeypatch):
+        """Test that removing a function drops its section and refreshes the overview."""
+        monkeypatch.setattr(chunking, "CHUNK_THRESHOLD_LINES", 10)
+        source = tmp_path / "big.py"
+        source.write_text(SOURCE)
+        self._generate(runner, source, tmp_path / "docs")
+        create = mock_llm.async_client.return_value.chat.completions.create
+        create.reset_mock()
+
+        source.write_text(SOURCE.replace("async def last():\n    pass\n", "") + "\n" * 5)
+        self._generate(runner, source, tmp_path / "docs", "--no-cache")
+
+        doc = (tmp_path / "docs" / "big.md").read_text()
+        assert chunking.section_marker("last") not in doc
+        assert chunking.section_marker("first") in doc
+        assert create.await_count == 1
+
+    def test_update_reuses_unchanged_sections(self, runner, temp_storage, mock_llm, tmp_path, monkeypatch):
+        """Test that the update command also regenerates only changed symbols."""
+        monkeypatch.setattr(chunking, "CHUNK_THRESHOLD_LINES", 10)
+        source = tmp_path / "big.py"
+        source.write_text(SOURCE)
+        self._generate(runner, source, tmp_path / "docs")
+        create = mock_llm.async_client.return_value.chat.completions.create
+        create.reset_mock()
+
+        cache.clear()
+        source.write_text(SOURCE.replace("self.size -= 1", "self.size -= 2"))
+        runner.invoke(app, ["update", str(source), "--output-dir", str(tmp_path / "docs")])
+
+        assert create.await_count == 1
+
+
+class TestAffectedSections:
+    """Test suite for picking the doc sections an edit can affect."""
+
+    def test_chunked_doc_keeps_changed_sections(self):
+        """Test that only sections of edited symbols are kept from a merged doc."""
+        chunks = chunking.split_python(SOURCE)
+        doc = chunking.merge_sections("big.py", chunks, [f"About {c.name}." for c in chunks])
+        edited = SOURCE.replace("return a", "return a * 2")
+
+        sections = chunking.affected_sections(SOURCE, edited, "big.py", doc)
+
+        assert "About first." in sections
+        assert "About Thing." not in sections
+        assert "About last." not in sections
+
+    def test_plain_doc_keeps_overview_and_mentions(self):
+        """Test that headed sections are kept only when they mention a changed symbol."""
+        doc = "# big.py\n\nOverview.\n\n## first\n\nReturns a.\n\n## Thing\n\nGrows.\n"
+        edited = SOURCE.replace("return a", "return a * 2")
+
+        sections = chunking.affected_sections(SOURCE, edited, "big.py", doc)
+
+        assert "Overview." in sections
+        assert "Returns a." in sections
+        assert "Grows." not in sections
+
+    def test_non_python_returns_whole_doc(self):
+        """Test that docs of other languages are sent whole."""
+        doc = "# app.js\n\n## run\n\nRuns.\n"
+
+        assert chunking.affected_sections("a", "b", "app.js", doc) == doc
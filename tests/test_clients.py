@@ -0,0 +1,96 @@
+"""Tests for the shared LLM client provider."""
+
+import asyncio
+
+from docgen import cache, chunking, clients, llm
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+class TestClients:
+    """Test suite for pooled client reuse."""
+
+    def test_sync_client_is_shared(self, fake_openai):
+        """Test that repeated lookups return the same client."""
+        assert llm._get_client() is llm._get_client()
+
+    def test_client_per_endpoint(self, fake_openai, monkeypatch):
+        """Test that a different base URL gets its own client."""
+        first = llm._get_client()
+        monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:1/v1")
+
+        assert llm._get_client() is not first
+
+    def test_pool_settings_from_environment(self, fake_openai, monkeypatch):
+        """Test that pool size and timeouts are configurable."""
+        monkeypatch.setenv("DOCGEN_HTTP_READ_TIMEOUT", "7")
+        monkeypatch.setenv("DOCGEN_HTTP_CONNECT_TIMEOUT", "2")
+        monkeypatch.setenv("DOCGEN_HTTP_MAX_CONNECTIONS", "3")
+
+        client = llm._get_client()
+
+        assert client.timeout.read == 7
+        assert client.timeout.connect == 2
+        assert client._client._transport._pool._max_connections == 3
+
+    def test_async_client_shared_within_loop(self, fake_openai):
+        """Test that one event loop reuses its async client and a new loop gets another."""
+
+        async def _two_lookups():
+            return llm._get_async_client(), llm._get_async_client()
+
+        first, second = asyncio.run(_two_lookups())
+        third, _ = asyncio.run(_two_lookups())
+
+        assert first is second
+        assert third is not first
+
+    def test_requests_reuse_connection(self, fake_openai, monkeypatch):
+        """Test that consecutive completions share one keep-alive connection."""
+        monkeypatch.setattr(cache, "enabled", False)
+
+        for _ in range(3):
+            llm._complete(MESSAGES)
+
+        assert fake_openai.connections == 1
+
+    def test_async_requests_reuse_connection(self, fake_openai, monkeypatch):
+        """Test that sequential async completions share one keep-alive connection."""
+        monkeypatch.setattr(cache, "enabled", False)
+
+        async def _complete_three():
+            for _ in range(3):
+                await llm._acomplete(MESSAGES)
+
+        asyncio.run(_complete_three())
+
+        assert fake_openai.connections == 1
+
+    def test_reset_drops_clients(self, fake_openai):
+        """Test that reset() forgets pooled clients."""
+        first = llm._get_client()
+        clients.reset()
+
+        assert llm._get_client() is not first
+
+    def test_sync_chunked_calls_share_a_pool(self, fake_openai, monkeypatch):
+        """Test that repeated sync chunked calls reuse the background loop's connections."""
+        monkeypatch.setattr(cache, "enabled", False)
+        monkeypatch.setattr(chunking, "CHUNK_THRESHOLD_LINES", 1)
+        source = "def first():\n    pass\n\n\ndef second():\n    pass\n"
+
+        llm.generate_documentation(source, "big.py")
+        opened = fake_openai.connections
+        llm.generate_documentation(source, "big.py")
+
+        assert fake_openai.connections == opened
+
+    def test_run_closes_loop_clients(self, fake_openai):
+        """Test that clients pooled for a finished loop are closed."""
+
+        async def _lookup():
+            return llm._get_async_client()
+
+        client = clients.run(_lookup())
+
+        assert client.is_closed()
@@ -0,0 +1,87 @@
+"""Tests for prompt compaction."""
+
+from docgen import compaction, metrics
+from docgen.commands import app
+
+LICENSE = "# Copyright 2024 Example Corp\n# Licensed under the MIT License\n#\n"
+
+
+class TestCompaction:
+    """Test suite for the compaction steps."""
+
+    def test_strips_leading_license_but_keeps_shebang(self):
+        """Test that a license header goes and the shebang stays."""
+        source = "#!/usr/bin/env python\n" + LICENSE + "import os\n"
+
+        assert compaction.compact(source) == "#!/usr/bin/env python\nimport os"
+
+    def test_keeps_ordinary_leading_comment(self):
+        """Test that a leading comment without a license is not removed."""
+        source = "# Helpers for parsing config files\nimport os\n"
+
+        assert compaction.compact(source) == source.rstrip("\n")
+
+    def test_removes_banners(self):
+        """Test that decoration-only comment lines are dropped but comment text kept."""
+        source = "# ------------\n# Parsing\n# ============\nx = 1\n"
+
+        assert compaction.compact(source) == "# Parsing\nx = 1"
+
+    def test_dedupes_repeated_comment_blocks(self):
+        """Test that a comment block repeated later in the file is kept once."""
+        block = "# Vendored from upstream\n# Do not edit by hand\n# Regenerate with make\n"
+        source = f"{block}a = 1\n{block}b = 2\n"
+
+        assert compaction.compact(source).count("Vendored") == 1
+
+    def test_truncates_long_string_literals(self):
+        """Test that embedded blobs are cut short with a marker."""
+        source = f'ICON = "{"x" * 1000}"\n'
+
+        result = compaction.compact(source)
+
+        assert len(result) < 100
+        assert "chars truncated" in result
+
+    def test_truncates_long_data_runs(self):
+        """Test that long tables of literals keep only their first rows."""
+        rows = "".join(f"    {i}, {i + 1}, {i + 2},\n" for i in range(50))
+        source = f"TABLE = [\n{rows}]\n"
+
+        result = compaction.compact(source)
+
+        assert "47 more lines of data" in result
+        assert result.endswith("]")
+
+    def test_collapses_whitespace(self):
+        """Test that trailing whitespace and blank line runs go but indentation stays."""
+        source = "def f():   \n    return 1\n\n\n\n\ndef g():\n    pass\n\n"
+
+        assert compaction.compact(source) == "def f():\n    return 1\n\ndef g():\n    pass"
+
+    def test_steps_can_be_selected(self):
+        """Test that only the chosen steps run."""
+        source = LICENSE + "x = 1   \n"
+
+        assert compaction.compact(source, steps=("whitespace",)) == LICENSE + "x = 1"
+        assert compaction.compact(source, steps=()) == source
+
+
+class TestCompactionInPrompts:
+    """Test suite for compaction of LLM prompts."""
+
+    def test_prompt_is_compacted_and_savings_reported(
+        self, runner, temp_storage, mock_llm, tmp_path
+    ):
+        """Test that generate sends the compacted source and reports tokens saved."""
+        source = tmp_path / "example.py"
+        source.write_text(LICENSE * 20 + "def hello():\n    pass\n")
+
+        result = runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+
+        assert result.exit_code == 0
+        prompt = mock_llm.return_value.chat.completions.create.call_args.kwargs["messages"][1]
+        assert "Copyright" not in prompt["content"]
+        assert "def hello()" in prompt["content"]
+        assert "Compaction: saved" in result.output
+        assert metrics.current.files["example.py"]["compaction_tokens_saved"] > 0
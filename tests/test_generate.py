@@ -1,15 +1,21 @@
 """Tests for the generate command."""
 
 import json
+from unittest.mock import MagicMock
 
+from docgen import files, storage
 from docgen.commands import app
+from docgen.files import atomic_write
 
 
 class TestGenerate:
     """Test suite for generate command."""
 
-    def test_generates_docs_for_valid_file(self, runner, temp_storage, mock_llm, tmp_path):
+    def test_generates_docs_for_valid_file(
+        self, runner, temp_storage, mock_llm, tmp_path, monkeypatch
+    ):
         """Test generating docs for a valid source file."""
+        monkeypatch.chdir(tmp_path)
         source = tmp_path / "example.py"
         source.write_text("def hello(): pass")
 
@@ -47,17 +53,18 @@ class TestGenerate:
         assert result.exit_code == 2
         assert "File is empty" in result.output
 
-    def test_saves_entry_to_storage(self, runner, temp_storage, mock_llm, tmp_path):
+    def test_saves_entry_to_storage(self, runner, temp_storage, mock_llm, tmp_path, monkeypatch):
         """Test that generation saves an entry to storage."""
+        monkeypatch.chdir(tmp_path)
         source = tmp_path / "example.py"
         source.write_text("def hello(): pass")
 
         runner.invoke(app, ["generate", str(source)])
 
-        data = json.loads(temp_storage.read_text())
-        assert len(data["entries"]) == 1
-        assert data["entries"][0]["source_file"] == str(source)
-        assert data["entries"][0]["status"] == "current"
+        entries = storage.load_entries()
+        assert len(entries) == 1
+        assert entries[0].source_file == str(source)
+        assert entries[0].status == "current"
 
     def test_custom_output_dir(self, runner, temp_storage, mock_llm, tmp_path):
         """Test generating docs to a custom output directory."""
@@ -69,3 +76,264 @@ class TestGenerate:
 
         assert result.exit_code == 0
         assert (custom_dir / "example.md").exists()
+
+
+class TestGenerateBatch:
+    """Test suite for generating docs over directories and globs."""
+
+    def _make_project(self, tmp_path):
+        project = tmp_path / "project"
+        (project / "pkg").mkdir(parents=True)
+        (project / "app.py").write_text("def main(): pass")
+        (project / "pkg" / "util.py").write_text("def helper(): pass")
+        (project / "pkg" / "notes.txt").write_text("not python")
+        (project / ".venv").mkdir()
+        (project / ".venv" / "lib.py").write_text("def hidden(): pass")
+        return project
+
+    def test_generates_docs_for_directory(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that a directory is walked and each Python file is documented."""
+        project = self._make_project(tmp_path)
+        output_dir = tmp_path / "docs"
+
+        result = runner.invoke(app, ["generate", str(project), "-o", str(output_dir)])
+
+        assert result.exit_code == 0
+        assert (output_dir / "app.md").exists()
+        assert (output_dir / "pkg" / "util.md").exists()
+        assert not (output_dir / "pkg" / "notes.md").exists()
+        assert not (output_dir / "lib.md").exists()
+        assert len(storage.load_entries()) == 2
+
+    def test_generates_docs_for_glob(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that glob patterns are expanded."""
+        project = self._make_project(tmp_path)
+        output_dir = tmp_path / "docs"
+
+        result = runner.invoke(app, ["generate", f"{project}/**/*.py", "-o", str(output_dir)])
+
+        assert result.exit_code == 0
+        assert (output_dir / "app.md").exists()
+        assert (output_dir / "pkg" / "util.md").exists()
+
+    def test_include_and_exclude_patterns(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that --include and --exclude filter the walked files."""
+        project = self._make_project(tmp_path)
+        output_dir = tmp_path / "docs"
+
+        result = runner.invoke(app, [
+            "generate", str(project), "-o", str(output_dir),
+            "--include", "*.py", "--include", "*.txt", "--exclude", "app.py",
+        ])
+
+        assert result.exit_code == 0
+        assert not (output_dir / "app.md").exists()
+        assert (output_dir / "pkg" / "util.md").exists()
+        assert (output_dir / "pkg" / "notes.md").exists()
+
+    def test_uses_async_client(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that batch runs go through the async client."""
+        project = self._make_project(tmp_path)
+
+        runner.invoke(app, ["generate", str(project), "-o", str(tmp_path / "docs"), "-j", "2"])
+
+        create = mock_llm.async_client.return_value.chat.completions.create
+        assert create.await_count == 2
+        mock_llm.return_value.chat.completions.create.assert_not_called()
+
+    def test_failed_file_exits_with_error(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that an LLM failure for one file is reported without losing the others."""
+        project = self._make_project(tmp_path)
+        output_dir = tmp_path / "docs"
+        create = mock_llm.async_client.return_value.chat.completions.create
+        create.side_effect = [RuntimeError("boom"), create.return_value]
+
+        result = runner.invoke(app, ["generate", str(project), "-o", str(output_dir)])
+
+        assert result.exit_code == 1
+        assert "Failed:" in result.output
+        assert len(storage.load_entries()) == 1
+
+    def test_interrupted_run_keeps_finished_entries(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that each entry is stored as soon as its doc is written, not at the end."""
+        project = self._make_project(tmp_path)
+        create = mock_llm.async_client.return_value.chat.completions.create
+        response = create.return_value
+        stored = []
+
+        async def _interrupt_second(**kwargs):
+            stored.append(len(storage.load_entries()))
+            if len(stored) == 2:
+                raise KeyboardInterrupt
+            return response
+
+        create.side_effect = _interrupt_second
+
+        runner.invoke(app, ["generate", str(project), "-o", str(tmp_path / "docs"), "-j", "1"])
+
+        # Read from a separate connection while the run was still going
+        assert stored == [0, 1]
+
+    def test_shards_split_the_work(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that shards document disjoint files and export a manifest."""
+        project = self._make_project(tmp_path)
+        output_dir = tmp_path / "docs"
+
+        for shard in ("1/2", "2/2"):
+            result = runner.invoke(app, ["generate", str(project), "-o", str(output_dir), "--shard", shard])
+            assert result.exit_code == 0
+            assert "1 of 2 files" in result.output
+
+        assert (output_dir / "app.md").exists()
+        assert (output_dir / "pkg" / "util.md").exists()
+        assert mock_llm.async_client.return_value.chat.completions.create.await_count == 2
+        assert len(json.loads(temp_storage.read_text())["entries"]) == 2
+
+    def test_invalid_shard_shows_error(self, runner, temp_storage, tmp_path):
+        """Test that a malformed --shard is rejected."""
+        result = runner.invoke(app, ["generate", str(tmp_path), "--shard", "3/2"])
+
+        assert result.exit_code == 2
+        assert "Invalid shard" in result.output
+
+    def test_same_named_files_keep_their_directories(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that explicit files with the same name get separate docs."""
+        for name in ("a", "b"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "util.py").write_text(f"def {name}(): pass")
+        output_dir = tmp_path / "docs"
+
+        result = runner.invoke(app, [
+            "generate", str(tmp_path / "a" / "util.py"), str(tmp_path / "b" / "util.py"),
+            "-o", str(output_dir),
+        ])
+
+        assert result.exit_code == 0
+        assert (output_dir / "a" / "util.md").exists()
+        assert (output_dir / "b" / "util.md").exists()
+
+    def test_colliding_doc_paths_show_error(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that two sources mapping to the same doc are rejected before generating."""
+        for name in ("a", "b"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "util.py").write_text(f"def {name}(): pass")
+
+        result = runner.invoke(app, [
+            "generate", str(tmp_path / "a"), str(tmp_path / "b"), "-o", str(tmp_path / "docs"),
+        ])
+
+        assert result.exit_code == 2
+        assert "same doc path" in result.output
+        mock_llm.async_client.return_value.chat.completions.create.assert_not_called()
+
+    def test_missing_target_shows_error(self, runner, temp_storage, tmp_path):
+        """Test that a missing path among several targets shows error."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+
+        result = runner.invoke(app, ["generate", str(source), "nonexistent.py"])
+
+        assert result.exit_code == 2
+        assert "File not found" in result.output
+
+
+def _stream_events(*pieces):
+    """Build chat completion stream events carrying the given text deltas."""
+    for piece in pieces:
+        event = MagicMock()
+        event.choices = [MagicMock()]
+        event.choices[0].delta.content = piece
+        yield event
+
+
+class TestGenerateStream:
+    """Test suite for streamed generation."""
+
+    def test_writes_streamed_doc(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that the streamed pieces end up in the doc file and storage."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+        output_dir = tmp_path / "docs"
+        create = mock_llm.return_value.chat.completions.create
+        create.return_value = _stream_events("# Example", "\n\nStreamed ", "docs.")
+
+        result = runner.invoke(app, ["generate", str(source), "-o", str(output_dir), "--stream"])
+
+        assert result.exit_code == 0
+        assert (output_dir / "example.md").read_text() == "# Example\n\nStreamed docs."
+        assert create.call_args.kwargs["stream"] is True
+        assert len(storage.load_entries()) == 1
+
+    def test_preview_echoes_doc(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that --preview prints the doc as it streams."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+        create = mock_llm.return_value.chat.completions.create
+        create.return_value = _stream_events("Streamed ", "docs.")
+
+        result = runner.invoke(
+            app, ["generate", str(source), "-o", str(tmp_path / "docs"), "--preview"]
+        )
+
+        assert result.exit_code == 0
+        assert "Streamed docs." in result.output
+
+    def test_failed_stream_leaves_no_partial_doc(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that a stream failing midway keeps the previous doc and no temp file."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+        output_dir = tmp_path / "docs"
+        output_dir.mkdir()
+        (output_dir / "example.md").write_text("# Previous docs")
+
+        def _broken_stream():
+            yield from _stream_events("# Half")
+            raise KeyboardInterrupt
+
+        mock_llm.return_value.chat.completions.create.return_value = _broken_stream()
+
+        result = runner.invoke(app, ["generate", str(source), "-o", str(output_dir), "--stream"])
+
+        assert result.exit_code != 0
+        assert (output_dir / "example.md").read_text() == "# Previous docs"
+        assert [p.name for p in output_dir.iterdir()] == ["example.md"]
+        assert storage.load_entries() == []
+
+    def test_cached_doc_is_not_streamed_again(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that a completed stream is cached for the next run."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+        create = mock_llm.return_value.chat.completions.create
+        create.return_value = _stream_events("Streamed docs.")
+
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs"), "--stream"])
+        result = runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs"), "--stream"])
+
+        assert result.exit_code == 0
+        assert create.call_count == 1
+        assert (tmp_path / "docs" / "example.md").read_text() == "Streamed docs."
+
+
+class TestAtomicWrite:
+    """Test suite for atomic doc writes."""
+
+    def test_new_file_gets_umask_mode(self, tmp_path):
+        """Test that a new file is readable like one created by open(), not owner-only."""
+        path = tmp_path / "docs" / "example.md"
+
+        with atomic_write(path) as f:
+            f.write("# Example")
+
+        assert path.stat().st_mode & 0o777 == 0o666 & ~files._UMASK
+
+    def test_existing_file_keeps_mode(self, tmp_path):
+        """Test that rewriting a file keeps its permissions."""
+        path = tmp_path / "example.md"
+        path.write_text("# Old")
+        path.chmod(0o640)
+
+        with atomic_write(path) as f:
+            f.write("# New")
+
+        assert path.read_text() == "# New"
+        assert path.stat().st_mode & 0o777 == 0o640
@@ -0,0 +1,67 @@
+"""Tests for reading change information from git."""
+
+import subprocess
+
+import pytest
+
+from docgen import git
+from docgen.hashing import git_blob_hash
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A git repository with one committed file, used as the working directory."""
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "test@example.com")
+    _git(tmp_path, "config", "user.name", "Test")
+    (tmp_path / "a.py").write_text("def a(): pass\n")
+    _git(tmp_path, "add", "a.py")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestGit:
+    """Test suite for the git change detector."""
+
+    def test_repo_root_outside_git(self, tmp_path, monkeypatch):
+        """Test that directories outside a work tree have no root."""
+        monkeypatch.chdir(tmp_path)
+
+        assert git.repo_root() is None
+
+    def test_blob_hash_matches_git(self, repo):
+        """Test that blob IDs computed locally match the ones git records."""
+        blobs = git.tracked_files(git.repo_root())
+
+        assert blobs[git.path_key(repo / "a.py")] == git_blob_hash(b"def a(): pass\n")
+
+    def test_modified_files_have_no_blob(self, repo):
+        """Test that files edited since they were staged are not vouched for."""
+        (repo / "a.py").write_text("def a(x): pass\n")
+        (repo / "new.py").write_text("")
+
+        blobs = git.tracked_files(git.repo_root())
+
+        assert blobs == {git.path_key(repo / "a.py"): None}
+
+    def test_changed_since_ref(self, repo):
+        """Test that committed, staged and unstaged changes since a ref are listed."""
+        (repo / "b.py").write_text("def b(): pass\n")
+        _git(repo, "add", "b.py")
+        _git(repo, "commit", "-q", "-m", "add b")
+        (repo / "a.py").write_text("def a(x): pass\n")
+
+        assert git.changed_since(repo, "HEAD~1") == {
+            git.path_key(repo / "a.py"), git.path_key(repo / "b.py")
+        }
+        assert git.changed_since(repo, "HEAD") == {git.path_key(repo / "a.py")}
+
+    def test_unknown_ref_raises(self, repo):
+        """Test that a ref that doesn't name a commit is rejected."""
+        with pytest.raises(ValueError, match="Unknown git ref"):
+            git.changed_since(repo, "no-such-branch")
@@ -0,0 +1,49 @@
+"""Tests for source hashing."""
+
+import hashlib
+
+from docgen import hashing
+
+
+class TestHashing:
+    """Test suite for chunked and parallel hashing."""
+
+    def test_chunked_hash_matches_sha256(self, tmp_path, monkeypatch):
+        """Test that memory-mapped chunked hashing matches a plain digest."""
+        monkeypatch.setattr(hashing, "CHUNK_SIZE", 7)
+        path = tmp_path / "big.py"
+        data = b"x = 1\n" * 1000
+        path.write_bytes(data)
+
+        assert hashing.hash_file(path) == hashlib.sha256(data).hexdigest()
+
+    def test_empty_file_hash(self, tmp_path):
+        """Test that empty files hash without mapping."""
+        path = tmp_path / "empty.py"
+        path.write_bytes(b"")
+
+        assert hashing.hash_file(path) == hashlib.sha256(b"").hexdigest()
+
+    def test_hash_files_in_process_pool(self, tmp_path, monkeypatch):
+        """Test that large sets are hashed across processes with the same results."""
+        monkeypatch.setattr(hashing, "PARALLEL_THRESHOLD", 2)
+        paths = []
+        for i in range(4):
+            path = tmp_path / f"f{i}.py"
+            path.write_text(f"value = {i}")
+            paths.append(str(path))
+
+        hashes = hashing.hash_files(paths + [str(tmp_path / "missing.py")], workers=2)
+
+        assert hashes[paths[2]] == hashlib.sha256(b"value = 2").hexdigest()
+        assert hashes[str(tmp_path / "missing.py")] is None
+
+    def test_read_source_matches_hash_file(self, tmp_path):
+        """Test that the hash recorded at generation matches the checker's hash."""
+        path = tmp_path / "a.py"
+        path.write_text("def a(): pass\n")
+
+        snapshot = hashing.read_source(path)
+
+        assert snapshot.hash == hashing.hash_file(path)
+        assert snapshot.size == path.stat().st_size
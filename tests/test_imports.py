@@ -0,0 +1,93 @@
+"""Tests for the cached import graph."""
+
+from docgen import imports, storage
+from docgen.imports import ImportGraph, module_name, parse_imports
+from docgen.models import ImportRecord
+
+
+class TestParseImports:
+    """Test suite for extracting imports from source."""
+
+    def test_absolute_and_from_imports(self):
+        """Test that from-imports record the imported name under its module."""
+        names = parse_imports("import os.path\nfrom docgen import llm, display", "docgen.cli")
+
+        assert names == ["docgen.display", "docgen.llm", "os.path"]
+
+    def test_relative_imports(self):
+        """Test that relative imports are resolved against the module's package."""
+        source = "from . import storage\nfrom .models import DocEntry\nfrom ..shared import x"
+
+        names = parse_imports(source, "docgen.commands.check")
+
+        assert names == [
+            "docgen.commands.models.DocEntry", "docgen.commands.storage", "docgen.shared.x",
+        ]
+
+    def test_relative_import_in_package_init(self):
+        """Test that an __init__ module is its own package."""
+        assert parse_imports("from .core import run", "docgen", is_package=True) == [
+            "docgen.core.run"
+        ]
+
+    def test_imports_inside_functions(self):
+        """Test that lazy imports in function bodies count."""
+        assert parse_imports("def f():\n    import json\n", "m") == ["json"]
+
+    def test_syntax_error_has_no_imports(self):
+        """Test that unparsable sources are treated as importing nothing."""
+        assert parse_imports("def (:", "m") == []
+
+
+class TestImportGraph:
+    """Test suite for resolving and walking import edges."""
+
+    def test_module_name_follows_packages(self, tmp_path):
+        """Test that module names include every enclosing package."""
+        pkg = tmp_path / "pkg" / "sub"
+        pkg.mkdir(parents=True)
+        (tmp_path / "pkg" / "__init__.py").write_text("")
+        (pkg / "__init__.py").write_text("")
+
+        assert module_name(pkg / "mod.py") == "pkg.sub.mod"
+        assert module_name(pkg / "__init__.py") == "pkg.sub"
+
+    def test_affected_is_transitive_with_distance(self):
+        """Test that dependents are found through chains of imports."""
+        graph = ImportGraph([
+            ImportRecord("a.py", "a"),
+            ImportRecord("b.py", "b", ["a.helper"]),
+            ImportRecord("c.py", "c", ["b"]),
+            ImportRecord("d.py", "d", ["json"]),
+        ])
+
+        assert graph.affected(["a.py"]) == {"b.py": (1, "a.py"), "c.py": (2, "a.py")}
+
+    def test_update_graph_only_reparses_changed_files(self, temp_storage, tmp_path, monkeypatch):
+        """Test that the cached graph is reused for untouched files."""
+        a = tmp_path / "a.py"
+        b = tmp_path / "b.py"
+        a.write_text("import b")
+        b.write_text("x = 1")
+        imports.update_graph([str(a), str(b)])
+
+        parsed = []
+        original = imports.parse_imports
+        monkeypatch.setattr(
+            imports, "parse_imports", lambda src, *args: parsed.append(src) or original(src, *args)
+        )
+        b.write_text("x = 2")
+        graph = imports.update_graph([str(a), str(b)])
+
+        assert parsed == ["x = 2"]
+        assert graph.dependents == {str(b): {str(a)}}
+
+    def test_update_graph_drops_untracked_files(self, temp_storage, tmp_path):
+        """Test that records of files no longer tracked are removed."""
+        a = tmp_path / "a.py"
+        a.write_text("x = 1")
+        imports.update_graph([str(a)])
+
+        imports.update_graph([])
+
+        assert storage.load_imports() == {}
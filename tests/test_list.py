@@ -1,5 +1,9 @@
 """Tests for the list command."""
 
+import csv
+import io
+import json
+
 from docgen.commands import app
 
 
@@ -57,3 +61,74 @@ class TestList:
 
         assert result.exit_code == 0
         assert "utils.py" in result.output
+
+    def test_json_format(self, runner, sample_data):
+        """Test that --format json prints an array of entries."""
+        result = runner.invoke(app, ["list", "--format", "json"])
+
+        assert result.exit_code == 0
+        data = json.loads(result.output)
+        assert [e["source_file"] for e in data] == ["utils.py", "main.py"]
+        assert data[1]["status"] == "stale"
+
+    def test_json_format_empty(self, runner, temp_storage):
+        """Test that an empty list is still valid JSON."""
+        result = runner.invoke(app, ["list", "--format", "json"])
+
+        assert result.exit_code == 0
+        assert json.loads(result.output) == []
+
+    def test_ndjson_format(self, runner, sample_data):
+        """Test that --format ndjson prints one object per line."""
+        result = runner.invoke(app, ["list", "--format", "ndjson", "--status", "stale"])
+
+        lines = result.output.splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["source_file"] == "main.py"
+
+    def test_csv_format(self, runner, sample_data):
+        """Test that --format csv prints a header and a row per entry."""
+        result = runner.invoke(app, ["list", "--format", "csv"])
+
+        rows = list(csv.DictReader(io.StringIO(result.output)))
+        assert [r["source_file"] for r in rows] == ["utils.py", "main.py"]
+        assert rows[0]["doc_file"] == "docs/utils.md"
+
+    def test_invalid_format_shows_error(self, runner, sample_data):
+        """Test that an unknown format shows error."""
+        result = runner.invoke(app, ["list", "--format", "xml"])
+
+        assert result.exit_code == 2
+        assert "Invalid format" in result.output
+
+    def test_sort_limit_and_offset(self, runner, sample_data):
+        """Test paging through entries sorted by source."""
+        result = runner.invoke(
+            app, ["list", "--sort", "source", "--limit", "1", "--offset", "1", "-f", "ndjson"]
+        )
+
+        assert [json.loads(line)["source_file"] for line in result.output.splitlines()] == [
+            "utils.py"
+        ]
+
+    def test_invalid_sort_shows_error(self, runner, sample_data):
+        """Test that an unknown sort key shows error."""
+        result = runner.invoke(app, ["list", "--sort", "size"])
+
+        assert result.exit_code == 2
+        assert "Invalid sort key" in result.output
+
+    def test_summary_counts_all_pages(self, runner, sample_data):
+        """Test that the table summary counts every matching entry, not just the page."""
+        result = runner.invoke(app, ["list", "--limit", "1"])
+
+        assert "utils.py" in result.output
+        assert "main.py" not in result.output
+        assert "2 docs (1 current, 1 stale), showing 1" in result.output
+
+    def test_prefix_filter(self, runner, sample_data):
+        """Test that --prefix only shows matching source paths."""
+        result = runner.invoke(app, ["list", "--prefix", "main"])
+
+        assert "main.py" in result.output
+        assert "utils.py" not in result.output
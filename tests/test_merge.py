@@ -0,0 +1,124 @@
+"""Tests for merging the results of CI shards."""
+
+import json
+
+from docgen import storage
+from docgen.commands import app
+from docgen.models import DocStatus
+
+
+def _shard(tmp_path, name, entries):
+    """Create a shard project directory with a manifest and the listed docs."""
+    root = tmp_path / name
+    (root / ".docgen").mkdir(parents=True)
+    for entry in entries:
+        doc = root / entry["doc_file"]
+        doc.parent.mkdir(parents=True, exist_ok=True)
+        doc.write_text(f"# {entry['source_file']} from {name}")
+    (root / ".docgen" / "docs.json").write_text(json.dumps({"version": 1, "entries": entries}))
+    return root
+
+
+def _entry(source, generated_at, status="current"):
+    return {
+        "source_file": source,
+        "doc_file": f"docs/{source[:-3]}.md",
+        "status": status,
+        "generated_at": generated_at,
+        "source_hash": "abc",
+    }
+
+
+class TestMerge:
+    """Test suite for the merge command."""
+
+    def test_combines_shards(self, runner, temp_storage, tmp_path, monkeypatch):
+        """Test that entries and docs from every shard end up in this project."""
+        monkeypatch.chdir(tmp_path)
+        one = _shard(tmp_path, "shard1", [_entry("a.py", "2025-01-01T10:00:00")])
+        two = _shard(tmp_path, "shard2", [_entry("b.py", "2025-01-01T10:00:00")])
+
+        result = runner.invoke(app, ["merge", str(one), str(two)])
+
+        assert result.exit_code == 0
+        assert "Merged 2 entries from 2 manifests" in result.output
+        assert {e.source_file for e in storage.load_entries()} == {"a.py", "b.py"}
+        assert (tmp_path / "docs" / "b.md").read_text() == "# b.py from shard2"
+        assert len(json.loads(temp_storage.read_text())["entries"]) == 2
+
+    def test_newest_generation_wins(self, runner, temp_storage, tmp_path, monkeypatch):
+        """Test that conflicting entries are resolved by generated_at."""
+        monkeypatch.chdir(tmp_path)
+        old = _shard(tmp_path, "old", [_entry("a.py", "2025-01-01T10:00:00")])
+        new = _shard(tmp_path, "new", [_entry("a.py", "2025-02-01T10:00:00", "stale")])
+
+        result = runner.invoke(app, ["merge", str(new), str(old)])
+
+        assert "1 duplicate entries resolved" in result.output
+        assert storage.find_entry("a.py").status == DocStatus.STALE
+        assert (tmp_path / "docs" / "a.md").read_text() == "# a.py from new"
+
+    def test_identical_entries_are_not_conflicts(
+        self, runner, temp_storage, tmp_path, monkeypatch
+    ):
+        """Test that only duplicates that differ are counted as conflicts."""
+        monkeypatch.chdir(tmp_path)
+        one = _shard(tmp_path, "shard1", [_entry("a.py", "2025-01-01T10:00:00")])
+        two = _shard(tmp_path, "shard2", [_entry("a.py", "2025-01-01T10:00:00")])
+
+        result = runner.invoke(app, ["merge", str(one), str(two)])
+
+        assert result.exit_code == 0
+        assert "duplicate" not in result.output
+
+    def test_accepts_manifest_inside_project(self, runner, temp_storage, tmp_path, monkeypatch):
+        """Test that a shard's .docgen/docs.json can be given instead of its directory."""
+        monkeypatch.chdir(tmp_path)
+        shard = _shard(tmp_path, "shard1", [_entry("a.py", "2025-01-01T10:00:00")])
+
+        result = runner.invoke(app, ["merge", str(shard / ".docgen" / "docs.json")])
+
+        assert result.exit_code == 0
+        assert (tmp_path / "docs" / "a.md").read_text() == "# a.py from shard1"
+
+    def test_rejects_bare_manifest(self, runner, temp_storage, tmp_path, monkeypatch):
+        """Test that a manifest moved out of its project is rejected, not misread."""
+        monkeypatch.chdir(tmp_path)
+        shard = _shard(tmp_path, "shard1", [_entry("a.py", "2025-01-01T10:00:00")])
+        manifest = tmp_path / "shard1.json"
+        (shard / ".docgen" / "docs.json").rename(manifest)
+
+        result = runner.invoke(app, ["merge", str(manifest)])
+
+        assert result.exit_code == 2
+        assert "outside a .docgen directory" in result.output
+        assert storage.find_entry("a.py") is None
+
+    def test_keeps_newer_local_entry(self, runner, sample_data, tmp_path, monkeypatch):
+        """Test that a shard doesn't overwrite a newer entry already in this project."""
+        monkeypatch.chdir(tmp_path)
+        shard = _shard(tmp_path, "shard1", [_entry("utils.py", "2024-01-01T10:00:00", "stale")])
+
+        result = runner.invoke(app, ["merge", str(shard)])
+
+        assert "Merged 0 entries" in result.output
+        assert storage.find_entry("utils.py").status == DocStatus.CURRENT
+
+    def test_missing_manifest(self, runner, temp_storage, tmp_path):
+        """Test that a shard without a manifest is rejected."""
+        result = runner.invoke(app, ["merge", str(tmp_path / "nowhere")])
+
+        assert result.exit_code == 2
+        assert "Manifest not found" in result.output
+
+    def test_missing_doc_file(self, runner, temp_storage, tmp_path, monkeypatch):
+        """Test that entries whose doc wasn't shipped with the shard are reported."""
+        monkeypatch.chdir(tmp_path)
+        shard = _shard(tmp_path, "shard1", [_entry("a.py", "2025-01-01T10:00:00")])
+        (shard / "docs" / "a.md").unlink()
+
+        result = runner.invoke(app, ["merge", str(shard)])
+
+        assert result.exit_code == 1
+        assert "Doc file missing" in result.output
+        assert storage.find_entry("a.py") is None
@@ -0,0 +1,133 @@
+"""Tests for run metrics and the --profile option."""
+
+import json
+from types import SimpleNamespace
+
+from docgen import metrics
+from docgen.commands import app
+
+
+def _usage(prompt: int, completion: int) -> SimpleNamespace:
+    return SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion)
+
+
+class TestMetrics:
+    """Test suite for collecting metrics."""
+
+    def test_nested_phases_count_once(self):
+        """Test that a phase nested in itself isn't double counted."""
+        metrics.reset()
+
+        with metrics.phase("storage"):
+            with metrics.phase("storage"):
+                pass
+
+        assert metrics.current.phases["storage"].calls == 1
+
+    def test_timed_records_a_call_per_invocation(self):
+        """Test that a timed function adds a call each time it runs."""
+        metrics.reset()
+
+        @metrics.timed("hash")
+        def work():
+            return 42
+
+        assert work() == 42
+        work()
+
+        assert metrics.current.phases["hash"].calls == 2
+
+    def test_cost_uses_model_prices(self):
+        """Test that cost is estimated from prompt and completion prices."""
+        metrics.reset()
+        metrics.record_usage("gpt-4o-mini", _usage(1_000_000, 1_000_000))
+
+        report = metrics.report("generate")
+
+        assert report["models"]["gpt-4o-mini"]["cost_usd"] == 0.75
+        assert report["cost_usd"] == 0.75
+
+    def test_unknown_model_has_no_cost(self):
+        """Test that models without a price report no cost instead of zero."""
+        metrics.reset()
+        metrics.record_usage("local-model", _usage(10, 10))
+
+        report = metrics.report("generate")
+
+        assert report["models"]["local-model"]["cost_usd"] is None
+        assert report["cost_usd"] == 0
+
+    def test_missing_usage_counts_request_only(self):
+        """Test that responses without usage still count as requests."""
+        metrics.reset()
+        metrics.record_usage("gpt-4o-mini", None)
+
+        usage = metrics.current.models["gpt-4o-mini"]
+        assert (usage.requests, usage.prompt_tokens, usage.completion_tokens) == (1, 0, 0)
+
+    def test_prometheus_output(self):
+        """Test that reports render as Prometheus gauges labelled by command."""
+        metrics.reset()
+        metrics.add_time("llm", 1.5)
+        metrics.increment("cache_hits")
+
+        text = metrics.to_prometheus(metrics.report("check"))
+
+        assert "# TYPE docgen_run_phase_seconds gauge" in text
+        assert 'docgen_run_phase_seconds{command="check",phase="llm"} 1.5' in text
+        assert 'docgen_run_events{command="check",event="cache_hits"} 1' in text
+
+
+class TestProfileOption:
+    """Test suite for the global --profile and metrics export options."""
+
+    def test_profile_shows_summary(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that --profile prints phases, tokens and cost after the command."""
+        mock_llm.return_value.chat.completions.create.return_value.usage = _usage(120, 30)
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+
+        result = runner.invoke(
+            app, ["--profile", "generate", str(source), "-o", str(tmp_path / "docs")]
+        )
+
+        assert result.exit_code == 0
+        assert "Profile" in result.output
+        assert "llm" in result.output
+        assert "storage" in result.output
+        assert "120" in result.output
+        assert "estimated cost" in result.output
+
+    def test_no_summary_without_profile(self, runner, sample_data):
+        """Test that nothing extra is printed by default."""
+        result = runner.invoke(app, ["list"])
+
+        assert result.exit_code == 0
+        assert "Profile" not in result.output
+
+    def test_metrics_json(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that --metrics-json writes the run's metrics."""
+        mock_llm.return_value.chat.completions.create.return_value.usage = _usage(100, 50)
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+        output = tmp_path / "metrics.json"
+
+        result = runner.invoke(app, [
+            "--metrics-json", str(output), "generate", str(source), "-o", str(tmp_path / "docs"),
+        ])
+
+        assert result.exit_code == 0
+        data = json.loads(output.read_text())
+        assert data["command"] == "generate"
+        assert {"llm", "storage", "read", "write"} <= set(data["phases"])
+        assert data["models"]["gpt-4o-mini"]["prompt_tokens"] == 100
+        assert data["counters"]["cache_misses"] == 1
+
+    def test_metrics_written_when_command_fails(self, runner, temp_storage, tmp_path):
+        """Test that metrics are exported even if the command exits with an error."""
+        output = tmp_path / "metrics.prom"
+
+        result = runner.invoke(app, ["--metrics-prom", str(output), "generate", "missing.py"])
+
+        assert result.exit_code == 2
+        assert 'docgen_run_duration_seconds{command="generate"}' in output.read_text()
@@ -0,0 +1,48 @@
+"""Tests for the source snapshot store."""
+
+import os
+import zlib
+
+from docgen import objects, storage
+from docgen.hashing import hash_bytes
+from docgen.models import DocEntry
+
+
+class TestObjects:
+    """Test suite for storing and collecting source snapshots."""
+
+    def test_put_stores_compressed_under_content_hash(self, temp_storage):
+        """Test that snapshots are keyed by the SHA-256 of their bytes and compressed."""
+        data = b"def hello(): pass\n" * 50
+
+        digest = objects.put(data)
+
+        assert digest == hash_bytes(data)
+        path = objects.objects_dir() / digest[:2] / digest[2:]
+        assert zlib.decompress(path.read_bytes()) == data
+        assert path.stat().st_size < len(data)
+        assert objects.get(digest) == data
+
+    def test_get_missing_returns_none(self, temp_storage):
+        """Test that unknown or empty hashes have no snapshot."""
+        assert objects.get("ab" * 32) is None
+        assert objects.get("") is None
+
+    def test_gc_removes_unreferenced_snapshots(self, temp_storage):
+        """Test that only snapshots no entry points at are collected."""
+        kept = objects.put(b"kept")
+        dropped = objects.put(b"dropped")
+        storage.add_entry(DocEntry(source_file="a.py", doc_file="a.md", source_hash=kept))
+
+        assert objects.gc(grace=0) == 1
+        assert objects.get(kept) == b"kept"
+        assert objects.get(dropped) is None
+
+    def test_gc_keeps_recent_snapshots(self, temp_storage):
+        """Test that new snapshots survive until their entry is recorded."""
+        digest = objects.put(b"pending")
+
+        assert objects.gc() == 0
+        path = objects.objects_dir() / digest[:2] / digest[2:]
+        os.utime(path, (0, 0))
+        assert objects.gc() == 1
@@ -0,0 +1,221 @@
+"""Tests for the rate-limit-aware request scheduler."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+
+from docgen import metrics, scheduler
+from docgen.scheduler import AdaptiveLimiter, Scheduler, TokenBucket
+
+MESSAGES = [{"role": "user", "content": "x" * 400}]
+
+
+def _rate_limit_error(headers=None, code=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("rate limited", response=response, body={"code": code})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def asleep(self, seconds):
+        self.sleep(seconds)
+
+
+class TestTokenBucket:
+    """Test suite for token buckets."""
+
+    def test_waits_once_budget_is_spent(self):
+        """Test that requests beyond the per-minute budget must wait for refill."""
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)
+
+        assert bucket.reserve(60) == 0
+        assert bucket.reserve(30) == pytest.approx(30.0)
+
+    def test_refills_over_time(self):
+        """Test that tokens come back at the per-minute rate."""
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)
+        bucket.reserve(60)
+
+        clock.now += 10
+
+        assert bucket.reserve(10) == 0
+
+
+class TestScheduler:
+    """Test suite for retries and budgeting."""
+
+    def _scheduler(self, clock, **kwargs):
+        return Scheduler(clock=clock, sleep=clock.sleep, asleep=clock.asleep, **kwargs)
+
+    def test_retries_rate_limit_honoring_retry_after(self):
+        """Test that a 429 is retried after at least the Retry-After delay."""
+        clock = FakeClock()
+        sched = self._scheduler(clock)
+        calls = iter([_rate_limit_error({"retry-after": "7"}), "ok"])
+
+        def call():
+            result = next(calls)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        assert sched.run(MESSAGES, call) == "ok"
+        assert clock.sleeps[-1] >= 7
+        assert sched.stats.throttled == 1
+
+    def test_backoff_grows_exponentially(self, monkeypatch):
+        """Test that consecutive failures back off with growing jittered delays."""
+        monkeypatch.setattr(scheduler.random, "uniform", lambda low, high: high)
+        clock = FakeClock()
+        sched = self._scheduler(clock, max_retries=3)
+
+        def call():
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://x"))
+
+        with pytest.raises(openai.APIConnectionError):
+            sched.run(MESSAGES, call)
+
+        assert clock.sleeps == [1.0, 2.0, 4.0]
+
+    def test_non_retryable_errors_raise_immediately(self):
+        """Test that exhausted quota and other errors are not retried."""
+        clock = FakeClock()
+        sched = self._scheduler(clock)
+
+        def call():
+            raise _rate_limit_error(code="insufficient_quota")
+
+        with pytest.raises(openai.RateLimitError):
+            sched.run(MESSAGES, call)
+        assert sched.stats.retries == 0
+
+    def test_token_budget_delays_large_requests(self):
+        """Test that the TPM bucket throttles requests before they are sent."""
+        clock = FakeClock()
+        sched = self._scheduler(clock, tpm=1200)
+
+        sched.run(MESSAGES, lambda: "a")
+        sched.run(MESSAGES, lambda: "b")
+
+        assert clock.sleeps and clock.sleeps[0] > 0
+
+    def test_budget_wait_is_not_llm_time(self):
+        """Test that waiting for the rate budget counts as rate_limit_wait, not llm."""
+        clock = FakeClock()
+        sched = Scheduler(
+            clock=clock, sleep=lambda s: time.sleep(0.05), asleep=clock.asleep, tpm=1200
+        )
+        metrics.reset()
+
+        sched.run(MESSAGES, lambda: "a")
+        sched.run(MESSAGES, lambda: "b")
+
+        phases = metrics.report(None)["phases"]
+        assert phases["rate_limit_wait"]["seconds"] > 0
+        assert phases["llm"]["calls"] == 2
+        assert phases["llm"]["seconds"] < 0.05
+
+    def test_async_run_retries(self):
+        """Test that the async path retries and returns the eventual result."""
+        clock = FakeClock()
+        sched = self._scheduler(clock)
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise _rate_limit_error()
+            return "ok"
+
+        assert asyncio.run(sched.arun(MESSAGES, call)) == "ok"
+        assert len(attempts) == 2
+
+
+class TestAdaptiveLimiter:
+    """Test suite for adaptive concurrency."""
+
+    def test_halves_on_throttle_and_grows_on_success(self):
+        """Test multiplicative decrease and additive increase of the limit."""
+        limiter = AdaptiveLimiter(16)
+        assert limiter.limit == 8
+
+        limiter.on_throttle()
+        assert limiter.limit == 4
+
+        for _ in range(4):
+            limiter.on_success()
+        assert limiter.limit == 5
+
+    def test_caps_in_flight_requests(self):
+        """Test that no more than limit requests run at once."""
+        limiter = AdaptiveLimiter(4)
+        peak = 0
+
+        async def task():
+            nonlocal peak
+            await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0)
+            limiter.release()
+
+        async def main():
+            await asyncio.gather(*(task() for _ in range(10)))
+
+        asyncio.run(main())
+        assert peak == 2
+
+    def test_burst_of_throttles_halves_once(self):
+        """Test that concurrent 429s within one window only halve the limit once."""
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(16, clock)
+
+        for _ in range(4):
+            limiter.on_throttle()
+        assert limiter.limit == 4
+
+        clock.now += scheduler.THROTTLE_WINDOW
+        limiter.on_throttle()
+        assert limiter.limit == 2
+
+    def test_shared_across_event_loops(self):
+        """Test that threads running their own loops all get through one limiter."""
+        limiter = AdaptiveLimiter(2)
+        done = []
+
+        async def task():
+            await limiter.acquire()
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        async def main():
+            await asyncio.wait_for(asyncio.gather(*(task() for _ in range(3))), 5)
+
+        def worker():
+            asyncio.run(main())
+            done.append(True)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        assert len(done) == 4
+        assert limiter.in_flight == 0
@@ -0,0 +1,149 @@
+"""Tests for docgen serve and forwarding commands to it."""
+
+import socket
+import sys
+import threading
+
+import pytest
+
+from docgen import main, remote
+from docgen.commands.serve import make_server
+from docgen.constants import EXIT_ERROR
+
+
+@pytest.fixture
+def socket_file(temp_storage, tmp_path, monkeypatch):
+    """Server socket path inside the project, with the project as cwd."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(remote.DISABLE_ENV, raising=False)
+    return temp_storage.parent / remote.SOCKET_NAME
+
+
+@pytest.fixture
+def server(socket_file):
+    """A docgen server answering on a background thread."""
+    server = make_server(socket_file)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestForward:
+    """Test suite for the thin client."""
+
+    def test_forwards_list(self, sample_data, server, socket_file, capsys):
+        """Test that list runs on the server and its output is replayed."""
+        exit_code = remote.forward(["list"], socket_file)
+
+        assert exit_code == 0
+        output = capsys.readouterr().out
+        assert "utils.py" in output
+        assert "main.py" in output
+
+    def test_forwards_exit_code(self, server, socket_file, capsys):
+        """Test that a failing command's exit code comes back from the server."""
+        exit_code = remote.forward(["list", "--status", "bogus"], socket_file)
+
+        assert exit_code == 2
+        assert "Invalid status" in capsys.readouterr().out
+
+    def test_check_unchanged_file(self, server, socket_file, mock_llm, tmp_path, capsys):
+        """Test that check answers from the server for an unchanged file."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass")
+        assert remote.forward(["generate", str(source)], socket_file) == 0
+
+        exit_code = remote.forward(["check", str(source)], socket_file)
+
+        assert exit_code == 0
+        assert "up to date" in capsys.readouterr().out
+
+    def test_no_server_runs_in_process(self, socket_file):
+        """Test that without a server the command is not forwarded."""
+        assert remote.forward(["list"], socket_file) is None
+
+    def test_stale_socket_runs_in_process(self, socket_file):
+        """Test that a socket file left by a dead server is ignored."""
+        make_server(socket_file).server_close()
+
+        assert socket_file.exists()
+        assert remote.forward(["list"], socket_file) is None
+
+    def test_lost_reply_is_an_error(self, socket_file, capsys):
+        """Test that a request sent but never answered isn't run again in-process."""
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(str(socket_file))
+        listener.listen()
+
+        def _hang_up():
+            conn, _ = listener.accept()
+            conn.recv(65536)
+            conn.close()
+
+        thread = threading.Thread(target=_hang_up)
+        thread.start()
+        try:
+            exit_code = remote.forward(["list"], socket_file)
+        finally:
+            thread.join()
+            listener.close()
+
+        assert exit_code == EXIT_ERROR
+        assert "lost the reply" in capsys.readouterr().err
+
+    def test_other_commands_not_forwarded(self, server, socket_file):
+        """Test that only generate, check and list are forwarded."""
+        assert remote.forward(["update", "example.py"], socket_file) is None
+        assert remote.forward(["generate", "example.py", "--preview"], socket_file) is None
+
+    def test_disabled_by_environment(self, server, socket_file, monkeypatch):
+        """Test that DOCGEN_NO_SERVER keeps commands in-process."""
+        monkeypatch.setenv(remote.DISABLE_ENV, "1")
+
+        assert remote.forward(["list"], socket_file) is None
+
+
+class TestServer:
+    """Test suite for the server side."""
+
+    def test_refuses_second_server(self, server, socket_file):
+        """Test that a second server can't take over a live socket."""
+        with pytest.raises(FileExistsError):
+            make_server(socket_file)
+
+    def test_socket_is_owner_only(self, server, socket_file):
+        """Test that the socket is created without group or other access."""
+        assert socket_file.stat().st_mode & 0o777 == 0o600
+
+    def test_replaces_stale_socket(self, socket_file):
+        """Test that a stale socket file is replaced on startup."""
+        make_server(socket_file).server_close()
+
+        server = make_server(socket_file)
+        server.server_close()
+
+
+class TestMain:
+    """Test suite for the console entry point."""
+
+    def test_forwards_to_running_server(self, sample_data, server, monkeypatch, capsys):
+        """Test that main() hands list to the server."""
+        monkeypatch.setattr(sys, "argv", ["docgen", "list"])
+
+        with pytest.raises(SystemExit) as exc:
+            main.main()
+
+        assert exc.value.code == 0
+        assert "utils.py" in capsys.readouterr().out
+
+    def test_falls_back_in_process(self, sample_data, socket_file, monkeypatch, capsys):
+        """Test that main() runs the command itself when no server is up."""
+        monkeypatch.setattr(sys, "argv", ["docgen", "list"])
+
+        with pytest.raises(SystemExit) as exc:
+            main.main()
+
+        assert exc.value.code == 0
+        assert "utils.py" in capsys.readouterr().out
@@ -0,0 +1,54 @@
+"""Tests for splitting work across CI shards."""
+
+import pytest
+
+from docgen import sharding
+
+
+class TestSharding:
+    """Test suite for deterministic, size-balanced sharding."""
+
+    def test_parse_shard(self):
+        """Test that shard specs are 1-based i/N."""
+        assert sharding.parse_shard("2/4") == (2, 4)
+
+    @pytest.mark.parametrize("spec", ["0/4", "5/4", "2", "a/b", "1/0"])
+    def test_parse_shard_rejects_invalid(self, spec):
+        """Test that malformed or out-of-range specs are rejected."""
+        with pytest.raises(ValueError, match="Invalid shard"):
+            sharding.parse_shard(spec)
+
+    def test_partition_covers_every_path_once(self):
+        """Test that shards are disjoint and together hold every path."""
+        sizes = {f"src/m{i}.py": i * 37 % 1000 for i in range(200)}
+
+        shards = sharding.partition(sizes, 3)
+
+        assert sorted(p for shard in shards for p in shard) == sorted(sizes)
+
+    def test_partition_is_deterministic(self):
+        """Test that the split doesn't depend on input order."""
+        sizes = {f"m{i}.py": i % 7 for i in range(50)}
+        reordered = dict(reversed(list(sizes.items())))
+
+        assert sharding.partition(sizes, 4) == sharding.partition(reordered, 4)
+
+    def test_partition_balances_by_size(self):
+        """Test that one large file gets a shard to itself."""
+        sizes = {"big.py": 1000, **{f"small{i}.py": 100 for i in range(10)}}
+
+        shards = sharding.partition(sizes, 2)
+
+        assert ["big.py"] in shards
+
+    def test_select_uses_file_sizes(self, tmp_path):
+        """Test that select weighs files by their size on disk."""
+        (tmp_path / "big.py").write_text("x" * 1000)
+        for i in range(4):
+            (tmp_path / f"s{i}.py").write_text("x" * 100)
+        paths = sorted(str(p) for p in tmp_path.iterdir())
+
+        selected = [sharding.select(paths, i, 2) for i in (1, 2)]
+
+        assert {str(tmp_path / "big.py")} in selected
+        assert selected[0] | selected[1] == set(paths)
@@ -0,0 +1,67 @@
+"""Tests for public API fingerprints."""
+
+from docgen.signatures import api_signature
+
+SOURCE = '''"""Greeting helpers."""
+
+DEFAULT_NAME = "world"
+
+
+class Greeter:
+    """Greets people."""
+
+    def greet(self, name: str = DEFAULT_NAME) -> str:
+        """Return a greeting."""
+        return self._format(name)
+
+    def _format(self, name):
+        return "hi " + name
+
+
+def _private():
+    return 1
+'''
+
+
+def _sig(source: str) -> str:
+    return api_signature(source, "greet.py")
+
+
+class TestApiSignature:
+    """Test suite for api_signature."""
+
+    def test_ignores_formatting_comments_and_bodies(self):
+        """Test that implementation-only edits keep the fingerprint."""
+        edited = SOURCE.replace('return "hi " + name', "# fixed\n        return 'hello ' + name")
+        edited = edited.replace("return self._format(name)", "return self._format(name.strip())")
+
+        assert _sig(edited) == _sig(SOURCE)
+
+    def test_ignores_private_definitions(self):
+        """Test that adding or changing private functions keeps the fingerprint."""
+        edited = SOURCE.replace("def _private():", "def _private(x, y=2):")
+
+        assert _sig(edited + "\ndef _another():\n    pass\n") == _sig(SOURCE)
+
+    def test_tracks_parameters_and_defaults(self):
+        """Test that parameters, defaults and annotations are part of the API."""
+        assert _sig(SOURCE.replace("name: str = DEFAULT_NAME", "name: str")) != _sig(SOURCE)
+        assert _sig(SOURCE.replace("-> str:", "-> bytes:")) != _sig(SOURCE)
+
+    def test_tracks_docstrings_and_constants(self):
+        """Test that docstrings and public constants are part of the API."""
+        assert _sig(SOURCE.replace("Greets people.", "Greets users.")) != _sig(SOURCE)
+        assert _sig(SOURCE.replace('"world"', '"there"')) != _sig(SOURCE)
+
+    def test_tracks_new_public_methods(self):
+        """Test that adding a public method changes the fingerprint."""
+        edited = SOURCE.replace(
+            "    def _format", "    def wave(self):\n        pass\n\n    def _format"
+        )
+
+        assert _sig(edited) != _sig(SOURCE)
+
+    def test_non_python_and_invalid_sources(self):
+        """Test that only parsable Python gets a fingerprint."""
+        assert api_signature(SOURCE, "greet.js") == ""
+        assert api_signature("def (:", "broken.py") == ""
@@ -0,0 +1,162 @@
+"""Tests for near-duplicate detection."""
+
+import shutil
+
+from docgen import objects, similarity, storage
+from docgen.commands import app
+from docgen.models import DocEntry
+
+
+def _tenant_config(name: str, port: int) -> str:
+    """A per-tenant module: same shape, different values."""
+    return (
+        f'TENANT = "{name}"\n'
+        f"PORT = {port}\n\n"
+        "def connect(host, timeout=30):\n"
+        '    """Open a connection to the tenant database."""\n'
+        "    url = build_url(host, PORT, TENANT)\n"
+        "    return Client(url, timeout=timeout, retries=3)\n\n"
+        "def build_url(host, port, tenant):\n"
+        '    return f"postgres://{host}:{port}/{tenant}"\n'
+    )
+
+
+UNRELATED = (
+    "import json\n\n"
+    "class Report:\n"
+    "    def __init__(self, rows):\n"
+    "        self.rows = sorted(rows, key=lambda r: r['date'])\n\n"
+    "    def to_json(self):\n"
+    "        return json.dumps([dict(r, total=sum(r['items'])) for r in self.rows])\n"
+)
+
+
+class TestSimHash:
+    """Test suite for fingerprints."""
+
+    def test_near_duplicates_are_close(self):
+        """Test that files differing only in literal values share a fingerprint."""
+        a = similarity.simhash(_tenant_config("acme", 5432))
+        b = similarity.simhash(_tenant_config("globex", 6543))
+
+        assert similarity.distance(a, b) <= similarity.MAX_DISTANCE
+
+    def test_unrelated_files_are_far(self):
+        """Test that different code is not considered a near-duplicate."""
+        a = similarity.simhash(_tenant_config("acme", 5432))
+        b = similarity.simhash(UNRELATED)
+
+        assert similarity.distance(a, b) > similarity.MAX_DISTANCE
+
+    def test_short_sources_are_not_fingerprinted(self):
+        """Test that tiny files get no fingerprint."""
+        assert similarity.simhash("def f(): pass") == 0
+
+    def test_find_similar_uses_stored_fingerprints(self, temp_storage):
+        """Test lookups against entries in storage, excluding the file itself."""
+        storage.add_entry(DocEntry(
+            source_file="acme.py", doc_file="docs/acme.md",
+            simhash=similarity.simhash(_tenant_config("acme", 5432)),
+        ))
+        storage.add_entry(DocEntry(
+            source_file="report.py", doc_file="docs/report.md",
+            simhash=similarity.simhash(UNRELATED),
+        ))
+
+        with storage.session() as db:
+            match = similarity.find_similar(db, _tenant_config("globex", 6543))
+            own = similarity.find_similar(db, _tenant_config("acme", 5432), exclude="acme.py")
+
+        assert match[0].source_file == "acme.py"
+        assert own is None
+
+
+class TestGenerateSimilar:
+    """Test suite for reusing docs of near-duplicate files in generate."""
+
+    def _documented(self, runner, tmp_path):
+        source = tmp_path / "acme.py"
+        source.write_text(_tenant_config("acme", 5432))
+        runner.invoke(app, ["generate", str(source), "-o", str(tmp_path / "docs")])
+        new = tmp_path / "globex.py"
+        new.write_text(_tenant_config("globex", 6543))
+        return new
+
+    def test_adapts_doc_from_diff(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that a near-duplicate new file is documented from a diff prompt."""
+        new = self._documented(runner, tmp_path)
+
+        result = runner.invoke(app, ["generate", str(new), "-o", str(tmp_path / "docs")])
+
+        assert result.exit_code == 0
+        assert "Adapting docs of similar file" in result.output
+        prompt = mock_llm.return_value.chat.completions.create.call_args.kwargs["messages"][1]
+        assert "Diff to `globex.py`" in prompt["content"]
+        assert "+TENANT = \"globex\"" in prompt["content"]
+        assert storage.find_entry(str(new)).simhash != 0
+
+    def test_diffs_against_documented_snapshot(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that the diff starts from the source the doc describes, not later edits."""
+        new = self._documented(runner, tmp_path)
+        with (tmp_path / "acme.py").open("a") as f:
+            f.write("EDITED_AFTER_DOCS = True\n")
+
+        runner.invoke(app, ["generate", str(new), "-o", str(tmp_path / "docs")])
+
+        prompt = mock_llm.return_value.chat.completions.create.call_args.kwargs["messages"][1]
+        assert "Diff to `globex.py`" in prompt["content"]
+        assert "EDITED_AFTER_DOCS" not in prompt["content"]
+
+    def test_missing_snapshot_documents_from_scratch(
+        self, runner, temp_storage, mock_llm, tmp_path
+    ):
+        """Test that a match without a stored snapshot falls back to the full prompt."""
+        new = self._documented(runner, tmp_path)
+        shutil.rmtree(objects.objects_dir())
+
+        runner.invoke(app, ["generate", str(new), "-o", str(tmp_path / "docs")])
+
+        prompt = mock_llm.return_value.chat.completions.create.call_args.kwargs["messages"][1]
+        assert prompt["content"].startswith("Generate documentation for `globex.py`")
+
+    def test_reuse_copies_doc_without_llm(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that --similar reuse copies the doc and skips the LLM."""
+        new = self._documented(runner, tmp_path)
+        calls = mock_llm.return_value.chat.completions.create.call_count
+
+        result = runner.invoke(
+            app, ["generate", str(new), "-o", str(tmp_path / "docs"), "--similar", "reuse"]
+        )
+
+        assert result.exit_code == 0
+        assert mock_llm.return_value.chat.completions.create.call_count == calls
+        assert (tmp_path / "docs" / "globex.md").read_text() == (
+            tmp_path / "docs" / "acme.md"
+        ).read_text()
+
+    def test_off_documents_from_scratch(self, runner, temp_storage, mock_llm, tmp_path):
+        """Test that --similar off sends the full source."""
+        new = self._documented(runner, tmp_path)
+
+        runner.invoke(app, ["generate", str(new), "-o", str(tmp_path / "docs"), "--similar", "off"])
+
+        prompt = mock_llm.return_value.chat.completions.create.call_args.kwargs["messages"][1]
+        assert prompt["content"].startswith("Generate documentation for `globex.py`")
+
+    def test_batch_run_adapts_from_files_documented_earlier(
+        self, runner, temp_storage, mock_llm, tmp_path
+    ):
+        """Test that files documented earlier in a run are used for later ones."""
+        src = tmp_path / "tenants"
+        src.mkdir()
+        for i, name in enumerate(["a", "b", "c"]):
+            (src / f"{name}.py").write_text(_tenant_config(name, 5000 + i))
+
+        result = runner.invoke(app, ["generate", str(src), "-o", str(tmp_path / "docs"), "-j", "1"])
+
+        assert result.exit_code == 0
+        prompts = [
+            call.kwargs["messages"][1]["content"]
+            for call in mock_llm.async_client.return_value.chat.completions.create.await_args_list
+        ]
+        assert sum("Diff to" in p for p in prompts) == 2
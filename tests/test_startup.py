@@ -0,0 +1,64 @@
+"""Startup cost regression tests for quick commands."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import docgen
+
+# Seconds `docgen list` may take to import and run in a fresh interpreter
+LIST_STARTUP_BUDGET = 0.75
+
+# Modules only commands that call the model should import
+LLM_MODULES = ("openai", "httpx", "dotenv", "docgen.llm")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from docgen.commands import app
+try:
+    app(sys.argv[1:])
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _run(cwd: Path, *args: str) -> dict:
+    """Run a docgen command in a fresh interpreter and report its imports and timing."""
+    env = dict(os.environ, PYTHONPATH=str(Path(docgen.__file__).parent.parent))
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE, *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartup:
+    """Test suite for lazy command loading."""
+
+    def test_list_does_not_import_llm_stack(self, tmp_path):
+        """Test that listing never imports openai, httpx or dotenv."""
+        probe = _run(tmp_path, "list", "--status", "stale")
+
+        assert [m for m in LLM_MODULES if m in probe["modules"]] == []
+
+    def test_list_within_startup_budget(self, tmp_path):
+        """Test that listing stays under the startup budget."""
+        # Best of three, so a busy machine doesn't fail the test
+        elapsed = min(_run(tmp_path, "list")["elapsed"] for _ in range(3))
+
+        assert elapsed < LIST_STARTUP_BUDGET
+
+    def test_generate_loads_llm_stack(self, tmp_path):
+        """Test that commands calling the model still load it."""
+        probe = _run(tmp_path, "generate", "missing.py")
+
+        assert "openai" in probe["modules"]
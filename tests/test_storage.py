@@ -0,0 +1,245 @@
+"""Tests for the SQLite storage engine."""
+
+import fcntl
+import json
+import multiprocessing
+import sqlite3
+
+from docgen import storage
+from docgen.models import DocEntry, DocStatus
+
+
+class TestStorage:
+    """Test suite for the storage module."""
+
+    def test_migrates_legacy_json_manifest(self, sample_data, temp_storage):
+        """Test that docs.json entries are imported once and the file kept as a backup."""
+        entries = storage.load_entries()
+
+        assert [e.source_file for e in entries] == ["utils.py", "main.py"]
+        assert entries[1].status == DocStatus.STALE
+        assert not temp_storage.exists()
+        assert temp_storage.with_suffix(".json.bak").exists()
+
+    def test_migration_tolerates_placeholder_timestamps(self, temp_storage):
+        """Test that entries written with generated_at 'unknown' still migrate."""
+        temp_storage.write_text(
+            '{"version": 1, "entries": [{"source_file": "a.py", "doc_file": "docs/a.md",'
+            ' "status": "current", "generated_at": "unknown", "source_hash": "x"}]}'
+        )
+
+        assert storage.find_entry("a.py") is not None
+
+    def test_add_entry_upserts_by_source_file(self, temp_storage):
+        """Test that adding an existing source file replaces it in place."""
+        storage.add_entry(DocEntry(source_file="a.py", doc_file="docs/a.md", source_hash="1"))
+        storage.add_entry(DocEntry(source_file="b.py", doc_file="docs/b.md", source_hash="2"))
+        storage.add_entry(DocEntry(source_file="a.py", doc_file="docs/a2.md", source_hash="3"))
+
+        entries = storage.load_entries()
+        assert [e.source_file for e in entries] == ["a.py", "b.py"]
+        assert entries[0].doc_file == "docs/a2.md"
+        assert entries[0].source_hash == "3"
+
+    def test_set_status_and_filter(self, sample_data):
+        """Test updating a single status and filtering through the status index."""
+        storage.set_status("utils.py", DocStatus.STALE)
+
+        stale = storage.get_entries(status=DocStatus.STALE)
+        assert {e.source_file for e in stale} == {"utils.py", "main.py"}
+        assert storage.get_entries(status=DocStatus.CURRENT) == []
+
+    def test_delete_entry(self, sample_data):
+        """Test deleting an entry by source file."""
+        storage.delete_entry("utils.py")
+
+        assert storage.find_entry("utils.py") is None
+        assert storage.find_entry("main.py") is not None
+
+    def test_save_entries_replaces_all(self, sample_data):
+        """Test that save_entries replaces the full set of entries."""
+        storage.save_entries([DocEntry(source_file="c.py", doc_file="docs/c.md")])
+
+        assert [e.source_file for e in storage.load_entries()] == ["c.py"]
+
+    def test_lookups_use_indexes(self, sample_data):
+        """Test that source and status lookups are served by indexes."""
+        storage.load_entries()
+        conn = sqlite3.connect(storage.DB_PATH)
+
+        by_source = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM entries WHERE source_file = 'a'"
+        ).fetchall()
+        by_status = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM entries WHERE status = 'stale'"
+        ).fetchall()
+
+        assert "INDEX" in str(by_source)
+        assert "idx_entries_status" in str(by_status)
+
+    def test_iter_entries_filters_by_prefix(self, temp_storage):
+        """Test that a path prefix matches literally, without LIKE wildcards."""
+        for source in ("src/a.py", "src/b.py", "src_x/c.py", "tests/d.py"):
+            storage.add_entry(DocEntry(source_file=source, doc_file=f"docs/{source}.md"))
+
+        assert [e.source_file for e in storage.iter_entries(prefix="src/")] == [
+            "src/a.py", "src/b.py",
+        ]
+
+    def test_iter_entries_sorts_and_pages(self, temp_storage):
+        """Test sorting and limit/offset paging in the database."""
+        for source in ("c.py", "a.py", "d.py", "b.py"):
+            storage.add_entry(DocEntry(source_file=source, doc_file=f"docs/{source}.md"))
+
+        page = storage.iter_entries(sort="source", descending=True, limit=2, offset=1)
+
+        assert [e.source_file for e in page] == ["c.py", "b.py"]
+
+    def test_count_entries_by_status(self, sample_data):
+        """Test that counts cover every status, including empty ones."""
+        assert storage.count_entries() == {
+            DocStatus.CURRENT: 1, DocStatus.STALE: 1, DocStatus.ERROR: 0,
+        }
+        assert sum(storage.count_entries(prefix="utils").values()) == 1
+
+
+class TestSession:
+    """Test suite for the unit-of-work storage session."""
+
+    def test_clean_session_skips_write(self, sample_data):
+        """Test that a session without changes does not write."""
+        with storage.session() as db:
+            db.entries()
+            db.get("utils.py")
+            assert db.flush() is False
+
+    def test_in_place_mutation_is_flushed(self, sample_data):
+        """Test that mutating a returned entry marks it dirty."""
+        with storage.session() as db:
+            db.get("utils.py").status = DocStatus.STALE
+            assert db.dirty()[0][0].source_file == "utils.py"
+
+        assert storage.find_entry("utils.py").status == DocStatus.STALE
+
+    def test_put_and_delete_flush_once(self, sample_data, monkeypatch):
+        """Test that many changes are written in a single flush."""
+        calls = []
+        original = storage._upsert
+        monkeypatch.setattr(storage, "_upsert", lambda conn, e: (calls.append(len(e)), original(conn, e)))
+
+        with storage.session() as db:
+            for name in ("a.py", "b.py", "c.py"):
+                db.put(DocEntry(source_file=name, doc_file=f"docs/{name}.md"))
+            db.delete("main.py")
+
+        assert calls == [3]
+        assert {e.source_file for e in storage.load_entries()} == {"utils.py", "a.py", "b.py", "c.py"}
+
+    def test_get_missing_returns_none(self, temp_storage):
+        """Test that unknown source files are reported as untracked."""
+        with storage.session() as db:
+            assert db.get("missing.py") is None
+
+
+def _put_entries(worker, count):
+    """Add entries from a separate process, one session per entry."""
+    for i in range(count):
+        with storage.session() as db:
+            db.put(DocEntry(source_file=f"w{worker}/{i}.py", doc_file=f"docs/w{worker}/{i}.md"))
+
+
+class TestConcurrency:
+    """Test suite for several docgen processes sharing one storage directory."""
+
+    def test_parallel_writers_lose_nothing(self, temp_storage):
+        """Test that entries written by concurrent processes are all kept."""
+        storage.load_entries()
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_put_entries, args=(w, 25)) for w in range(4)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+
+        assert all(process.exitcode == 0 for process in workers)
+        assert len(storage.load_entries()) == 100
+
+    def test_sessions_only_write_changed_columns(self, sample_data):
+        """Test that sessions editing unrelated fields of an entry don't undo each other."""
+        with storage.session() as first, storage.session() as second:
+            first.get("utils.py").status = DocStatus.STALE
+            second.get("utils.py").doc_file = "docs/moved.md"
+            first.flush()
+
+        entry = storage.find_entry("utils.py")
+        assert entry.status == DocStatus.STALE
+        assert entry.doc_file == "docs/moved.md"
+
+    def test_hash_and_status_are_written_together(self, sample_data):
+        """Test that one session's source_hash is never paired with another's status."""
+        with storage.session() as first, storage.session() as second:
+            entry = first.get("utils.py")
+            entry.source_hash = "old"
+            entry.status = DocStatus.STALE
+            second.get("utils.py").source_hash = "new"
+            first.flush()
+
+        entry = storage.find_entry("utils.py")
+        assert entry.source_hash == "new"
+        assert entry.status == DocStatus.CURRENT
+
+    def test_uses_write_ahead_log(self, temp_storage):
+        """Test that the database is in WAL mode so readers don't block writers."""
+        storage.load_entries()
+
+        conn = sqlite3.connect(storage.DB_PATH)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+
+class TestCompaction:
+    """Test suite for checkpointing the log and exporting docs.json."""
+
+    def test_compact_exports_snapshot_and_truncates_log(self, sample_data, temp_storage):
+        """Test that compaction writes every entry to docs.json and empties the log."""
+        storage.add_entry(DocEntry(source_file="a.py", doc_file="docs/a.md"))
+
+        assert storage.compact(force=True) is True
+
+        data = json.loads(temp_storage.read_text())
+        assert [e["source_file"] for e in data["entries"]] == ["utils.py", "main.py", "a.py"]
+        wal = storage.DB_PATH.with_name("docs.db-wal")
+        assert not wal.exists() or wal.stat().st_size == 0
+
+    def test_small_log_is_not_compacted(self, sample_data, temp_storage):
+        """Test that sessions only compact once the log is large."""
+        with storage.session() as db:
+            db.get("utils.py").status = DocStatus.STALE
+
+        assert not temp_storage.exists()
+
+    def test_writes_compact_a_large_log(self, sample_data, temp_storage, monkeypatch):
+        """Test that module-level writes and mid-session flushes checkpoint a large log."""
+        monkeypatch.setattr(storage, "COMPACT_WAL_BYTES", 1)
+
+        storage.add_entry(DocEntry(source_file="a.py", doc_file="docs/a.md"))
+        assert len(json.loads(temp_storage.read_text())["entries"]) == 3
+
+        with storage.session() as db:
+            db.put(DocEntry(source_file="b.py", doc_file="docs/b.md"))
+            db.flush()
+            assert len(json.loads(temp_storage.read_text())["entries"]) == 4
+
+    def test_compaction_in_progress_is_skipped(self, sample_data, temp_storage):
+        """Test that a process skips compaction while another holds the lock."""
+        storage.load_entries()
+        with open(temp_storage.parent / "compact.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            context = multiprocessing.get_context("fork")
+            result = context.Queue()
+            process = context.Process(target=lambda: result.put(storage.compact(force=True)))
+            process.start()
+            process.join()
+
+        assert result.get() is False
+        assert not temp_storage.exists()
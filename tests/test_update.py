@@ -1,25 +1,20 @@
 """Tests for the update command (bad practices demo)."""
 
-from unittest.mock import MagicMock, patch
-
+from docgen import objects, storage
 from docgen.commands import app
 
 
-@patch("openai.OpenAI")
 class TestUpdate:
     """Test suite for update command.
 
-    Note: We patch OpenAI directly because update.py imports it inline
-    (one of its bad practices) instead of using llm.py.
+    update.py now goes through llm.py, so the shared mock_llm fixture applies.
     """
 
-    def test_update_exits_with_wrong_code(self, mock_openai, runner, temp_storage, tmp_path):
+    def test_update_exits_with_wrong_code(
+        self, runner, temp_storage, mock_llm, tmp_path, monkeypatch
+    ):
         """Test that update uses wrong exit code (demonstrates the bug)."""
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = "# Mock docs"
-        mock_openai.return_value.chat.completions.create.return_value = mock_response
-
+        monkeypatch.chdir(tmp_path)
         source = tmp_path / "example.py"
         source.write_text("def hello(): pass")
 
@@ -28,13 +23,11 @@ class TestUpdate:
         # BUG: exits with 1 instead of 0 on success
         assert result.exit_code == 1
 
-    def test_update_uses_print_instead_of_display(self, mock_openai, runner, temp_storage, tmp_path):
+    def test_update_uses_print_instead_of_display(
+        self, runner, temp_storage, mock_llm, tmp_path, monkeypatch
+    ):
         """Test that update uses print() instead of display module."""
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = "# Mock docs"
-        mock_openai.return_value.chat.completions.create.return_value = mock_response
-
+        monkeypatch.chdir(tmp_path)
         source = tmp_path / "example.py"
         source.write_text("def hello(): pass")
 
@@ -43,3 +36,25 @@ class TestUpdate:
         # BAD: output comes from print(), not display module
         assert "Updating docs for" in result.output
         assert "Done!" in result.output
+
+    def test_update_records_full_fingerprint(
+        self, runner, temp_storage, mock_llm, tmp_path, monkeypatch
+    ):
+        """Test that update records the signature and snapshot of the source it documented."""
+        monkeypatch.chdir(tmp_path)
+        source = tmp_path / "example.py"
+        source.write_text("def f(a): pass\n")
+        runner.invoke(app, ["generate", str(source)])
+        source.write_text("def f(a, b): pass\n")
+        runner.invoke(app, ["update", str(source)])
+        create = mock_llm.return_value.chat.completions.create
+        calls = create.call_count
+
+        # Back to the old API, which the doc no longer describes
+        source.write_text("def f(a): pass\n")
+        result = runner.invoke(app, ["check", str(source)])
+
+        assert "API unchanged" not in result.output
+        assert create.call_count == calls + 1
+        entry = storage.find_entry(str(source))
+        assert objects.get(entry.source_hash) == b"def f(a, b): pass\n"
@@ -0,0 +1,217 @@
+"""Tests for the watch command."""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from docgen import chunking, scheduler, storage
+from docgen.commands import app
+from docgen.commands.watch import _watch
+from docgen.hashing import read_source
+from docgen.models import DocEntry
+from docgen.watcher import Debouncer, InotifyWatcher, PollingWatcher
+
+
+def _wait_for(condition, timeout=5.0):
+    """Poll until condition() is true or fail after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return
+        time.sleep(0.02)
+    pytest.fail("condition not met in time")
+
+
+def _bump(path, content):
+    """Rewrite a file and move its mtime forward so stat changes are visible."""
+    path.write_text(content)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestDebouncer:
+    """Test suite for event debouncing."""
+
+    def test_burst_collapses_to_one(self):
+        """Test that repeated events only fire once the path goes quiet."""
+        now = [0.0]
+        debouncer = Debouncer(0.5, clock=lambda: now[0])
+
+        debouncer.touch("a.py")
+        now[0] = 0.4
+        debouncer.touch("a.py")
+        now[0] = 0.8
+        assert debouncer.ready() == []
+
+        now[0] = 0.9
+        assert debouncer.ready() == ["a.py"]
+        assert debouncer.ready() == []
+
+    def test_timeout_until_next_ready(self):
+        """Test that the timeout points at the earliest pending deadline."""
+        now = [0.0]
+        debouncer = Debouncer(0.5, clock=lambda: now[0])
+        assert debouncer.timeout() is None
+
+        debouncer.touch("a.py")
+        now[0] = 0.2
+
+        assert debouncer.timeout() == pytest.approx(0.3)
+
+
+class TestWatchers:
+    """Test suite for file change detection."""
+
+    def test_polling_detects_change(self, tmp_path):
+        """Test that the polling watcher reports a modified file."""
+        source = tmp_path / "example.py"
+        source.write_text("x = 1\n")
+        watcher = PollingWatcher([str(source)], interval=0.01)
+
+        _bump(source, "x = 2\n")
+
+        assert watcher.poll(0.1) == {str(source)}
+        assert watcher.poll(0.02) == set()
+
+    def test_inotify_detects_change(self, tmp_path):
+        """Test that the inotify watcher reports writes and ignores untracked files."""
+        source = tmp_path / "example.py"
+        source.write_text("x = 1\n")
+        try:
+            watcher = InotifyWatcher([str(source)])
+        except OSError:
+            pytest.skip("inotify not available")
+
+        try:
+            (tmp_path / "other.py").write_text("y = 1\n")
+            source.write_text("x = 2\n")
+
+            assert watcher.poll(1.0) == {str(source)}
+        finally:
+            watcher.close()
+
+
+class TestWatch:
+    """Test suite for the watch event loop."""
+
+    @pytest.fixture
+    def tracked(self, temp_storage, tmp_path):
+        """A source file with a current doc entry."""
+        source = tmp_path / "example.py"
+        source.write_text("def hello(): pass\n")
+        doc = tmp_path / "docs" / "example.md"
+        doc.parent.mkdir()
+        doc.write_text("# Old docs")
+        snapshot = read_source(source)
+        storage.add_entry(DocEntry(
+            source_file=str(source),
+            doc_file=str(doc),
+            source_hash=snapshot.hash,
+            source_mtime_ns=snapshot.mtime_ns,
+            source_size=snapshot.size,
+        ))
+        return source, doc
+
+    @pytest.fixture
+    def watching(self, tracked):
+        """Run the watch loop on a background thread with a polling watcher."""
+        source, _ = tracked
+        stop = threading.Event()
+        watcher = PollingWatcher([str(source)], interval=0.01)
+
+        def _run():
+            with storage.session() as db:
+                _watch(db, watcher, debounce=0.05, concurrency=2, stop=stop)
+
+        thread = threading.Thread(target=_run)
+        thread.start()
+        yield
+        stop.set()
+        thread.join(timeout=5)
+
+    def test_regenerates_changed_file(self, tracked, mock_llm, watching):
+        """Test that an edit regenerates the doc and updates storage."""
+        source, doc = tracked
+
+        _bump(source, "def hello(): return 1\n")
+
+        _wait_for(lambda: doc.read_text() == "# Mock Documentation\n\nGenerated docs.")
+        _wait_for(lambda: storage.find_entry(str(source)).source_hash == read_source(source).hash)
+
+    def test_ignores_noop_write(self, tracked, mock_llm, watching):
+        """Test that rewriting identical content does not call the LLM."""
+        source, doc = tracked
+        content = source.read_text()
+
+        _bump(source, content)
+
+        _wait_for(lambda: storage.find_entry(str(source)).source_mtime_ns == source.stat().st_mtime_ns)
+        mock_llm.return_value.chat.completions.create.assert_not_called()
+        assert doc.read_text() == "# Old docs"
+
+    def test_burst_of_saves_regenerates_once(self, tracked, mock_llm, watching):
+        """Test that several quick saves lead to a single regeneration."""
+        source, doc = tracked
+
+        for i in range(3):
+            _bump(source, f"def hello(): return {i}\n")
+
+        _wait_for(lambda: doc.read_text() != "# Old docs")
+        time.sleep(0.2)
+        assert mock_llm.return_value.chat.completions.create.call_count == 1
+
+
+    def test_chunked_files_regenerate_concurrently(self, temp_storage, mock_llm, tmp_path, monkeypatch):
+        """Test that several large files in flight at once all finish under a tight limit."""
+        monkeypatch.setattr(chunking, "CHUNK_THRESHOLD_LINES", 1)
+        monkeypatch.setattr(scheduler, "_scheduler", scheduler.Scheduler(max_concurrency=2))
+        create = mock_llm.async_client.return_value.chat.completions.create
+        response = create.return_value
+
+        async def _slow_create(**kwargs):
+            await asyncio.sleep(0.02)
+            return response
+
+        create.side_effect = _slow_create
+
+        docs = []
+        for i in range(4):
+            source = tmp_path / f"big{i}.py"
+            source.write_text(f"def first():\n    pass\n\n\ndef second():\n    return {i}\n")
+            doc = tmp_path / "docs" / f"big{i}.md"
+            doc.parent.mkdir(exist_ok=True)
+            doc.write_text("# Old docs")
+            storage.add_entry(DocEntry(source_file=str(source), doc_file=str(doc)))
+            docs.append(doc)
+
+        stop = threading.Event()
+        watcher = PollingWatcher([str(tmp_path / f"big{i}.py") for i in range(4)], interval=0.01)
+
+        def _run():
+            with storage.session() as db:
+                _watch(db, watcher, debounce=0.05, concurrency=4, stop=stop)
+
+        thread = threading.Thread(target=_run)
+        thread.start()
+        try:
+            for i in range(4):
+                _bump(tmp_path / f"big{i}.py", f"def first():\n    pass\n\n\ndef second():\n    return {i + 1}\n")
+            _wait_for(lambda: all(doc.read_text() != "# Old docs" for doc in docs), timeout=10)
+        finally:
+            stop.set()
+            thread.join(timeout=5)
+        assert not thread.is_alive()
+
+
+class TestWatchCommand:
+    """Test suite for the watch command."""
+
+    def test_no_entries_shows_warning(self, runner, temp_storage):
+        """Test that watching with nothing tracked exits with a warning."""
+        result = runner.invoke(app, ["watch"])
+
+        assert result.exit_code == 0
+        assert "No documentation entries found" in result.output